@@ -0,0 +1,5 @@
+"""
+Benchmarklar. Loyiha ildizidan ishga tushiriladi::
+
+    python -m benchmarks.download_limit --threads 32 --limit 5
+"""
@@ -0,0 +1,43 @@
+"""Benchmarklar uchun Django'ni vaqtinchalik baza bilan ko'tarish."""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django(temp_db=True, **overrides):
+    """
+    config.settings bilan django.setup(). SQLite ishlatilsa va temp_db=True
+    bo'lsa, ish bazasiga tegmaslik uchun vaqtinchalik fayl yaratiladi va
+    migratsiyalar qo'llanadi. ``overrides`` settings qiymatlarini almashtiradi.
+    """
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+    from django.conf import settings
+
+    workdir = tempfile.mkdtemp(prefix='amaliyot-bench-')
+    atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+
+    db = settings.DATABASES['default']
+    if temp_db and db['ENGINE'].endswith('sqlite3'):
+        db['NAME'] = os.path.join(workdir, 'bench.sqlite3')
+        db.setdefault('OPTIONS', {}).setdefault('timeout', 30)
+
+    settings.MEDIA_ROOT = os.path.join(workdir, 'media')
+    # Natija bazada darhol ko'rinsin: fon oqimlari o'chiq
+    settings.COUNTER_BUFFERING = False
+    settings.LOG_INGESTION_ASYNC = False
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return workdir
@@ -0,0 +1,144 @@
+"""
+Public link view'lari: WSGI (sync view'lar) va ASGI (sync / async view'lar).
+
+Vaqtinchalik baza va media bilan public fayl va notice yaratiladi, so'ng
+har bir konfiguratsiya alohida server jarayonida ko'tarilib
+benchmarks/load.py bilan yuklanadi::
+
+    pip install gunicorn uvicorn
+    python -m benchmarks.asgi_vs_wsgi --concurrency 64 --duration 15 --workers 2
+
+Standart serverlar: ``gunicorn`` (WSGI, gthread) va ``uvicorn`` (ASGI).
+O'rnatilmagani o'tkazib yuboriladi; ``--wsgi-cmd`` / ``--asgi-cmd`` bilan
+boshqasini berish mumkin ({port} va {workers} o'rniga qo'yiladi).
+"""
+import argparse
+import json
+import os
+import shlex
+import shutil
+import signal
+import subprocess
+import sys
+
+from benchmarks._setup import ROOT, setup_django
+from benchmarks.load import run_load, wait_for_port
+
+WSGI_CMD = 'gunicorn config.wsgi:application -b 127.0.0.1:{port} -w {workers} -k gthread --threads 8 --log-level warning'
+ASGI_CMD = 'uvicorn config.asgi:application --port {port} --workers {workers} --log-level warning --no-access-log'
+
+SETTINGS_TEMPLATE = '''from config.settings import *  # noqa
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+DATABASES['default']['NAME'] = {db!r}
+DATABASES['default'].setdefault('OPTIONS', {{}})['timeout'] = 30
+MEDIA_ROOT = {media!r}
+COUNTER_SPOOL_PATH = {workdir!r} + '/counters.spool'
+LOG_SPILL_PATH = {workdir!r} + '/logs.spill'
+ASYNC_PUBLIC_VIEWS = {async_views!r}
+'''
+
+
+def seed(file_size):
+    from django.contrib.auth import get_user_model
+    from django.core.files.base import ContentFile
+
+    from main.models import Notice, UploadedFile
+
+    owner = get_user_model().objects.create_user(username='bench', password='bench')
+    notice = Notice.objects.create(owner=owner, title='Benchmark', main_text='Lorem ipsum ' * 200, is_public=True)
+    uploaded = UploadedFile(owner=owner, title='Benchmark fayl', is_public=True)
+    uploaded.file.save('bench.bin', ContentFile(os.urandom(file_size)), save=False)
+    uploaded.save()
+    return {
+        'notice': f'/notice/public/{notice.public_id}/',
+        'file': f'/file/public/{uploaded.public_id}/',
+        'download': f'/file/public/{uploaded.public_id}/download/',
+    }
+
+
+def start_server(command, workdir, settings_name, port, workers):
+    argv = shlex.split(command.format(port=port, workers=workers))
+    if shutil.which(argv[0]) is None:
+        return None
+    env = dict(os.environ)
+    env['DJANGO_SETTINGS_MODULE'] = settings_name
+    env['PYTHONPATH'] = os.pathsep.join([workdir, ROOT, env.get('PYTHONPATH', '')])
+    return subprocess.Popen(argv, cwd=ROOT, env=env, start_new_session=True)
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--warmup', type=float, default=2.0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--file-size', type=int, default=256 * 1024, help="Yuklab olinadigan fayl hajmi (bayt)")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--wsgi-cmd', default=WSGI_CMD)
+    parser.add_argument('--asgi-cmd', default=ASGI_CMD)
+    args = parser.parse_args()
+
+    workdir = setup_django()
+    from django.conf import settings
+
+    paths = seed(args.file_size)
+    configs = [
+        ('wsgi-sync', args.wsgi_cmd, False),
+        ('asgi-sync', args.asgi_cmd, False),
+        ('asgi-async', args.asgi_cmd, True),
+    ]
+
+    results = []
+    for name, command, async_views in configs:
+        settings_name = 'bench_settings_' + name.replace('-', '_')
+        with open(os.path.join(workdir, settings_name + '.py'), 'w') as fh:
+            fh.write(SETTINGS_TEMPLATE.format(
+                db=settings.DATABASES['default']['NAME'],
+                media=settings.MEDIA_ROOT,
+                workdir=workdir,
+                async_views=async_views,
+            ))
+
+        process = start_server(command, workdir, settings_name, args.port, args.workers)
+        if process is None:
+            print(f"{name}: server topilmadi ({command.split()[0]}), o'tkazib yuborildi", file=sys.stderr)
+            continue
+        try:
+            if not wait_for_port('127.0.0.1', args.port):
+                print(f"{name}: server ishga tushmadi", file=sys.stderr)
+                continue
+            for label, path in paths.items():
+                result = run_load(
+                    f'http://127.0.0.1:{args.port}', path,
+                    concurrency=args.concurrency, duration=args.duration, warmup=args.warmup,
+                )
+                result.update(config=name, endpoint=label)
+                results.append(result)
+                print(
+                    f"{name:11} {label:9} {result['requests_per_second']:>9} req/s  "
+                    f"p50 {result['p50_ms']}ms  p99 {result['p99_ms']}ms",
+                    file=sys.stderr,
+                )
+        finally:
+            stop_server(process)
+
+    print(json.dumps({
+        'concurrency': args.concurrency,
+        'workers': args.workers,
+        'file_size': args.file_size,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
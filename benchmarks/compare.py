@@ -0,0 +1,105 @@
+"""
+Ikki benchmarks/suite.py natijasini solishtirish::
+
+    python -m benchmarks.compare base.json new.json --threshold 0.10
+
+Regressiya deb hisoblanadi:
+    micro  median vaqt ``threshold`` dan ko'proq oshgan, yoki SQL so'rovlar
+           soni ko'paygan (har qanday o'sish — vaqtdan farqli shovqinsiz)
+    load   req/s ``threshold`` dan ko'proq tushgan, yoki xatolar paydo bo'lgan
+
+Regressiya bo'lsa chiqish kodi 1 (CI uchun).
+"""
+import argparse
+import json
+import sys
+
+
+def _load(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def _change(old, new):
+    if not old:
+        return 0.0
+    return (new - old) / old
+
+
+def compare_micro(base, new, threshold):
+    rows, regressions = [], []
+    base_by_view = {row['view']: row for row in base}
+    for row in new:
+        old = base_by_view.get(row['view'])
+        if old is None:
+            continue
+        change = _change(old['median_ms'], row['median_ms'])
+        reasons = []
+        if change > threshold:
+            reasons.append(f"median +{change:.0%}")
+        if old['queries'] is not None and row['queries'] is not None and row['queries'] > old['queries']:
+            reasons.append(f"so'rovlar {old['queries']} -> {row['queries']}")
+        if row['status'] != old['status']:
+            reasons.append(f"status {old['status']} -> {row['status']}")
+        rows.append((row['view'], old['median_ms'], row['median_ms'], change, old['queries'], row['queries'], reasons))
+        if reasons:
+            regressions.append((row['view'], reasons))
+    return rows, regressions
+
+
+def compare_load(base, new, threshold):
+    rows, regressions = [], []
+    base_by_view = {row['view']: row for row in base}
+    for row in new:
+        old = base_by_view.get(row['view'])
+        if old is None:
+            continue
+        change = _change(old['requests_per_second'], row['requests_per_second'])
+        reasons = []
+        if change < -threshold:
+            reasons.append(f"req/s {change:.0%}")
+        if sum(row['errors'].values()) > sum(old['errors'].values()):
+            reasons.append(f"xatolar {row['errors']}")
+        rows.append((row['view'], old['requests_per_second'], row['requests_per_second'], change, old['p99_ms'], row['p99_ms'], reasons))
+        if reasons:
+            regressions.append((row['view'], reasons))
+    return rows, regressions
+
+
+def _print_table(title, header, rows, out):
+    print(f"\n{title}", file=out)
+    print('  '.join(header), file=out)
+    for view, old, new, change, old_extra, new_extra, reasons in rows:
+        mark = '  <-- ' + ', '.join(reasons) if reasons else ''
+        print(f"{view:24} {old:>10} {new:>10} {change:>+8.1%} {old_extra!s:>8} {new_extra!s:>8}{mark}", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.10, help="Nisbiy chegara, default 0.10 (10%%)")
+    args = parser.parse_args()
+
+    base, new = _load(args.base), _load(args.new)
+    for key in ('seed', 'server', 'database'):
+        if base['meta'].get(key) != new['meta'].get(key):
+            print(f"Ogohlantirish: meta.{key} farq qiladi — natijalar to'g'ridan-to'g'ri solishtirilmaydi", file=sys.stderr)
+
+    micro_rows, micro_regressions = compare_micro(base['micro'], new['micro'], args.threshold)
+    load_rows, load_regressions = compare_load(base['load'], new['load'], args.threshold)
+
+    print(f"{base['meta'].get('git_commit') or '?'} -> {new['meta'].get('git_commit') or '?'}")
+    _print_table('Micro (ms)', [f"{'view':24}", f"{'base':>10}", f"{'new':>10}", f"{'change':>8}", f"{'q base':>8}", f"{'q new':>8}"], micro_rows, sys.stdout)
+    if load_rows:
+        _print_table('Load (req/s)', [f"{'view':24}", f"{'base':>10}", f"{'new':>10}", f"{'change':>8}", f"{'p99 b':>8}", f"{'p99 n':>8}"], load_rows, sys.stdout)
+
+    regressions = micro_regressions + load_regressions
+    if regressions:
+        print(f"\n{len(regressions)} ta regressiya (chegara {args.threshold:.0%})")
+        sys.exit(1)
+    print("\nRegressiya yo'q")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Siqish: CPU narxi va tejalgan baytlar (main/compression.py).
+
+Namunalar — haqiqiy render qilingan javoblar:
+
+    notice_public   katta main_text'li public notice sahifasi
+    notice_list     owner'ning notice/list.html sahifasi
+    notice_json     notice/list/json/
+
+Har namuna x kodek/daraja (gzip 1/6/9, brotli o'rnatilgan bo'lsa 1/4/11):
+siqish vaqti (ms, median), nisbat, tejalgan bayt, MB/s va "1 ms CPU'ga
+tejalgan KB". So'ng public notice so'rovining o'zi: siqishsiz, gzip (kesh
+bo'sh — har safar siqiladi) va gzip (ETag keshidan).
+
+::
+
+    python -m benchmarks.compression --text-kb 64 --rows 200 --repeat 20
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from benchmarks._setup import setup_django
+
+WORDS = (
+    'eslatma fayl yuklab olish ko‘rish muddat havola foydalanuvchi ruxsat '
+    'sahifa ro‘yxat matn sarlavha public private limit holat statistika'
+).split()
+
+
+def text(kb, rng):
+    words = []
+    size = 0
+    while size < kb * 1024:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word.encode()) + 1
+    return ' '.join(words)
+
+
+def seed(text_kb, rows, rng):
+    from django.contrib.auth import get_user_model
+
+    from main.models import Notice
+
+    owner = get_user_model().objects.create_user(username='bench', password='bench')
+    Notice.objects.bulk_create(
+        [Notice(owner=owner, title=f'Eslatma {i}', main_text=text(1, rng), is_public=i % 3 == 0) for i in range(rows)],
+        batch_size=1000,
+    )
+    notice = Notice.objects.create(owner=owner, title='Katta eslatma', main_text=text(text_kb, rng), is_public=True)
+    return owner, notice
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def codec_cases():
+    from main import compression
+
+    cases = [('gzip', level) for level in (1, 6, 9)]
+    if 'br' in compression.CODECS:
+        cases += [('br', level) for level in (1, 4, 11)]
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--text-kb', type=int, default=64, help="Katta notice matni, KB")
+    parser.add_argument('--rows', type=int, default=200, help="Ro'yxat sahifasidagi notice'lar")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    setup_django(QUERY_BUDGET_STRICT=False)
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.test import Client
+    from django.urls import reverse
+
+    from main import compression
+
+    owner, notice = seed(args.text_kb, args.rows, random.Random(args.seed))
+    public_url = reverse('notice_public', args=[notice.public_id])
+
+    anonymous = Client(HTTP_HOST='localhost')
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(owner)
+    samples = {
+        'notice_public': anonymous.get(public_url).content,
+        'notice_list': client.get(reverse('notice_list')).content,
+        'notice_json': client.get(reverse('notice_list_json')).content,
+    }
+
+    codecs = []
+    for sample, body in samples.items():
+        for encoding, level in codec_cases():
+            codec = compression.CODECS[encoding]
+            seconds, compressed = timed(lambda: codec.compress(body, level), args.repeat)
+            saved = len(body) - len(compressed)
+            codecs.append({
+                'sample': sample,
+                'encoding': encoding,
+                'level': level,
+                'bytes': len(body),
+                'compressed_bytes': len(compressed),
+                'ratio': round(len(compressed) / len(body), 4),
+                'saved_bytes': saved,
+                'median_ms': round(seconds * 1000, 3),
+                'mb_per_second': round(len(body) / seconds / 1e6, 1),
+                'saved_kb_per_cpu_ms': round(saved / 1024 / (seconds * 1000), 1),
+            })
+            print(
+                f"{sample:14} {encoding:4} {level:>2}  {len(body):>8} -> {len(compressed):>7} B "
+                f"({len(compressed) / len(body):6.1%})  {seconds * 1000:8.3f} ms",
+                file=sys.stderr,
+            )
+
+    # So'rovning o'zi: siqish view javobi ustida qancha turadi va kesh nima beradi
+    bodies = caches[settings.COMPRESSION_CACHE or 'default']
+    requests = []
+    cases = [
+        ('identity', {}, None),
+        ('gzip_uncached', {'HTTP_ACCEPT_ENCODING': 'gzip'}, bodies.clear),
+        ('gzip_cached', {'HTTP_ACCEPT_ENCODING': 'gzip'}, None),
+    ]
+    for name, headers, before in cases:
+        timings = []
+        for _ in range(args.repeat):
+            if before:
+                before()
+            started = time.perf_counter()
+            response = anonymous.get(public_url, **headers)
+            timings.append(time.perf_counter() - started)
+        seconds = statistics.median(timings)
+        requests.append({
+            'case': name,
+            'median_ms': round(seconds * 1000, 3),
+            'bytes': len(response.content),
+            'encoding': response.get('Content-Encoding', 'identity'),
+        })
+        print(f"request {name:14} {seconds * 1000:8.3f} ms  {len(response.content):>8} B", file=sys.stderr)
+
+    print(json.dumps({
+        'meta': {'text_kb': args.text_kb, 'rows': args.rows, 'repeat': args.repeat, 'brotli': 'br' in compression.CODECS},
+        'codecs': codecs,
+        'requests': requests,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
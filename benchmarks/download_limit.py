@@ -0,0 +1,109 @@
+"""
+Download limit stress testi: N ta oqim bir vaqtda limitli faylni yuklab
+olishga urinadi. "naive" — eski usul (o'qish, Python'da solishtirish,
+alohida UPDATE), "atomic" — main.limits.reserve (bitta shartli UPDATE).
+
+    python -m benchmarks.download_limit --threads 32 --attempts 10 --limit 5
+
+Natija: har strategiya uchun ruxsat berilganlar soni va limitdan oshish
+(overshoot). "atomic" uchun overshoot har doim 0 bo'lishi kerak.
+"""
+import argparse
+import json
+import threading
+import time
+
+from benchmarks._setup import setup_django
+
+
+def naive_reserve(model, pk):
+    from django.db.models import F
+
+    obj = model.objects.get(pk=pk)
+    if obj.download_limit is not None and obj.downloaded_count >= obj.download_limit:
+        return False
+    model.objects.filter(pk=pk).update(downloaded_count=F('downloaded_count') + 1)
+    return True
+
+
+def atomic_reserve(model, pk):
+    from main.limits import reserve
+
+    return reserve(model, pk, 'downloaded_count')
+
+
+def run(strategy, owner, threads, attempts, limit):
+    from django.db import connection
+    from main.models import UploadedFile
+
+    file = UploadedFile.objects.create(owner=owner, title=strategy.__name__, download_limit=limit)
+    barrier = threading.Barrier(threads)
+    granted = []
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        ok, spent = 0, []
+        try:
+            barrier.wait()
+            for _ in range(attempts):
+                started = time.perf_counter()
+                if strategy(UploadedFile, file.pk):
+                    ok += 1
+                spent.append(time.perf_counter() - started)
+        finally:
+            connection.close()
+        with lock:
+            granted.append(ok)
+            latencies.extend(spent)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    file.refresh_from_db()
+    latencies.sort()
+    total_granted = sum(granted)
+    return {
+        'strategy': strategy.__name__,
+        'threads': threads,
+        'attempts': threads * attempts,
+        'limit': limit,
+        'granted': total_granted,
+        'downloaded_count': file.downloaded_count,
+        'overshoot': max(total_granted - limit, 0),
+        'elapsed_seconds': round(elapsed, 4),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 3),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--attempts', type=int, default=10)
+    parser.add_argument('--limit', type=int, default=5)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from main.models import CustomUser
+
+    owner = CustomUser.objects.create_user('bench-owner', password='x')
+    results = []
+    for _ in range(args.rounds):
+        for strategy in (naive_reserve, atomic_reserve):
+            results.append(run(strategy, owner, args.threads, args.attempts, args.limit))
+
+    print(json.dumps(results, indent=2))
+    atomic_overshoot = sum(r['overshoot'] for r in results if r['strategy'] == 'atomic_reserve')
+    if atomic_overshoot:
+        raise SystemExit(f"atomic_reserve limitdan {atomic_overshoot} marta oshdi")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Rasm variantlari generatsiyasi o'tkazuvchanligi: sintetik fotosuratlar
+(shovqin + gradient, JPEG) uchun main.images.render_all bir nechta worker
+soni bilan ishga tushiriladi.
+
+    python -m benchmarks.image_variants --images 40 --size 3000x2000 --workers 1,2,4
+
+Natija: har worker soni uchun rasm/soniya va rasm/soniya/yadro (JSON).
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks._setup import setup_django
+
+
+def make_photo(path, width, height, seed):
+    from PIL import Image, ImageFilter
+
+    noise = Image.effect_noise((width, height), 40 + seed % 20).convert('RGB')
+    gradient = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    Image.blend(noise, gradient, 0.5).filter(ImageFilter.SMOOTH).save(path, 'JPEG', quality=90)
+
+
+def run(sources, workers, root):
+    from main import images
+
+    specs = images.variant_specs()
+    formats = images.variant_formats()
+    jobs = [(path, f'{i:064x}', specs, formats, 80, os.path.join(root, f'w{workers}')) for i, path in enumerate(sources)]
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(images.render_all, *zip(*jobs)))
+    elapsed = time.perf_counter() - started
+
+    files = sum(r[0] for r in results)
+    per_second = len(sources) / elapsed
+    return {
+        'workers': workers,
+        'images': len(sources),
+        'variant_files': files,
+        'bytes_written': sum(r[1] for r in results),
+        'elapsed_seconds': round(elapsed, 3),
+        'images_per_second': round(per_second, 2),
+        'images_per_second_per_core': round(per_second / min(workers, os.cpu_count() or 1), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=20)
+    parser.add_argument('--size', default='3000x2000', help='Asl rasm o‘lchami, KENGLIKxBALANDLIK')
+    parser.add_argument('--workers', default=None, help="Vergul bilan: 1,2,4 (default: 1 va CPU soni)")
+    args = parser.parse_args()
+
+    workdir = setup_django()
+    width, height = (int(x) for x in args.size.lower().split('x'))
+    cpus = os.cpu_count() or 1
+    worker_counts = [int(w) for w in args.workers.split(',')] if args.workers else sorted({1, cpus})
+
+    source_dir = os.path.join(workdir, 'sources')
+    os.makedirs(source_dir)
+    sources = []
+    for i in range(args.images):
+        path = os.path.join(source_dir, f'{i}.jpg')
+        make_photo(path, width, height, i)
+        sources.append(path)
+
+    results = [run(sources, workers, os.path.join(workdir, 'derived')) for workers in worker_counts]
+    print(json.dumps({'cpu_count': cpus, 'source_size': args.size, 'runs': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Ro'yxat sahifasini render qilish: 5000 qatorli file/list.html va
+notice/list.html.
+
+Uchta holat solishtiriladi:
+
+    uncached   har render'da shablon diskdan o'qiladi (TEMPLATE_MODE=development),
+               qator keshi bo'sh
+    cold       cached loader, qator keshi bo'sh (birinchi so'rov)
+    warm       cached loader, barcha qatorlar keshda (o'zgarmagan ro'yxat)
+
+::
+
+    python -m benchmarks.list_render --rows 5000 --repeat 5
+
+Natija: har holat uchun render vaqti (ms, median) va qator/soniya (JSON).
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from benchmarks._setup import setup_django
+
+
+def seed(rows):
+    from django.contrib.auth import get_user_model
+
+    from main.models import Notice, UploadedFile
+
+    owner = get_user_model().objects.create_user(username='bench', password='bench')
+    UploadedFile.objects.bulk_create(
+        [UploadedFile(owner=owner, title=f'Fayl {i}', is_public=i % 2 == 0, views_count=i) for i in range(rows)],
+        batch_size=1000,
+    )
+    Notice.objects.bulk_create(
+        [Notice(owner=owner, title=f'Eslatma {i}', main_text='Lorem ipsum', is_public=i % 3 == 0) for i in range(rows)],
+        batch_size=1000,
+    )
+    return owner
+
+
+def engine(mode):
+    """settings.TEMPLATES bilan bir xil, faqat loader rejimi boshqa."""
+    from django.conf import settings
+    from django.template.backends.django import DjangoTemplates
+
+    params = dict(settings.TEMPLATES[0], NAME=f'bench-{mode}', APP_DIRS=False)
+    params['OPTIONS'] = dict(params['OPTIONS'])
+    loaders = [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]
+    if mode != 'uncached':
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    params['OPTIONS']['loaders'] = loaders
+    params['OPTIONS']['debug'] = mode == 'uncached'
+    params.pop('BACKEND')
+    return DjangoTemplates(params)
+
+
+def measure(backend, template_name, context, request, repeat, before=None):
+    timings = []
+    for _ in range(repeat):
+        if before:
+            before()
+        started = time.perf_counter()
+        backend.get_template(template_name).render(context, request)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import caches
+    from django.test import RequestFactory
+
+    from main.models import Notice, UploadedFile
+    from main.pagination import KeysetPage
+
+    owner = seed(args.rows)
+    request = RequestFactory().get('/', SERVER_NAME='localhost')
+    request.user = owner
+    fragments = caches['template_fragments']
+
+    pages = {
+        'file/list.html': list(UploadedFile.objects.filter(owner=owner).order_by('-created_at', '-id')),
+        'notice/list.html': list(Notice.objects.filter(owner=owner).order_by('-created_at', '-id')),
+    }
+
+    results = []
+    for template_name, rows in pages.items():
+        context = {'object_list': rows, 'page': KeysetPage(rows, None, None), 'query': ''}
+        cases = [
+            ('uncached', engine('uncached'), fragments.clear),
+            ('cold', engine('cached'), fragments.clear),
+            ('warm', engine('cached'), None),
+        ]
+        for name, backend, before in cases:
+            if name == 'warm':
+                backend.get_template(template_name).render(context, request)
+            seconds = measure(backend, template_name, context, request, args.repeat, before)
+            results.append({
+                'template': template_name,
+                'case': name,
+                'rows': len(rows),
+                'median_ms': round(seconds * 1000, 2),
+                'rows_per_second': round(len(rows) / seconds),
+            })
+            print(f"{template_name:18} {name:9} {seconds * 1000:>9.2f} ms", file=sys.stderr)
+
+    print(json.dumps({'rows': args.rows, 'repeat': args.repeat, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Minimal HTTP/1.1 yuk generatori (faqat stdlib, asyncio).
+
+N ta keep-alive ulanish berilgan URL'larni navbat bilan so'raydi va
+so'rov/soniya hamda kechikish persentillarini qaytaradi. Boshqa
+benchmarklar ``run_load`` ni import qiladi; alohida ham ishlaydi::
+
+    python -m benchmarks.load http://127.0.0.1:8000 /notice/public/<uuid>/ -c 32 -d 10
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+class _Connection:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+            self.writer = None
+
+    async def request(self, path, headers=None):
+        """(status, body uzunligi). Server ulanishni yopsa qayta ulanadi."""
+        if self.writer is None:
+            await self._connect()
+        lines = [f'GET {path} HTTP/1.1', f'Host: {self.host}:{self.port}', 'Connection: keep-alive']
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        status = int(status_line.split()[1])
+        parsed = {}
+        for line in header_lines:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                parsed[name.strip().lower()] = value.strip()
+
+        size = 0
+        if parsed.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                chunk_len = int((await self.reader.readline()).split(b';')[0], 16)
+                if chunk_len:
+                    size += len(await self.reader.readexactly(chunk_len))
+                await self.reader.readexactly(2)
+                if not chunk_len:
+                    break
+        elif 'content-length' in parsed:
+            size = len(await self.reader.readexactly(int(parsed['content-length'])))
+        elif status not in (204, 304):
+            size = len(await self.reader.read())
+            await self.close()
+
+        if parsed.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, size
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def _run(base_url, paths, concurrency, duration, warmup, headers):
+    url = urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+    latencies, statuses, errors = [], Counter(), Counter()
+    bytes_received = 0
+    measuring = asyncio.Event()
+    stop_at = None
+
+    async def worker(offset):
+        nonlocal bytes_received
+        connection = _Connection(host, port)
+        i = offset
+        try:
+            while stop_at is None or time.perf_counter() < stop_at:
+                path = paths[i % len(paths)]
+                i += 1
+                started = time.perf_counter()
+                try:
+                    status, size = await connection.request(path, headers)
+                except (OSError, asyncio.IncompleteReadError, ValueError) as error:
+                    errors[type(error).__name__] += 1
+                    await connection.close()
+                    continue
+                if measuring.is_set():
+                    latencies.append(time.perf_counter() - started)
+                    statuses[status] += 1
+                    bytes_received += size
+        finally:
+            await connection.close()
+
+    tasks = [asyncio.create_task(worker(n)) for n in range(concurrency)]
+    await asyncio.sleep(warmup)
+    measuring.set()
+    started = time.perf_counter()
+    stop_at = started + duration
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': dict(errors),
+        'statuses': {str(code): n for code, n in sorted(statuses.items())},
+        'elapsed_seconds': round(elapsed, 3),
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'bytes_received': bytes_received,
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+        'p90_ms': round(_percentile(latencies, 90) * 1000, 2),
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+
+def run_load(base_url, paths, concurrency=16, duration=10.0, warmup=1.0, headers=None):
+    """``paths`` ni ``concurrency`` ta ulanish bilan ``duration`` soniya so'raydi."""
+    if isinstance(paths, str):
+        paths = [paths]
+    return asyncio.run(_run(base_url, list(paths), concurrency, duration, warmup, headers))
+
+
+def wait_for_port(host, port, timeout=30.0):
+    """Server tinglay boshlaguncha kutadi; True — tayyor."""
+    import socket
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base_url')
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('-d', '--duration', type=float, default=10.0)
+    parser.add_argument('--warmup', type=float, default=1.0)
+    parser.add_argument('-H', '--header', action='append', default=[], help="'Nom: qiymat'")
+    args = parser.parse_args()
+
+    headers = dict(h.split(':', 1) for h in args.header)
+    headers = {name.strip(): value.strip() for name, value in headers.items()}
+    result = run_load(args.base_url, args.paths, args.concurrency, args.duration, args.warmup, headers)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark ma'lumotlari generatori: N ta foydalanuvchi, eslatma, fayl,
+rasm va view/download log qatorlari.
+
+Fayllar diskda bitta blob'ni bo'lishadi (har qatorga alohida fayl yozish
+seed'ni sekinlashtiradi); qatorlar ``bulk_create`` bilan, parol xeshi
+bir marta hisoblanadi. ``--seed`` bir xil bo'lsa natija ham bir xil::
+
+    python -m benchmarks.seed --users 100 --notices 10000 --files 10000 --logs 200000
+
+Alohida ishga tushirilganda vaqtinchalik bazaga yozadi va hajmlarni
+chiqaradi; boshqa benchmarklar ``seed()`` ni import qiladi.
+"""
+import argparse
+import io
+import json
+import random
+import time
+from datetime import timedelta
+
+from benchmarks._setup import setup_django
+
+PASSWORD = 'bench'
+
+
+def _image_bytes():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.linear_gradient('L').convert('RGB').resize((800, 600)).save(buffer, 'JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def seed(users=20, notices=1000, files=1000, logs=10000, file_size=64 * 1024, public_ratio=0.5, seed=1):
+    """
+    Ma'lumot yaratadi va benchmarklar uchun tayanch obyektlarni qaytaradi:
+    {'owner', 'notice', 'public_notice', 'file', 'public_file', 'image', 'counts'}.
+    ``owner`` — birinchi foydalanuvchi, barcha "tayanch" obyektlar uniki.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.core.files.base import ContentFile
+    from django.utils import timezone
+
+    from main.models import FileDownloadLog, FileViewLog, Notice, UploadedFile, UploadedImage
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    User = get_user_model()
+
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        [User(username=f'bench{i}', password=password) for i in range(users)],
+        batch_size=1000,
+    )
+    user_ids = list(User.objects.filter(username__startswith='bench').order_by('pk').values_list('pk', flat=True))
+    owner = User.objects.get(pk=user_ids[0])
+
+    # Tayanch obyektlar — oddiy save() bilan (hash, blob, public_id to'liq)
+    anchor_file = UploadedFile(owner=owner, title='Tayanch fayl', is_public=False)
+    anchor_file.file.save('bench.bin', ContentFile(rng.randbytes(file_size)), save=False)
+    anchor_file.save()
+    public_file = UploadedFile(owner=owner, title='Public fayl', is_public=True, file=anchor_file.file.name)
+    public_file.save()
+    notice = Notice.objects.create(owner=owner, title='Tayanch eslatma', main_text='Lorem ipsum ' * 100)
+    public_notice = Notice.objects.create(owner=owner, title='Public eslatma', main_text='Lorem ipsum ' * 100, is_public=True)
+    image = UploadedImage(owner=owner, title='Tayanch rasm', is_public=True)
+    image.image.save('bench.jpg', ContentFile(_image_bytes()), save=False)
+    image.save()
+
+    words = ['hisobot', 'reja', 'shartnoma', 'taqdimot', 'jadval', 'eslatma', 'loyiha', 'byudjet']
+
+    def title(i):
+        return f'{rng.choice(words).capitalize()} {rng.choice(words)} {i}'
+
+    Notice.objects.bulk_create(
+        [
+            Notice(
+                owner_id=rng.choice(user_ids), title=title(i),
+                main_text=' '.join(rng.choices(words, k=60)),
+                is_public=rng.random() < public_ratio,
+            )
+            for i in range(max(notices - 2, 0))
+        ],
+        batch_size=1000,
+    )
+    UploadedFile.objects.bulk_create(
+        [
+            UploadedFile(
+                owner_id=rng.choice(user_ids), title=title(i),
+                file=anchor_file.file.name, size=anchor_file.size, content_hash=anchor_file.content_hash,
+                is_public=rng.random() < public_ratio,
+            )
+            for i in range(max(files - 2, 0))
+        ],
+        batch_size=1000,
+    )
+
+    file_ids = list(UploadedFile.objects.values_list('pk', flat=True))
+    window = int(timedelta(days=30).total_seconds())
+    for model, field, count in ((FileViewLog, 'viewed_at', logs), (FileDownloadLog, 'downloaded_at', logs // 4)):
+        for start in range(0, count, 5000):
+            model.objects.bulk_create([
+                model(**{
+                    'file_id': rng.choice(file_ids),
+                    'user_id': rng.choice(user_ids) if rng.random() < 0.3 else None,
+                    field: now - timedelta(seconds=rng.randrange(window)),
+                })
+                for _ in range(min(5000, count - start))
+            ])
+
+    return {
+        'owner': owner,
+        'notice': notice,
+        'public_notice': public_notice,
+        'file': anchor_file,
+        'public_file': public_file,
+        'image': image,
+        'counts': {
+            'users': User.objects.count(),
+            'notices': Notice.objects.count(),
+            'files': UploadedFile.objects.count(),
+            'view_logs': FileViewLog.objects.count(),
+            'download_logs': FileDownloadLog.objects.count(),
+        },
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--notices', type=int, default=1000)
+    parser.add_argument('--files', type=int, default=1000)
+    parser.add_argument('--logs', type=int, default=10000, help="FileViewLog qatorlari (download — 1/4)")
+    parser.add_argument('--file-size', type=int, default=64 * 1024)
+    parser.add_argument('--seed', type=int, default=1)
+
+
+def seed_from_args(args):
+    return seed(
+        users=args.users, notices=args.notices, files=args.files,
+        logs=args.logs, file_size=args.file_size, seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    setup_django()
+    started = time.perf_counter()
+    data = seed_from_args(args)
+    print(json.dumps({'counts': data['counts'], 'seconds': round(time.perf_counter() - started, 2)}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
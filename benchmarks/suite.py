@@ -0,0 +1,157 @@
+"""
+To'liq benchmark to'plami: seed -> view micro-benchmark'lari -> lokal
+serverga parallel yuklama. Natija bitta JSON faylga yoziladi va
+benchmarks/compare.py bilan boshqa yugurish bilan solishtiriladi::
+
+    python -m benchmarks.suite --out base.json
+    git checkout feature && python -m benchmarks.suite --out new.json
+    python -m benchmarks.compare base.json new.json
+
+Yuklama public link'lar (anonim) va egasining ro'yxat / detail
+sahifalariga (sessiya cookie bilan) beriladi. Server: ``gunicorn``
+o'rnatilgan bo'lsa u, aks holda ``manage.py runserver`` (natijalar
+solishtirilishi uchun ikkala yugurishda bir xil server bo'lsin —
+``meta.server`` da yoziladi).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from benchmarks import seed as seeding
+from benchmarks import views as view_bench
+from benchmarks._setup import ROOT, setup_django
+from benchmarks.asgi_vs_wsgi import SETTINGS_TEMPLATE, WSGI_CMD, start_server, stop_server
+from benchmarks.load import run_load, wait_for_port
+
+FALLBACK_CMD = sys.executable + ' manage.py runserver 127.0.0.1:{port} --noreload --nothreading'
+
+LOAD_ANONYMOUS = ('notice_public', 'file_public', 'file_public_download')
+LOAD_OWNER = ('file_list', 'notice_list', 'file_detail', 'notice_detail')
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def meta(args, server):
+    import django
+    from django.conf import settings
+
+    return {
+        'git_commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'platform': platform.platform(),
+        'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+        'server': server,
+        'seed': {
+            'users': args.users, 'notices': args.notices, 'files': args.files,
+            'logs': args.logs, 'file_size': args.file_size, 'seed': args.seed,
+        },
+        'load': {'concurrency': args.concurrency, 'duration': args.duration, 'workers': args.workers},
+    }
+
+
+def _session_cookie(owner):
+    from django.conf import settings
+    from django.test import Client
+
+    client = Client()
+    client.force_login(owner)
+    return f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+
+
+def run_load_suite(args, workdir, objects):
+    from django.conf import settings
+
+    command = args.server_cmd
+    if command is None:
+        command = WSGI_CMD if shutil.which('gunicorn') else FALLBACK_CMD
+    settings_name = 'bench_settings_suite'
+    with open(os.path.join(workdir, settings_name + '.py'), 'w') as fh:
+        fh.write(SETTINGS_TEMPLATE.format(
+            db=settings.DATABASES['default']['NAME'],
+            media=settings.MEDIA_ROOT,
+            workdir=workdir,
+            async_views=False,
+        ))
+
+    urls = {name: url for name, url, _ in view_bench.endpoints(objects)}
+    owner_headers = {'Cookie': _session_cookie(objects['owner'])}
+    plan = [(name, None) for name in LOAD_ANONYMOUS] + [(name, owner_headers) for name in LOAD_OWNER]
+
+    server = command.split()[0] if 'manage.py' not in command else 'runserver'
+    process = start_server(command, workdir, settings_name, args.port, args.workers)
+    if process is None:
+        print(f"Server topilmadi ({command.split()[0]}), yuklama o'tkazib yuborildi", file=sys.stderr)
+        return server, []
+
+    results = []
+    try:
+        if not wait_for_port('127.0.0.1', args.port):
+            print("Server ishga tushmadi, yuklama o'tkazib yuborildi", file=sys.stderr)
+            return server, []
+        for name, headers in plan:
+            result = run_load(
+                f'http://127.0.0.1:{args.port}', urls[name], concurrency=args.concurrency,
+                duration=args.duration, warmup=args.warmup, headers=headers,
+            )
+            result.update(view=name, url=urls[name])
+            results.append(result)
+            print(
+                f"{name:22} {result['requests_per_second']:>9} req/s  "
+                f"p50 {result['p50_ms']}ms  p99 {result['p99_ms']}ms  {result['statuses']}",
+                file=sys.stderr,
+            )
+    finally:
+        stop_server(process)
+    return server, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    seeding.add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=30, help="Har view micro-benchmark takrori")
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--warmup', type=float, default=2.0)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--server-cmd', help="{port} va {workers} o'rniga qo'yiladi")
+    parser.add_argument('--skip-load', action='store_true')
+    parser.add_argument('--out', help="JSON fayl (berilmasa stdout)")
+    args = parser.parse_args()
+
+    workdir = setup_django(QUERY_BUDGET_STRICT=False)
+    objects = seeding.seed_from_args(args)
+
+    micro = view_bench.run(objects, args.repeat)
+    server, load = (None, []) if args.skip_load else run_load_suite(args, workdir, objects)
+
+    report = {
+        'meta': dict(meta(args, server), counts=objects['counts']),
+        'micro': micro,
+        'load': load,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as fh:
+            fh.write(text + '\n')
+        print(f"Natija: {args.out}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+main/urls.py dagi har bir view uchun micro-benchmark (django.test.Client).
+
+URL ro'yxati ``urlpatterns`` dan olinadi, yo'l parametrlari seed qilingan
+tayanch obyektlar bilan to'ldiriladi (benchmarks/seed.py). Holatni
+o'zgartiradigan yoki faqat POST endpoint'lar (delete, logout, bundle,
+upload) o'lchanmaydi. Public link'lar anonim, qolganlari egasi sifatida::
+
+    python -m benchmarks.views --files 5000 --notices 5000 --repeat 50
+    python -m benchmarks.views --only file_list notice_list
+
+Har view uchun: median / p95 (ms), SQL so'rovlar soni (Server-Timing'dan),
+status va javob hajmi (JSON).
+"""
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+
+from benchmarks import seed as seeding
+from benchmarks._setup import setup_django
+
+SKIP = {
+    'logout', 'notice_delete', 'file_delete', 'file_bundle',
+    'upload_session_create', 'upload_session', 'upload_session_finalize',
+    'notice_public_seen', 'file_public_seen',
+}
+ANONYMOUS = {'notice_public', 'file_public', 'file_public_download', 'image_variant', 'login', 'register'}
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def _argument(name, converter, kwarg, objects):
+    """Yo'l parametri uchun qiymat: int -> pk, uuid -> public_id, slug -> variant."""
+    from main import images
+
+    if converter == 'int':
+        return (objects['notice'] if name.startswith('notice') else objects['file']).pk
+    if converter == 'uuid':
+        if name.startswith('notice'):
+            return objects['public_notice'].public_id
+        if name.startswith('image'):
+            return objects['image'].public_id
+        return objects['public_file'].public_id
+    if converter == 'slug':
+        return images.THUMBNAIL
+    raise ValueError(f"{name}: {kwarg} ({converter}) uchun qiymat yo'q")
+
+
+def endpoints(objects):
+    """[(nom, url, anonim)] — urlpatterns tartibida, takrorlarsiz."""
+    from django.urls import reverse
+
+    from main.urls import urlpatterns
+
+    seen, result = set(), []
+    for pattern in urlpatterns:
+        name = pattern.name or '/' + str(pattern.pattern)
+        if name in SKIP or name in seen:
+            continue
+        seen.add(name)
+        converters = pattern.pattern.converters
+        kwargs = {
+            kwarg: _argument(name, type(converter).__name__.replace('Converter', '').lower(), kwarg, objects)
+            for kwarg, converter in converters.items()
+        }
+        url = reverse(pattern.name, kwargs=kwargs) if pattern.name else name
+        result.append((name, url, name in ANONYMOUS))
+    return result
+
+
+def _consume(response):
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        size = len(response.content)
+    response.close()
+    return size
+
+
+def measure(client, url, repeat, warmup=2):
+    for _ in range(warmup):
+        _consume(client.get(url))
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        size = _consume(response)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    match = _QUERIES.search(response.get('Server-Timing', ''))
+    return {
+        'status': response.status_code,
+        'bytes': size,
+        'queries': int(match.group(1)) if match else None,
+        'median_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+        'repeat': repeat,
+    }
+
+
+def run(objects, repeat=30, only=None):
+    from django.test import Client
+
+    owner = objects['owner']
+    # metrics/ faqat staff uchun ochiq
+    type(owner).objects.filter(pk=owner.pk).update(is_staff=True)
+
+    anonymous = Client(HTTP_HOST='localhost')
+    logged_in = Client(HTTP_HOST='localhost')
+    logged_in.force_login(owner)
+
+    results = []
+    for name, url, is_anonymous in endpoints(objects):
+        if only and name not in only:
+            continue
+        result = measure(anonymous if is_anonymous else logged_in, url, repeat)
+        result.update(view=name, url=url, client='anonymous' if is_anonymous else 'owner')
+        results.append(result)
+        print(
+            f"{name:24} {result['status']}  {result['median_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f}  "
+            f"{result['queries'] if result['queries'] is not None else '-':>3} q",
+            file=sys.stderr,
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    seeding.add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--only', nargs='*', help="Faqat shu view nomlari")
+    args = parser.parse_args()
+
+    # Budjetdan oshish benchmark'ni to'xtatmasin — so'rovlar soni natijada ko'rinadi
+    setup_django(QUERY_BUDGET_STRICT=False)
+    objects = seeding.seed_from_args(args)
+    results = run(objects, args.repeat, args.only)
+    print(json.dumps({'counts': objects['counts'], 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
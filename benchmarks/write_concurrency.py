@@ -0,0 +1,163 @@
+"""
+Parallel yozuvlar: DB_PROFILE bo'yicha taqqoslash (sqlite va sqlite-wal).
+
+Har bir profil alohida jarayonda vaqtinchalik baza bilan ishga tushadi.
+``--writers`` jarayon hisoblagich flush'iga o'xshash tranzaksiyalar
+(bir nechta ``UPDATE ... F() + 1``) va log ``bulk_create`` yozadi,
+``--readers`` jarayon yozuvchilar tugaguncha ro'yxat so'rovlarini bajaradi::
+
+    python -m benchmarks.write_concurrency --writers 8 --readers 4 --ops 200
+
+Natija: yozuv/soniya (faqat yozuvchilar ishlagan vaqtga bo'linadi), o'qish/soniya,
+p50/p99 va "database is locked" xatolari soni.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks._setup import ROOT, setup_django
+
+# Yozuvchilar tugaganda o'rnatiladi (Pool initializer orqali fork'da meros)
+_stop = None
+
+
+def _init(stop):
+    global _stop
+    _stop = stop
+
+
+def writer(args):
+    seed, ops, file_ids = args
+    from django.db import OperationalError, close_old_connections, connection, transaction
+    from django.db.models import F
+
+    from main.models import FileViewLog, UploadedFile
+
+    rng = random.Random(seed)
+    latencies, locked = [], 0
+    for _ in range(ops):
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                if rng.random() < 0.5:
+                    for pk in rng.sample(file_ids, 20):
+                        UploadedFile.objects.filter(pk=pk).update(views_count=F('views_count') + 1)
+                else:
+                    FileViewLog.objects.bulk_create(
+                        [FileViewLog(file_id=rng.choice(file_ids)) for _ in range(50)]
+                    )
+        except OperationalError as error:
+            if 'locked' not in str(error):
+                raise
+            locked += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    close_old_connections()
+    return latencies, locked
+
+
+def reader(owner_id):
+    from django.db import OperationalError, connection
+
+    from main.models import UploadedFile
+
+    queries, locked = 0, 0
+    while not _stop.is_set():
+        try:
+            list(UploadedFile.objects.filter(owner_id=owner_id).order_by('-created_at', '-id')[:50])
+            queries += 1
+        except OperationalError:
+            locked += 1
+    connection.close()
+    return queries, locked
+
+
+def child(args):
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection, connections
+
+    from main.models import UploadedFile
+
+    owner = get_user_model().objects.create_user(username='bench')
+    files = UploadedFile.objects.bulk_create(
+        [UploadedFile(owner=owner, title=f'f{i}') for i in range(200)]
+    )
+    file_ids = [f.pk for f in files]
+    journal = connection.cursor().execute('PRAGMA journal_mode').fetchone()[0]
+
+    # Python sqlite3 standart kutishi (5s) — profilning o'z busy_timeout'i solishtiriladi
+    settings.DATABASES['default'].setdefault('OPTIONS', {})['timeout'] = args.timeout
+    connections.close_all()
+
+    ctx = multiprocessing.get_context('fork')
+    stop = ctx.Event()
+    with ctx.Pool(args.writers + args.readers, initializer=_init, initargs=(stop,)) as pool:
+        reads = [pool.apply_async(reader, (owner.pk,)) for _ in range(args.readers)]
+        # Vaqt faqat yozuvchilar uchun: o'quvchilar ularni tugaguncha bosib turadi
+        started = time.perf_counter()
+        writes = pool.map(writer, [(n, args.ops, file_ids) for n in range(args.writers)])
+        elapsed = time.perf_counter() - started
+        stop.set()
+        read_results = [r.get() for r in reads]
+
+    latencies = sorted(l for lat, _ in writes for l in lat)
+    committed = len(latencies)
+    return {
+        'profile': os.environ.get('DB_PROFILE', 'sqlite'),
+        'journal_mode': journal,
+        'writers': args.writers,
+        'readers': args.readers,
+        'committed_transactions': committed,
+        'locked_errors': sum(locked for _, locked in writes) + sum(locked for _, locked in read_results),
+        'reads': sum(q for q, _ in read_results),
+        'reads_per_second': round(sum(q for q, _ in read_results) / elapsed, 1),
+        'elapsed_seconds': round(elapsed, 3),
+        'writes_per_second': round(committed / elapsed, 1),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', default='sqlite,sqlite-wal')
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--ops', type=int, default=200, help="Har bir yozuvchi tranzaksiyalari")
+    parser.add_argument('--timeout', type=float, default=5.0, help="sqlite3 connect(timeout=...)")
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args)))
+        return
+
+    results = []
+    for profile in args.profiles.split(','):
+        env = dict(os.environ, DB_PROFILE=profile)
+        env.pop('DB_SQLITE_PATH', None)
+        argv = [sys.executable, '-m', 'benchmarks.write_concurrency', '--child'] + [
+            f'--writers={args.writers}', f'--readers={args.readers}', f'--ops={args.ops}',
+            f'--timeout={args.timeout}',
+        ]
+        output = subprocess.run(argv, cwd=ROOT, env=env, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        results.append(result)
+        print(
+            f"{profile:11} {result['writes_per_second']:>8} tx/s  p99 {result['p99_ms']}ms  "
+            f"locked {result['locked_errors']}",
+            file=sys.stderr,
+        )
+    print(json.dumps({'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Baza konfiguratsiyasi — ``DB_PROFILE`` muhit o'zgaruvchisi bilan tanlanadi.
+
+    sqlite       (default) oddiy SQLite, rivojlantirish uchun
+    sqlite-wal   SQLite + WAL, synchronous=NORMAL, busy_timeout, mmap_size;
+                 doimiy ulanishlar (CONN_MAX_AGE) — bitta serverli production
+    postgres     PostgreSQL (psycopg / psycopg2), PG* muhit o'zgaruvchilari
+
+Umumiy o'zgaruvchilar:
+    DB_CONN_MAX_AGE   ulanish necha soniya qayta ishlatiladi (0 — har so'rovda yangi)
+    DB_SQLITE_PATH    SQLite fayl yo'li (default BASE_DIR/db.sqlite3)
+
+SQLite PRAGMA'lari har yangi ulanishda ``configure_sqlite`` orqali
+o'rnatiladi (main/apps.py ``connection_created`` signaliga ulaydi).
+"""
+import os
+
+PROFILES = ('sqlite', 'sqlite-wal', 'postgres')
+
+# sqlite-wal profili uchun
+WAL_PRAGMAS = {
+    'journal_mode': 'WAL',         # o'quvchilar yozuvchini, yozuvchi o'quvchilarni to'smaydi
+    'synchronous': 'NORMAL',       # WAL'da xavfsiz: commit'da fsync yo'q, checkpoint'da bor
+    'busy_timeout': 5000,          # ms — "database is locked" o'rniga kutish
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value not in (None, '') else default
+
+
+def database_config(base_dir, profile=None):
+    """settings.DATABASES uchun lug'at."""
+    profile = profile or os.environ.get('DB_PROFILE', 'sqlite')
+    if profile not in PROFILES:
+        raise ValueError(f"DB_PROFILE noma'lum: {profile!r} ({', '.join(PROFILES)})")
+
+    if profile == 'postgres':
+        default = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('PGDATABASE', 'amaliyot'),
+            'USER': os.environ.get('PGUSER', 'postgres'),
+            'PASSWORD': os.environ.get('PGPASSWORD', ''),
+            'HOST': os.environ.get('PGHOST', 'localhost'),
+            'PORT': os.environ.get('PGPORT', '5432'),
+            'CONN_MAX_AGE': _env_int('DB_CONN_MAX_AGE', 60),
+            'CONN_HEALTH_CHECKS': True,
+            'TEST': {'NAME': os.environ.get('PGTEST_DATABASE') or None},
+        }
+    else:
+        default = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_SQLITE_PATH') or os.path.join(base_dir, 'db.sqlite3'),
+        }
+        if profile == 'sqlite-wal':
+            default.update({
+                'CONN_MAX_AGE': _env_int('DB_CONN_MAX_AGE', 60),
+                'CONN_HEALTH_CHECKS': True,
+                'SQLITE_PRAGMAS': dict(WAL_PRAGMAS),
+            })
+        else:
+            default['CONN_MAX_AGE'] = _env_int('DB_CONN_MAX_AGE', 0)
+
+    return {'default': default}
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """``connection_created`` qabul qiluvchisi: SQLITE_PRAGMAS'ni qo'llaydi."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = connection.settings_dict.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
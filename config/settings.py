@@ -12,6 +12,9 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+
+from config.database import database_config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -45,6 +48,8 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "main.CustomUser"
 
 MIDDLEWARE = [
+    'main.metrics.InstrumentationMiddleware',
+    'main.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,12 +61,25 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'config.urls'
 
+# Shablon rejimi: 'production' — cached loader, shablonlar bir marta o'qilib
+# kompilyatsiya qilinadi (runserver o'zgarishda keshni o'zi tozalaydi);
+# 'development' — har render'da diskdan o'qiladi, template debug yoqiq.
+TEMPLATE_MODE = os.environ.get('TEMPLATE_MODE', 'production')
+
+_template_loaders = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if TEMPLATE_MODE == 'production':
+    _template_loaders = [('django.template.loaders.cached.Loader', _template_loaders)]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'main.metrics.InstrumentedTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': _template_loaders,
+            'debug': DEBUG and TEMPLATE_MODE == 'development',
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -78,12 +96,9 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# DB_PROFILE=sqlite | sqlite-wal | postgres — config/database.py, README
+
+DATABASES = database_config(BASE_DIR)
 
 
 # Password validation
@@ -128,3 +143,220 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# `manage.py test` paytida fon oqimlari o'chiriladi: yozuvlar darhol bazaga tushadi
+
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
+
+# Buffered view/download counters (main/counters.py)
+
+COUNTER_BUFFERING = not TESTING
+COUNTER_FLUSH_INTERVAL = 5
+COUNTER_MAX_PENDING = 500
+COUNTER_SPOOL_PATH = os.path.join(BASE_DIR, 'var', 'counters.spool')
+
+
+# Background FileViewLog / FileDownloadLog ingestion (main/ingest.py)
+
+LOG_INGESTION_ASYNC = not TESTING
+LOG_QUEUE_SIZE = 10000
+LOG_BATCH_SIZE = 500
+LOG_FLUSH_INTERVAL = 2
+LOG_QUEUE_POLICY = 'spill'  # 'block' | 'drop' | 'spill'
+LOG_SPILL_PATH = os.path.join(BASE_DIR, 'var', 'logs.spill')
+
+
+# File delivery (main/delivery.py)
+# 'django' — FileResponse (wsgi.file_wrapper / sendfile); 'x-accel' — nginx;
+# 'x-sendfile' — apache/lighttpd. Offload rejimida baytlarni proxy yuboradi.
+
+FILE_DELIVERY_MODE = os.environ.get('FILE_DELIVERY_MODE', 'django')
+FILE_DELIVERY_ACCEL_PREFIX = '/protected/'
+# Limitli faylni boshlagan brauzer shu muddat ichida Range bilan davom ettira oladi
+FILE_DELIVERY_RESUME_SECONDS = 24 * 3600
+
+
+# Keyset pagination for file / notice lists (main/pagination.py)
+
+LIST_PAGE_SIZE = 50
+LIST_PAGE_SIZE_MAX = 200
+
+
+# Full-text search (main/search.py)
+# None — SQLite'da FTS5, boshqa bazalarda icontains (main.search.LikeBackend)
+
+SEARCH_BACKEND = None
+
+
+# Resumable chunked uploads (main/uploads.py)
+
+UPLOAD_SESSION_DIR = 'uploads/sessions/'
+UPLOAD_CHUNK_MAX_SIZE = 64 * 1024 * 1024
+UPLOAD_SESSION_MAX_AGE_HOURS = 24
+
+
+# public_id hot cache (main/hotcache.py)
+# Standart: CACHES['hot'] (file-based) — bir xostdagi barcha worker'lar uchun
+# umumiy, save/delete signali hammasida o'chiradi, hit bazaga bormaydi. Bir
+# nechta xost bo'lsa 'hot' alias'ini Redis/memcached'ga almashtiring.
+# 'main.hotcache.LocMemLRUBackend' (jarayon ichida) tanlansa ruxsat ustunlari
+# har hitda bazadan tekshiriladi (HOT_CACHE_RECHECK = None — avtomatik,
+# True/False — majburan) va QUERY_BUDGETS'dagi public view'larga +1 kerak.
+
+HOT_CACHE_BACKEND = 'main.hotcache.DjangoCacheBackend'
+HOT_CACHE_TTL = 30
+HOT_CACHE_OPTIONS = {'alias': 'hot'}
+
+
+# UploadedImage derivatives (main/images.py)
+
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_THUMBNAIL_SIZE = (200, 200)
+IMAGE_VARIANT_FORMATS = ('webp', 'jpeg')
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_VARIANT_WORKERS = None  # None — os.cpu_count()
+IMAGE_VARIANTS_ASYNC = not TESTING
+# 'pool' — web jarayonidagi ProcessPoolExecutor, 'jobs' — baza navbati (run_jobs)
+IMAGE_VARIANTS_QUEUE = 'pool'
+IMAGE_DERIVED_DIR = 'derived'
+
+
+# View/download log rollups and retention (main/rollups.py)
+
+ROLLUP_BATCH_SIZE = 5000
+ROLLUP_LAG_SECONDS = 60
+LOG_RETENTION_DAYS = 90
+
+
+# Async-native public link views (main/view/public_async.py)
+# ASGI serverda (uvicorn/daphne) yoqing; WSGI ostida sync variantlar tezroq.
+
+ASYNC_PUBLIC_VIEWS = os.environ.get('ASYNC_PUBLIC_VIEWS', '') == '1'
+
+
+# Request instrumentation (main/metrics.py)
+# Server-Timing sarlavhasi va /metrics/ (Prometheus). QUERY_BUDGETS — url_name
+# bo'yicha SQL so'rovlar chegarasi; testlarda oshib ketish xato beradi.
+# Qiymatlar test rejimi uchun (hisoblagich va loglar darhol yoziladi) —
+# production'da buferlash tufayli so'rovlar bundan kam (hisoblagich va egasining
+# UserStats qatori bitta partiyada yoziladi).
+
+METRICS_SERVER_TIMING = True
+# /metrics/ faqat staff uchun. Prometheus proxy'siz to'g'ridan-to'g'ri so'rasa
+# uning IP'sini qo'shing — nginx/X-Accel ortida 127.0.0.1 hamma uchun bo'ladi.
+METRICS_ALLOWED_IPS = ()
+QUERY_BUDGETS = {
+    'file_public': 5,
+    'file_public_download': 5,
+    'notice_public': 5,
+    'file_detail': 7,
+    'file_download': 6,
+    'file_list': 3,
+    'file_list_json': 3,
+    'notice_list': 5,
+    'notice_list_json': 5,
+    'notice_detail': 5,
+}
+QUERY_BUDGET_STRICT = TESTING
+
+
+# Access control (main/access.py)
+# Foydalanuvchi ruxsatlari to'plami shu kesh alias'ida. Kalit user.access_version
+# bilan — ruxsat bekor qilinsa boshqa worker'lar ham keyingi so'rovda qayta o'qiydi.
+
+ACCESS_CACHE_ALIAS = 'default'
+ACCESS_CACHE_TTL = 300
+
+
+# Template fragment cache (file/list.html, notice/list.html qatorlari)
+# Kalit: (id, updated_at, hisoblagichlar) — o'zgarmagan qator tayyor HTML'dan.
+# 'template_fragments' alias'i shablonlarda {% cache ... using=... %} bilan.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'template-fragments',
+        'TIMEOUT': 3600,
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+    'compressed': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'compressed-bodies',
+        'TIMEOUT': 3600,
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+    # main/hotcache.py — worker'lar orasida umumiy (invalidatsiya hammaga yetadi)
+    'hot': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'var', 'hotcache'),
+        'TIMEOUT': 30,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+
+# Streaming ZIP bundles (main/bundles.py)
+
+BUNDLE_MAX_FILES = 500
+BUNDLE_CHUNK_SIZE = 64 * 1024
+BUNDLE_COMPRESS_LEVEL = 6
+
+
+# Blob GC (main/storage.py, manage.py gc_blobs)
+# Refcount 0 bo'lgan blob shundan yangi bo'lsa o'chirilmaydi: parallel yuklash
+# uni qayta ishlatib, hali acquire() qilmagan bo'lishi mumkin.
+
+BLOB_GC_GRACE_SECONDS = 3600
+
+
+# Storage quotas (main/quotas.py)
+# Rol bo'yicha chegara (bayt, None — cheksiz); CustomUser.storage_quota berilgan
+# bo'lsa u ustun. Foydalanish UserStats.bytes_stored qatoridan — skanersiz.
+
+STORAGE_QUOTAS = {
+    'user': 1024 * 1024 * 1024,
+    'admin': None,
+}
+STORAGE_QUOTA_DEFAULT = 1024 * 1024 * 1024
+
+
+# Background jobs (main/jobs.py, manage.py run_jobs)
+# Baza navbati: PostgreSQL'da SKIP LOCKED, SQLite'da shartli UPDATE bilan claim.
+# JOBS_EAGER — worker'siz ishlash (commit'dan keyin shu jarayonda bajariladi).
+
+JOBS_EAGER = False
+JOB_MAX_ATTEMPTS = 5
+JOB_BACKOFF_BASE = 5
+JOB_BACKOFF_MAX = 3600
+JOB_LOCK_TIMEOUT = 600
+JOB_RETENTION_HOURS = 24
+
+
+# HTTP cache for public link pages (main/httpcache.py)
+# ETag/Last-Modified updated_at'dan, mos kelsa 304 (render'siz). Default:
+# "public, no-cache" — CDN saqlaydi, lekin har ko'rish origin'dan tekshiriladi
+# va sanaladi. Beacon rejimida CDN o'zi beradi, ko'rishni sendBeacon sanaydi.
+
+HTTP_CACHE_VIEW_BEACON = False
+HTTP_CACHE_MAX_AGE = 300
+HTTP_CACHE_VERSION = 1
+
+
+# Response compression (main/compression.py)
+# Accept-Encoding bo'yicha br (brotli o'rnatilgan bo'lsa) yoki gzip; faqat
+# matnli MIME turlari. Anonim public sahifalar ETag bo'yicha bir marta
+# (yuqori darajada) siqilib 'compressed' keshida saqlanadi. Qolgan javoblar
+# (login qilgan sahifalar) faqat gzip + BREACH to'ldirgichi; fayl yuklab
+# olishlar siqilmaydi.
+
+COMPRESSION_MIN_SIZE = 512
+COMPRESSION_LEVELS = {'gzip': 6, 'br': 4}
+COMPRESSION_CACHED_LEVELS = {'gzip': 9, 'br': 11}
+COMPRESSION_STREAMING = True
+COMPRESSION_CACHE = 'compressed'
+COMPRESSION_MAX_RANDOM_BYTES = 100
@@ -0,0 +1,165 @@
+"""
+Kirish huquqi: "U foydalanuvchi O obyektni ko'ra oladimi".
+
+Ruxsat manbalari: egasi, ``is_public``, tasdiqlangan ``AccessRequest``
+(notice / file / image) va ``UploadedImage.allowed_users``. Foydalanuvchining
+barcha ruxsatlari bitta indeksli so'rov (UNION) bilan yig'iladi va
+keshlanadi (``ACCESS_CACHE_ALIAS``, ``ACCESS_CACHE_TTL``); so'rov davomida
+user obyektining o'zida ham saqlanadi, shuning uchun ro'yxat sahifasida
+N ta obyekt tekshiruvi ham bitta so'rov (yoki keshdan nol).
+
+Kesh kaliti ``CustomUser.access_version`` bilan: AccessRequest saqlanganda /
+o'chirilganda va allowed_users o'zgarganda versiya shu tranzaksiyada bazada
+oshiriladi (main/signals.py). User qatori har so'rovda baribir o'qiladi —
+har bir worker keyingi so'rovda yangi kalitni ko'radi, eski yozuv TTL bilan
+o'ladi. Jarayon ichidagi LocMem kesh ham bekor qilingan ruxsatni bermaydi.
+"""
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models
+from django.db.models import Q
+
+# model label -> AccessRequest'dagi FK nomi
+KINDS = {
+    'main.Notice': 'notice',
+    'main.UploadedFile': 'file',
+    'main.UploadedImage': 'image',
+}
+_MEMO = '_access_grants'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _cache():
+    return caches[_setting('ACCESS_CACHE_ALIAS', 'default')]
+
+
+def _key(user):
+    # date_joined: SQLite o'chirilgan user'ning id'sini yangi user'ga qayta berishi mumkin
+    joined = int(user.date_joined.timestamp() * 1000000) if user.date_joined else 0
+    return f'access:grants:{user.pk}:{joined}:{getattr(user, "access_version", 0)}'
+
+
+def _kind(obj):
+    return KINDS[obj._meta.label]
+
+
+def _grants_query(user_id):
+    from main.models import AccessRequest, UploadedImage
+
+    # (user, is_approved) indeksi + allowed_users jadvali — bitta UNION.
+    # Ustunlar (image, notice, file): Django values_list'da maydonlar
+    # ifodalardan oldin keladi, ikkala tomonda tartib bir xil bo'lsin
+    approved = (
+        AccessRequest.objects.filter(user_id=user_id, is_approved=True)
+        .order_by()
+        .values_list('image_id', 'notice_id', 'file_id')
+    )
+    allowed = (
+        UploadedImage.allowed_users.through.objects.filter(customuser_id=user_id)
+        .values_list(
+            'uploadedimage_id',
+            models.Value(None, output_field=models.BigIntegerField()),
+            models.Value(None, output_field=models.BigIntegerField()),
+        )
+    )
+    return approved.union(allowed, all=True)
+
+
+def _collect(rows):
+    grants = {kind: set() for kind in KINDS.values()}
+    for image_id, notice_id, file_id in rows:
+        if notice_id:
+            grants['notice'].add(notice_id)
+        if file_id:
+            grants['file'].add(file_id)
+        if image_id:
+            grants['image'].add(image_id)
+    return {kind: frozenset(ids) for kind, ids in grants.items()}
+
+
+def grants(user):
+    """{'notice': {id, ...}, 'file': ..., 'image': ...} — tasdiqlangan ruxsatlar."""
+    memo = getattr(user, _MEMO, None)
+    if memo is not None:
+        return memo
+    cache = _cache()
+    result = cache.get(_key(user))
+    if result is None:
+        result = _collect(_grants_query(user.pk))
+        cache.set(_key(user), result, _setting('ACCESS_CACHE_TTL', 300))
+    setattr(user, _MEMO, result)
+    return result
+
+
+async def agrants(user):
+    memo = getattr(user, _MEMO, None)
+    if memo is not None:
+        return memo
+    cache = _cache()
+    result = await cache.aget(_key(user))
+    if result is None:
+        result = _collect([row async for row in _grants_query(user.pk)])
+        await cache.aset(_key(user), result, _setting('ACCESS_CACHE_TTL', 300))
+    setattr(user, _MEMO, result)
+    return result
+
+
+def _decide(user, obj):
+    """Bazasiz javob: True / False, yoki None — ruxsatlar to'plami kerak."""
+    if obj.is_public:
+        return True
+    if not user.is_authenticated:
+        return False
+    if obj.owner_id == user.pk:
+        return True
+    return None
+
+
+def can_view(user, obj):
+    decision = _decide(user, obj)
+    if decision is not None:
+        return decision
+    return obj.pk in grants(user)[_kind(obj)]
+
+
+async def acan_view(user, obj):
+    decision = _decide(user, obj)
+    if decision is not None:
+        return decision
+    return obj.pk in (await agrants(user))[_kind(obj)]
+
+
+def filter_visible(user, objects):
+    """Ro'yxat sahifalari uchun: ko'rinadiganlari, tartib saqlanadi (ko'pi bilan bitta so'rov)."""
+    return [obj for obj in objects if can_view(user, obj)]
+
+
+def listed_filters(model, user):
+    """
+    Ro'yxat va qidiruvdagi ko'rinish sharti: o'zimniki (nofaol ham), faol public
+    va menga ruxsat berilgan faollari. Qismlar alohida — ro'yxat har birini
+    indeksli so'rov qilib merge qiladi (main/pagination.py).
+    """
+    filters = [Q(owner=user), Q(is_public=True, is_active=True)]
+    ids = grants(user)[KINDS[model._meta.label]] if user.is_authenticated else ()
+    if ids:
+        filters.append(Q(pk__in=ids, is_active=True))
+    return filters
+
+
+def listed(model, user):
+    """``listed_filters`` bitta queryset sifatida (qidiruv natijalari uchun)."""
+    return model.objects.filter(reduce(or_, listed_filters(model, user)))
+
+
+def invalidate(user_id):
+    """Foydalanuvchi ruxsatlari o'zgardi — versiya oshadi, barcha worker'lardagi kalit eskiradi."""
+    from django.contrib.auth import get_user_model
+
+    get_user_model().objects.filter(pk=user_id).update(access_version=models.F('access_version') + 1)
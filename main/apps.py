@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from config.database import configure_sqlite
+        from main import signals  # noqa: F401
+        from main.metrics import install
+
+        # sqlite-wal profili: WAL, synchronous, busy_timeout, mmap_size
+        connection_created.connect(configure_sqlite, dispatch_uid='configure_sqlite')
+
+        # 📊 Har bir ulanishda SQL so'rovlar soni va vaqti (main/metrics.py)
+        connection_created.connect(install, dispatch_uid='metrics_install')
@@ -0,0 +1,136 @@
+"""
+Bir nechta faylni ZIP qilib oqim bilan yuborish.
+
+Arxiv xotirada ham, diskda ham yig'ilmaydi: ``zipfile`` seek qilinmaydigan
+``_Sink`` ga yozadi (data descriptor rejimi), har bo'lak yozilgach
+to'plangan baytlar darhol javobga chiqariladi. Allaqachon siqilgan
+turlar (rasm, video, arxiv...) STORED, qolganlari DEFLATE bilan.
+
+Sozlamalar (settings.py, ixtiyoriy):
+    BUNDLE_MAX_FILES       -- bitta arxivdagi fayllar chegarasi, default 500
+    BUNDLE_CHUNK_SIZE      -- fayldan o'qish bo'lagi, default 64 KiB
+    BUNDLE_COMPRESS_LEVEL  -- DEFLATE darajasi (1-9), default 6
+"""
+import io
+import mimetypes
+import os
+import zipfile
+
+from django.conf import settings
+from django.utils import timezone
+
+# Qayta siqishdan foyda yo'q — CPU behuda
+STORED_EXTENSIONS = {
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.7z', '.rar',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.heic',
+    '.mp3', '.aac', '.ogg', '.opus', '.flac', '.m4a',
+    '.mp4', '.m4v', '.mov', '.mkv', '.webm', '.avi',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.epub', '.jar', '.apk',
+}
+STORED_TYPES = ('image/', 'video/', 'audio/')
+UNCOMPRESSED_TYPES = ('image/svg+xml', 'image/bmp', 'image/tiff', 'audio/wav', 'audio/x-wav')
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def is_compressed(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in STORED_EXTENSIONS:
+        return True
+    content_type = mimetypes.guess_type(filename)[0] or ''
+    return content_type.startswith(STORED_TYPES) and content_type not in UNCOMPRESSED_TYPES
+
+
+def entry_name(uploaded, taken):
+    """Arxiv ichidagi nom: asl nom, takrorlansa "nom (2).ext"."""
+    name = uploaded.original_name
+    if not name:
+        # Blob nomi — xesh; odam o'qiydigani sarlavha + kengaytma
+        ext = os.path.splitext(uploaded.file.name)[1]
+        name = uploaded.title if uploaded.title.lower().endswith(ext.lower()) else uploaded.title + ext
+    name = name.replace('/', '_').replace('\\', '_')
+    stem, ext = os.path.splitext(name)
+    candidate, n = name, 1
+    while candidate.lower() in taken:
+        n += 1
+        candidate = f'{stem} ({n}){ext}'
+    taken.add(candidate.lower())
+    return candidate
+
+
+class _Sink(io.RawIOBase):
+    """Faqat yoziladigan bufer: tell() bor, seek() yo'q — zipfile oqim rejimiga o'tadi."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def seekable(self):
+        return False
+
+    def seek(self, *args):
+        raise io.UnsupportedOperation('seek')
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zipinfo(name, uploaded, size, compresslevel):
+    modified = timezone.localtime(uploaded.updated_at or timezone.now())
+    info = zipfile.ZipInfo(name, date_time=modified.timetuple()[:6])
+    info.file_size = size  # zip64 kerakligini zipfile oldindan bilsin
+    info.external_attr = 0o644 << 16
+    if is_compressed(name):
+        info.compress_type = zipfile.ZIP_STORED
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info._compresslevel = compresslevel
+    return info
+
+
+def stream_zip(files, notes=None):
+    """
+    UploadedFile'lardan ZIP baytlari generatori. ``notes`` — arxiv oxiriga
+    qo'shiladigan matn fayllari: {nom: matn}.
+    """
+    chunk_size = _setting('BUNDLE_CHUNK_SIZE', 64 * 1024)
+    compresslevel = _setting('BUNDLE_COMPRESS_LEVEL', 6)
+    sink = _Sink()
+    taken = set()
+
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        for uploaded in files:
+            name = entry_name(uploaded, taken)
+            size = uploaded.size if uploaded.size is not None else uploaded.file.size
+            info = _zipinfo(name, uploaded, size, compresslevel)
+            with uploaded.file.open('rb') as src, archive.open(info, 'w') as dst:
+                while True:
+                    chunk = src.read(chunk_size)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            # Data descriptor (CRC, hajm) yozuv yopilganda qo'shiladi
+            yield sink.drain()
+
+        for name, text in (notes or {}).items():
+            archive.writestr(name, text)
+    # Markaziy katalog ZipFile yopilganda yoziladi
+    yield sink.drain()
@@ -0,0 +1,335 @@
+"""
+Javoblarni siqish: ``Accept-Encoding`` bo'yicha brotli yoki gzip.
+
+    CompressionMiddleware  -- matnli javoblarni (HTML, JSON, CSV, ...) siqadi,
+                              ``Vary: Accept-Encoding`` qo'yadi
+    negotiate()            -- 'br' | 'gzip' | None (q-qiymatlar hisobga olinadi)
+    cached_response()      -- public sahifaning ETag bo'yicha keshdagi siqilgan
+                              tanasi (render ham, siqish ham yo'q)
+
+brotli ixtiyoriy (``pip install brotli``): o'rnatilmagan bo'lsa faqat gzip
+(stdlib zlib). Siqilmaydi:
+
+    - MIME turi matnli emas — rasm, video, zip, pdf va h.k. allaqachon siqilgan
+      (fayl yuklab olishlar ham shu qoida bilan o'tadi)
+    - 200 dan boshqa status (206 oraliqlar baytlari siqilgan tanaga mos kelmaydi)
+    - ``Content-Encoding`` bor yoki X-Accel-Redirect / X-Sendfile (baytlarni proxy beradi)
+    - fayl yuklab olishlar (``Content-Disposition`` / ``Accept-Ranges``) — kuchli
+      ETag, Content-Length va If-Range bilan davom ettirish saqlanadi
+    - ``COMPRESSION_MIN_SIZE`` dan kichik tana
+
+Public sahifalar (main/httpcache.py, anonim) bir xil ETag uchun bir xil bayt —
+siqilgan tana ``COMPRESSION_CACHE`` da ``(kodlash, ETag)`` kaliti bilan saqlanadi
+va yuqoriroq darajada (``COMPRESSION_CACHED_LEVELS``) bir marta siqiladi.
+
+Qolgan javoblarda (login qilgan sahifalar: CSRF token, ``?q=`` aks etadi) BREACH
+hujumi uchun faqat gzip, Django GZipMiddleware kabi tasodifiy uzunlikdagi
+sarlavha (FNAME) bilan — siqilgan hajm har so'rovda o'zgaradi.
+
+Sozlamalar (settings.py, ixtiyoriy):
+    COMPRESSION_MIN_SIZE       -- bayt, default 512
+    COMPRESSION_LEVELS         -- {'gzip': 6, 'br': 4} — har so'rovda siqiladiganlar
+    COMPRESSION_CACHED_LEVELS  -- {'gzip': 9, 'br': 11} — keshlanadigan tanalar
+    COMPRESSION_STREAMING      -- streaming javoblar (matnli fayllar) ham, default True
+    COMPRESSION_CACHE          -- CACHES alias'i, None — keshsiz
+    COMPRESSION_MAX_RANDOM_BYTES -- BREACH to'ldirgichi, default 100
+"""
+import gzip
+import io
+import secrets
+import time
+import zlib
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import sync_and_async_middleware
+
+try:
+    import brotli
+except ImportError:  # ixtiyoriy bog'liqlik
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/xhtml+xml',
+    'application/x-ndjson',
+    'image/svg+xml',
+}
+
+# Jarayon ichidagi statistika (metrics/ chiqaradi)
+stats = defaultdict(float)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ---------- kodeklar ----------
+class Gzip:
+    name = 'gzip'
+    default_level = 6
+    cached_level = 9
+
+    def compress(self, data, level, padding=0):
+        if padding:
+            process, finish = self.compressor(level, padding)
+            return process(data) + finish()
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 — gzip konteyneri
+        return compressor.compress(data) + compressor.flush()
+
+    def compressor(self, level, padding=0):
+        if not padding:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            return compressor.compress, compressor.flush
+
+        # django.utils.text.compress_sequence kabi: tasodifiy uzunlikdagi FNAME
+        buf = io.BytesIO()
+        name = b'a' * secrets.randbelow(padding)
+        zfile = gzip.GzipFile(filename=name, mode='wb', compresslevel=level, fileobj=buf, mtime=0)
+
+        def drain():
+            out = buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            return out
+
+        def process(chunk):
+            zfile.write(chunk)
+            return drain()
+
+        def finish():
+            zfile.close()
+            return drain()
+
+        return process, finish
+
+
+class Brotli:
+    name = 'br'
+    default_level = 4
+    cached_level = 11
+
+    def compress(self, data, level):
+        return brotli.compress(data, quality=level)
+
+    def compressor(self, level):
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.finish
+
+
+# Server afzalligi tartibida
+CODECS = {codec.name: codec for codec in ([Brotli()] if brotli else []) + [Gzip()]}
+
+
+def level(encoding, cached=False):
+    if cached:
+        return _setting('COMPRESSION_CACHED_LEVELS', {}).get(encoding, CODECS[encoding].cached_level)
+    return _setting('COMPRESSION_LEVELS', {}).get(encoding, CODECS[encoding].default_level)
+
+
+def negotiate(header, codecs=CODECS):
+    """``'gzip, br;q=0.8'`` -> 'gzip'. Mos kodlash bo'lmasa None."""
+    weights = {}
+    for part in (header or '').lower().split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+
+    best, best_q = None, 0.0
+    for name in codecs:
+        q = weights.get(name, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compressible(content_type):
+    mime = (content_type or '').split(';', 1)[0].strip().lower()
+    return (
+        mime.startswith('text/')
+        or mime in COMPRESSIBLE_TYPES
+        or mime.endswith('+json')
+        or mime.endswith('+xml')
+    )
+
+
+def _eligible(response):
+    if response.status_code != 200 or response.has_header('Content-Encoding'):
+        return False
+    if response.has_header('X-Accel-Redirect') or response.has_header('X-Sendfile'):
+        return False
+    # Fayl yuklab olish: oraliqlar va kuchli ETag siqilmagan baytlarga tegishli
+    if response.has_header('Content-Disposition') or response.has_header('Accept-Ranges'):
+        return False
+    if not compressible(response.get('Content-Type')):
+        return False
+    min_size = _setting('COMPRESSION_MIN_SIZE', 512)
+    if response.streaming:
+        length = response.get('Content-Length')
+        return _setting('COMPRESSION_STREAMING', True) and (length is None or int(length) >= min_size)
+    return len(response.content) >= min_size
+
+
+# ---------- ETag bo'yicha kesh ----------
+def _cache():
+    alias = _setting('COMPRESSION_CACHE', None)
+    return caches[alias] if alias else None
+
+
+def _cache_key(encoding, etag):
+    return f'compressed:{encoding}:{etag}'
+
+
+def remember(response, etag):
+    """Middleware shu javobning siqilgan tanasini ETag kaliti bilan saqlaydi."""
+    response.compression_etag = etag
+    return response
+
+
+def cached_response(request, etag):
+    """Keshdagi siqilgan tana yoki None (kodlash kelishilmasa ham)."""
+    cache = _cache()
+    encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING'))
+    if cache is None or encoding is None:
+        return None
+    entry = cache.get(_cache_key(encoding, etag))
+    if entry is None:
+        stats['cache_misses'] += 1
+        return None
+    stats['cache_hits'] += 1
+    content_type, body = entry
+    response = HttpResponse(body, content_type=content_type)
+    response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+# ---------- siqish ----------
+def _padding(response):
+    """Anonim public sahifa (``remember``) — 0, qolganlari BREACH to'ldirgichi bilan."""
+    if getattr(response, 'compression_etag', None):
+        return 0
+    return _setting('COMPRESSION_MAX_RANDOM_BYTES', 100)
+
+
+def _compress_content(response, encoding, padding):
+    etag = getattr(response, 'compression_etag', None)
+    cache = _cache() if etag else None
+    original = response.content
+
+    started = time.perf_counter()
+    codec, compress_level = CODECS[encoding], level(encoding, cached=cache is not None)
+    # padding bo'lsa kodlash har doim gzip (compress_response)
+    body = codec.compress(original, compress_level, padding) if padding else codec.compress(original, compress_level)
+    stats['seconds'] += time.perf_counter() - started
+
+    if len(body) >= len(original):
+        return False
+    stats['bytes_in'] += len(original)
+    stats['bytes_out'] += len(body)
+    if cache is not None:
+        cache.set(_cache_key(encoding, etag), (response['Content-Type'], body))
+    response.content = body
+    response['Content-Length'] = str(len(body))
+    return True
+
+
+def _compressor(encoding, padding):
+    codec = CODECS[encoding]
+    return codec.compressor(level(encoding), padding) if padding else codec.compressor(level(encoding))
+
+
+def _stream(chunks, encoding, padding):
+    process, finish = _compressor(encoding, padding)
+    for chunk in chunks:
+        stats['bytes_in'] += len(chunk)
+        started = time.perf_counter()
+        out = process(chunk)
+        stats['seconds'] += time.perf_counter() - started
+        if out:
+            stats['bytes_out'] += len(out)
+            yield out
+    out = finish()
+    stats['bytes_out'] += len(out)
+    yield out
+
+
+async def _astream(chunks, encoding, padding):
+    process, finish = _compressor(encoding, padding)
+    async for chunk in chunks:
+        stats['bytes_in'] += len(chunk)
+        started = time.perf_counter()
+        out = process(chunk)
+        stats['seconds'] += time.perf_counter() - started
+        if out:
+            stats['bytes_out'] += len(out)
+            yield out
+    out = finish()
+    stats['bytes_out'] += len(out)
+    yield out
+
+
+def compress_response(request, response):
+    if not _eligible(response):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    padding = _padding(response)
+    # To'ldirgich faqat gzip sarlavhasida — maxfiy ma'lumotli javobga brotli yo'q
+    encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING'), ('gzip',) if padding else CODECS)
+    if encoding is None:
+        return response
+
+    if response.streaming:
+        content = response.streaming_content
+        stream = _astream if response.is_async else _stream
+        response.streaming_content = stream(content, encoding, padding)
+        # Yakuniy hajm noma'lum; oraliqlar siqilmagan baytlarga tegishli
+        del response['Content-Length']
+        del response['Accept-Ranges']
+    elif not _compress_content(response, encoding, padding):
+        return response
+
+    stats[f'responses_{encoding}'] += 1
+    # Baytlar o'zgardi — kuchli ETag kuchsizga (RFC 9110 8.8.1)
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    response['Content-Encoding'] = encoding
+    return response
+
+
+@sync_and_async_middleware
+def CompressionMiddleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            return compress_response(request, await get_response(request))
+    else:
+        def middleware(request):
+            return compress_response(request, get_response(request))
+    return middleware
+
+
+def metrics():
+    return {
+        'responses_gzip': stats['responses_gzip'],
+        'responses_br': stats['responses_br'],
+        'bytes_in': stats['bytes_in'],
+        'bytes_out': stats['bytes_out'],
+        'seconds': round(stats['seconds'], 6),
+        'cache_hits': stats['cache_hits'],
+        'cache_misses': stats['cache_misses'],
+    }
@@ -0,0 +1,242 @@
+"""
+Buferlangan hisoblagichlar (views_count, downloaded_count, views, public_views).
+Fayl / eslatma hisoblagichi oshganda egasining ``UserStats`` ustuni ham
+shu partiyada oshadi (main/userstats.py).
+
+Har bir ko'rish uchun alohida ``UPDATE ... SET x = x + 1`` yozish o'rniga
+oshirishlar jarayon ichida yig'iladi, har bir obyekt bo'yicha qo'shiladi va
+taymer yoki hajm chegarasi bo'yicha bitta tranzaksiyada yoziladi.
+
+Sozlamalar (settings.py, ixtiyoriy):
+    COUNTER_BUFFERING       -- False bo'lsa har bir oshirish darhol yoziladi
+    COUNTER_FLUSH_INTERVAL  -- sekundlarda, default 5
+    COUNTER_MAX_PENDING     -- shuncha kalit yig'ilsa darhol flush, default 500
+    COUNTER_SPOOL_PATH      -- flush bo'lmagan qoldiqlar yoziladigan fayl
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+from main import userstats
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _keys(obj, field):
+    """Obyekt hisoblagichi va (bo'lsa) egasining UserStats ustuni — bitta partiyada yoziladi."""
+    keys = [(obj._meta.label, obj.pk, field)]
+    stat = userstats.counter_field(obj, field)
+    if stat:
+        keys.append((userstats.LABEL, obj.owner_id, stat))
+    return keys
+
+
+def spool_path():
+    return _setting('COUNTER_SPOOL_PATH', os.path.join(settings.BASE_DIR, 'var', 'counters.spool'))
+
+
+class CounterBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)    # (label, pk, field) -> delta
+        self._inflight = defaultdict(int)   # flush paytida hali commit bo'lmaganlar
+        self._thread = None
+        self._stop = threading.Event()
+        self._pid = None
+        self.flushes = 0
+        self.flushed_increments = 0
+
+    # ---------- yozish ----------
+    def incr(self, obj, field, amount=1):
+        keys = _keys(obj, field)
+        if not _setting('COUNTER_BUFFERING', True):
+            self._write({key: amount for key in keys})
+            return
+
+        size = max(self._buffer(label, pk, name, amount) for label, pk, name in keys)
+        if size >= _setting('COUNTER_MAX_PENDING', 500):
+            self.flush()
+
+    def add(self, label, pk, field, amount=1):
+        if not _setting('COUNTER_BUFFERING', True):
+            self._write({(label, pk, field): amount})
+            return
+
+        if self._buffer(label, pk, field, amount) >= _setting('COUNTER_MAX_PENDING', 500):
+            self.flush()
+
+    async def aincr(self, obj, field, amount=1):
+        """ASGI view'lar uchun: bufer to'lmasa bazaga ham, oqimga ham tegmaydi."""
+        keys = _keys(obj, field)
+        if not _setting('COUNTER_BUFFERING', True):
+            for label, pk, name in keys:
+                await apps.get_model(label)._base_manager.filter(pk=pk).aupdate(**{name: F(name) + amount})
+            return
+
+        size = max(self._buffer(label, pk, name, amount) for label, pk, name in keys)
+        if size >= _setting('COUNTER_MAX_PENDING', 500):
+            await sync_to_async(self.flush)()
+
+    def _buffer(self, label, pk, field, amount):
+        with self._lock:
+            self._pending[(label, pk, field)] += amount
+            size = len(self._pending)
+        self._ensure_thread()
+        return size
+
+    # ---------- o'qish ----------
+    def pending(self, obj, field):
+        key = (obj._meta.label, obj.pk, field)
+        with self._lock:
+            return self._pending.get(key, 0) + self._inflight.get(key, 0)
+
+    def apply_pending(self, obj, *fields):
+        """Bazadagi qiymat + hali yozilmagan delta (faqat xotirada)."""
+        for field in fields:
+            delta = self.pending(obj, field)
+            if delta:
+                setattr(obj, field, (getattr(obj, field) or 0) + delta)
+        return obj
+
+    def size(self):
+        with self._lock:
+            return len(self._pending)
+
+    # ---------- flush ----------
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, defaultdict(int)
+            for key, delta in batch.items():
+                self._inflight[key] += delta
+
+        if not batch:
+            return 0
+
+        try:
+            self._write(batch)
+        except Exception:
+            # Yozilmadi -> keyingi flush uchun qaytarib qo'yamiz
+            with self._lock:
+                for key, delta in batch.items():
+                    self._pending[key] += delta
+            raise
+        finally:
+            with self._lock:
+                for key, delta in batch.items():
+                    self._inflight[key] -= delta
+                    if not self._inflight[key]:
+                        del self._inflight[key]
+
+        total = sum(batch.values())
+        self.flushes += 1
+        self.flushed_increments += total
+        return total
+
+    def _write(self, batch):
+        # Bir xil deltali obyektlar bitta UPDATE ... WHERE pk IN (...) bilan yoziladi
+        per_object = defaultdict(dict)
+        for (label, pk, field), delta in batch.items():
+            if delta:
+                per_object[(label, pk)][field] = delta
+
+        groups = defaultdict(list)
+        for (label, pk), deltas in per_object.items():
+            groups[(label, tuple(sorted(deltas.items())))].append(pk)
+
+        with transaction.atomic():
+            for (label, deltas), pks in groups.items():
+                model = apps.get_model(label)
+                model._base_manager.filter(pk__in=pks).update(
+                    **{field: F(field) + delta for field, delta in deltas}
+                )
+
+    # ---------- fon oqimi ----------
+    def _ensure_thread(self):
+        # fork'dan keyin (gunicorn worker) oqim qaytadan ishga tushadi
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='counter-flusher', daemon=True
+            )
+            self._thread.start()
+        atexit.register(self.shutdown)
+
+    def _run(self):
+        interval = _setting('COUNTER_FLUSH_INTERVAL', 5)
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Hisoblagichlarni flush qilib bo'lmadi")
+            finally:
+                close_old_connections()
+
+    def shutdown(self):
+        """Jarayon yopilayotganda: flush, bo'lmasa spool faylga yozish."""
+        self._stop.set()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Flush bo'lmadi, qoldiq spool faylga yoziladi")
+            self.spool()
+
+    # ---------- spool ----------
+    def spool(self):
+        with self._lock:
+            batch, self._pending = self._pending, defaultdict(int)
+        if not batch:
+            return 0
+
+        path = spool_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as fh:
+            for (label, pk, field), delta in batch.items():
+                fh.write(json.dumps([label, pk, field, delta]) + '\n')
+        return len(batch)
+
+    def load_spool(self):
+        path = spool_path()
+        if not os.path.exists(path):
+            return 0
+
+        # Boshqa jarayon yozib ulgurmasligi uchun avval nomini o'zgartiramiz
+        taken = path + '.%d' % os.getpid()
+        os.replace(path, taken)
+        count = 0
+        with open(taken, encoding='utf-8') as fh:
+            for line in fh:
+                if line.strip():
+                    label, pk, field, delta = json.loads(line)
+                    with self._lock:
+                        self._pending[(label, pk, field)] += delta
+                    count += 1
+        self.flush()
+        os.remove(taken)
+        return count
+
+
+buffer = CounterBuffer()
+
+incr = buffer.incr
+aincr = buffer.aincr
+pending = buffer.pending
+apply_pending = buffer.apply_pending
+flush = buffer.flush
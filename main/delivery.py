@@ -0,0 +1,429 @@
+"""
+UploadedFile'larni yetkazib berish.
+
+- HTTP Range (bitta va bir nechta oraliq, multipart/byteranges)
+- shartli GET: kuchli ETag (content_hash'dan), If-None-Match,
+  If-Modified-Since, If-Range
+- lokal storage uchun FileResponse: WSGI server ``wsgi.file_wrapper`` orqali
+  ``os.sendfile`` bilan yuboradi (oraliqlar uchun ham, fileno() saqlanadi)
+- offload rejimi: X-Accel-Redirect (nginx) yoki X-Sendfile (apache/lighttpd),
+  Django faqat ruxsat va limitlarni tekshiradi
+
+Sozlamalar (settings.py, ixtiyoriy):
+    FILE_DELIVERY_MODE          -- 'django' (default), 'x-accel' yoki 'x-sendfile'
+    FILE_DELIVERY_ACCEL_PREFIX  -- nginx'dagi internal location, default '/protected/'
+    FILE_DELIVERY_MAX_RANGES    -- bundan ko'p oraliq so'ralsa butun fayl beriladi
+    FILE_DELIVERY_RESUME_SECONDS -- limitli faylni shu brauzer qancha vaqt ichida
+                                   davom ettira oladi (imzolangan cookie), default 86400
+"""
+import hashlib
+import io
+import mimetypes
+import os
+import secrets
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+CHUNK_SIZE = 64 * 1024
+RESUME_SALT = 'main.delivery.resume'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def sha256_of(field_file):
+    """FieldFile / UploadedFile mazmunining sha256 hex qiymati."""
+    digest = hashlib.sha256()
+    for chunk in field_file.chunks(CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range_header(header, size):
+    """
+    ``bytes=0-99,200-`` -> [(0, 99), (200, size - 1)] (yopiq oraliqlar).
+
+    Sintaksis xato bo'lsa None (RFC 7233: header e'tiborsiz qoldiriladi),
+    hech bir oraliq faylga tushmasa RangeNotSatisfiable.
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+
+    ranges = []
+    for part in header[len('bytes='):].split(','):
+        part = part.strip()
+        if '-' not in part:
+            return None
+        first, last = (p.strip() for p in part.split('-', 1))
+        try:
+            if first == '':
+                # suffix: oxirgi N bayt
+                length = int(last)
+                if length <= 0:
+                    continue
+                start, end = max(size - length, 0), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and end < start:
+                    return None
+                if start >= size:
+                    continue
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+        ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+
+    # Ustma-ust tushgan / yonma-yon oraliqlarni birlashtiramiz
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class RangeFile:
+    """
+    Fayl ichidagi [start, end] oynasi. FileResponse Content-Length'ni shu
+    oynadan hisoblaydi, fileno() esa sendfile uchun asl deskriptorni beradi.
+    """
+
+    def __init__(self, fh, start, end):
+        self._fh = fh
+        self._start = start
+        self._end = end + 1
+        fh.seek(start)
+
+    def read(self, size=-1):
+        remaining = self._end - self._fh.tell()
+        if remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        return self._fh.read(size)
+
+    def tell(self):
+        return self._fh.tell() - self._start
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = self._start + offset
+        elif whence == io.SEEK_CUR:
+            position = self._fh.tell() + offset
+        else:
+            position = self._end + offset
+        return self._fh.seek(position) - self._start
+
+    def seekable(self):
+        return True
+
+    def fileno(self):
+        return self._fh.fileno()
+
+    def close(self):
+        self._fh.close()
+
+
+class DeliveryFileResponse(FileResponse):
+    block_size = CHUNK_SIZE
+
+
+class FileDelivery:
+    """
+    Bitta so'rov uchun yetkazish rejasi::
+
+        delivery = FileDelivery(request, uploaded_file)
+        if response := delivery.precondition_response():
+            return response            # 304 / 412
+        if delivery.starts_download():
+            ...                        # limit + hisoblagich + log, grant_resume()
+        elif not delivery.may_resume():
+            ...                        # HEAD / Range: bytes=N- — limit band qilinmasdan tekshiriladi
+        return delivery.response()
+    """
+
+    def __init__(self, request, uploaded_file):
+        self.request = request
+        self.uploaded = uploaded_file
+        self.field = uploaded_file.file
+        self.size = uploaded_file.size if uploaded_file.size is not None else self.field.size
+        self.filename = uploaded_file.original_name or os.path.basename(self.field.name)
+        self.content_type = mimetypes.guess_type(self.filename)[0] or 'application/octet-stream'
+        self.etag = self._etag()
+        self.last_modified = int(uploaded_file.updated_at.timestamp()) if uploaded_file.updated_at else None
+
+        try:
+            self.ranges = self._ranges()
+            self.unsatisfiable = False
+        except RangeNotSatisfiable:
+            self.ranges = None
+            self.unsatisfiable = True
+
+    # ---------- validatorlar ----------
+    def _etag(self):
+        uploaded = self.uploaded
+        if not uploaded.content_hash and self._local_path():
+            # Eski yozuvlar: birinchi yuklab olishda hisoblab saqlab qo'yamiz
+            uploaded.content_hash = sha256_of(self.field)
+            type(uploaded)._base_manager.filter(pk=uploaded.pk).update(
+                content_hash=uploaded.content_hash
+            )
+        if uploaded.content_hash:
+            return '"%s"' % uploaded.content_hash
+        return None
+
+    def _ranges(self):
+        header = self.request.META.get('HTTP_RANGE')
+        if not header or self.request.method not in ('GET', 'HEAD'):
+            return None
+        if not self._if_range_matches():
+            return None
+        ranges = parse_range_header(header, self.size)
+        if ranges is not None and len(ranges) > _setting('FILE_DELIVERY_MAX_RANGES', 16):
+            return None
+        return ranges
+
+    def _if_range_matches(self):
+        if_range = self.request.META.get('HTTP_IF_RANGE')
+        if not if_range:
+            return True
+        if if_range.startswith('"') or if_range.startswith('W/'):
+            # If-Range faqat kuchli taqqoslash bilan ishlaydi
+            return self.etag is not None and if_range == self.etag
+        date = parse_http_date_safe(if_range)
+        return date is not None and self.last_modified is not None and date >= self.last_modified
+
+    def _local_path(self):
+        try:
+            return self.field.path
+        except NotImplementedError:
+            return None
+
+    # ---------- qarorlar ----------
+    def precondition_response(self):
+        """304 / 412 javob yoki None."""
+        return get_conditional_response(
+            self.request, etag=self.etag, last_modified=self.last_modified
+        )
+
+    def starts_download(self):
+        """
+        Yangi yuklab olish hisoblanadimi: GET va birinchi bayt ham yuboriladi.
+        HEAD va uzilganini davom ettirish (Range: bytes=N-) limitni yemaydi —
+        ular ``may_resume()`` yoki ``limits.download_available()`` bilan
+        tekshiriladi.
+        """
+        if self.unsatisfiable or self.request.method != 'GET':
+            return False
+        return self.ranges is None or self.ranges[0][0] == 0
+
+    # ---------- davom ettirish tokeni ----------
+    @property
+    def resume_cookie(self):
+        return f'dl{self.uploaded.pk}'
+
+    def may_resume(self):
+        """Shu brauzer faylni limit ichida boshlaganmi (imzolangan cookie)."""
+        value = self.request.COOKIES.get(self.resume_cookie)
+        if not value:
+            return False
+        try:
+            pk, etag = signing.loads(
+                value, salt=RESUME_SALT, max_age=_setting('FILE_DELIVERY_RESUME_SECONDS', 86400)
+            )
+        except (signing.BadSignature, TypeError, ValueError):
+            return False
+        # Fayl almashtirilgan bo'lsa (boshqa ETag) token eskirgan
+        return pk == self.uploaded.pk and etag == self.etag
+
+    def grant_resume(self, response):
+        """Band qilingan yuklab olishni keyin Range bilan davom ettirish uchun."""
+        response.set_cookie(
+            self.resume_cookie,
+            signing.dumps([self.uploaded.pk, self.etag], salt=RESUME_SALT),
+            max_age=_setting('FILE_DELIVERY_RESUME_SECONDS', 86400),
+            path=self.request.path,
+            httponly=True,
+            samesite='Lax',
+        )
+        return response
+
+    # ---------- javob ----------
+    def response(self):
+        if self.unsatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */%d' % self.size
+            return self._decorate(response)
+
+        mode = _setting('FILE_DELIVERY_MODE', 'django')
+        if mode in ('x-accel', 'x-sendfile'):
+            response = self._offload_response(mode)
+        elif self.ranges is None:
+            response = DeliveryFileResponse(
+                self.field.open('rb'), as_attachment=True, filename=self.filename
+            )
+        elif len(self.ranges) == 1:
+            start, end = self.ranges[0]
+            response = DeliveryFileResponse(
+                RangeFile(self.field.open('rb'), start, end),
+                as_attachment=True,
+                filename=self.filename,
+                status=206,
+            )
+            response['Content-Range'] = 'bytes %d-%d/%d' % (start, end, self.size)
+        else:
+            response = self._multipart_response()
+
+        return self._decorate(response)
+
+    def _decorate(self, response):
+        response['Accept-Ranges'] = 'bytes'
+        if self.etag:
+            response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        return response
+
+    def _offload_response(self, mode):
+        # Baytlarni proxy yuboradi; Range va sendfile ham o'sha tomonda
+        response = HttpResponse(content_type=self.content_type)
+        if mode == 'x-accel':
+            prefix = _setting('FILE_DELIVERY_ACCEL_PREFIX', '/protected/')
+            response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(self.field.name)
+        else:
+            response['X-Sendfile'] = self._local_path() or self.field.name
+        response['Content-Disposition'] = content_disposition_header(True, self.filename)
+        del response['Content-Length']
+        return response
+
+    def _multipart_plan(self):
+        """(boundary, [(sarlavha, start, end)], yakun, umumiy uzunlik)."""
+        boundary = secrets.token_hex(16)
+        parts = []
+        for start, end in self.ranges:
+            head = (
+                '\r\n--%s\r\nContent-Type: %s\r\nContent-Range: bytes %d-%d/%d\r\n\r\n'
+                % (boundary, self.content_type, start, end, self.size)
+            ).encode('ascii')
+            parts.append((head, start, end))
+        tail = ('\r\n--%s--\r\n' % boundary).encode('ascii')
+        length = sum(len(head) + end - start + 1 for head, start, end in parts) + len(tail)
+        return boundary, parts, tail, length
+
+    def _multipart_response(self):
+        boundary, parts, tail, length = self._multipart_plan()
+
+        def stream():
+            with self.field.open('rb') as fh:
+                for head, start, end in parts:
+                    yield head
+                    fh.seek(start)
+                    remaining = end - start + 1
+                    while remaining > 0:
+                        chunk = fh.read(min(CHUNK_SIZE, remaining))
+                        if not chunk:
+                            return
+                        remaining -= len(chunk)
+                        yield chunk
+            yield tail
+
+        response = StreamingHttpResponse(
+            stream(),
+            status=206,
+            content_type='multipart/byteranges; boundary=%s' % boundary,
+        )
+        response['Content-Length'] = length
+        response['Content-Disposition'] = content_disposition_header(True, self.filename)
+        return response
+
+
+class AsyncFileDelivery(FileDelivery):
+    """
+    ASGI view'lar uchun: fayl bo'laklari thread pool'da o'qiladi va async
+    iterator orqali yuboriladi — event loop diskni kutmaydi.
+
+        delivery = await AsyncFileDelivery.create(request, uploaded_file)
+    """
+    chunk_size = 4 * CHUNK_SIZE
+
+    @classmethod
+    async def create(cls, request, uploaded_file):
+        # Eski yozuvlar uchun xesh __init__ ichida emas, shu yerda (threadda)
+        if not uploaded_file.content_hash:
+            try:
+                uploaded_file.file.path
+            except NotImplementedError:
+                pass
+            else:
+                uploaded_file.content_hash = await sync_to_async(sha256_of, thread_sensitive=False)(
+                    uploaded_file.file
+                )
+                await type(uploaded_file)._base_manager.filter(pk=uploaded_file.pk).aupdate(
+                    content_hash=uploaded_file.content_hash
+                )
+        return cls(request, uploaded_file)
+
+    def response(self):
+        mode = _setting('FILE_DELIVERY_MODE', 'django')
+        if self.unsatisfiable or mode in ('x-accel', 'x-sendfile'):
+            return super().response()
+
+        if self.ranges is None:
+            segments = [(b'', 0, self.size - 1)]
+            response = StreamingHttpResponse(self._stream(segments, b''), content_type=self.content_type)
+            response['Content-Length'] = self.size
+        elif len(self.ranges) == 1:
+            start, end = self.ranges[0]
+            response = StreamingHttpResponse(
+                self._stream([(b'', start, end)], b''), status=206, content_type=self.content_type
+            )
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = 'bytes %d-%d/%d' % (start, end, self.size)
+        else:
+            boundary, parts, tail, length = self._multipart_plan()
+            response = StreamingHttpResponse(
+                self._stream(parts, tail),
+                status=206,
+                content_type='multipart/byteranges; boundary=%s' % boundary,
+            )
+            response['Content-Length'] = length
+        response['Content-Disposition'] = content_disposition_header(True, self.filename)
+        return self._decorate(response)
+
+    async def _stream(self, segments, tail):
+        in_thread = sync_to_async(thread_sensitive=False)
+        fh = await in_thread(self.field.storage.open)(self.field.name, 'rb')
+        try:
+            for head, start, end in segments:
+                if head:
+                    yield head
+                await in_thread(fh.seek)(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = await in_thread(fh.read)(min(self.chunk_size, remaining))
+                    if not chunk:
+                        return
+                    remaining -= len(chunk)
+                    yield chunk
+            if tail:
+                yield tail
+        finally:
+            await in_thread(fh.close)()
@@ -0,0 +1,124 @@
+"""
+Muddati tugagan Notice va UploadedFile'larni o'chirib qo'yish (is_active=False).
+
+``sweep`` qisman indeks (``is_active AND expire_date IS NOT NULL``) bo'yicha
+muddati o'tgan qatorlarni partiyalab topadi va bitta shartli UPDATE bilan
+nofaol qiladi; ``reclaim=True`` bo'lsa fayllarning blob havolasi ham
+bo'shatiladi (oxirgi havola bo'lsa disk joyi qaytadi). Ishga tushirish:
+``manage.py sweep_expired`` (cron yoki ``--loop``).
+
+View'lar ``is_active`` ga tayanadi. Sweeper hali yetib kelmagan qatorni
+``ensure_active`` so'rov paytida o'zi nofaol qiladi — natija bir xil.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from main import hotcache, storage, userstats
+
+
+def _deactivate(model, pks, now):
+    return model._base_manager.filter(pk__in=pks, is_active=True, expire_date__lte=now).update(
+        is_active=False, updated_at=now
+    )
+
+
+def ensure_active(obj):
+    """
+    Obyekt hali faolmi. Muddati o'tgan, lekin sweeper ulgurmagan bo'lsa
+    shu yerda nofaol qilinadi va False qaytadi.
+    """
+    if not obj.is_active:
+        return False
+    now = timezone.now()
+    if obj.expire_date and obj.expire_date <= now:
+        _deactivate(type(obj), [obj.pk], now)
+        hotcache.invalidate(type(obj), obj.public_id)
+        obj.is_active = False
+        return False
+    return True
+
+
+async def aensure_active(obj):
+    if not obj.is_active:
+        return False
+    now = timezone.now()
+    if obj.expire_date and obj.expire_date <= now:
+        await type(obj)._base_manager.filter(pk=obj.pk, is_active=True, expire_date__lte=now).aupdate(
+            is_active=False, updated_at=now
+        )
+        await hotcache.ainvalidate(type(obj), obj.public_id)
+        obj.is_active = False
+        return False
+    return True
+
+
+def _reclaim(rows):
+    """UploadedFile qatorlaridan faylni ajratadi; blob refcount kamayadi."""
+    from main.models import UploadedFile
+
+    released = 0
+    freed = defaultdict(int)
+    with transaction.atomic():
+        for pk, name, owner_id, size in rows:
+            if not name:
+                continue
+            # Parallel sweeper ikki marta release qilmasin
+            if not UploadedFile._base_manager.filter(pk=pk, file=name).update(file=''):
+                continue
+            if storage.is_blob_name(name):
+                storage.release(name)
+            else:
+                transaction.on_commit(lambda name=name: storage.file_storage.delete(name))
+            freed[owner_id] += size or 0
+            released += 1
+        # Egasining egallagan joyi (UserStats.bytes_stored)
+        for owner_id, size in freed.items():
+            userstats.add(owner_id, bytes_stored=-size)
+    return released
+
+
+def sweep(model, batch_size=500, reclaim=False, now=None, dry_run=False):
+    """Bitta model bo'yicha: (nofaol qilinganlar, bo'shatilgan fayllar)."""
+    from main.models import UploadedFile
+
+    now = now or timezone.now()
+    deactivated = reclaimed = 0
+    # dry-run'da qatorlar o'zgarmaydi — takrorlanmaslik uchun id bo'yicha suriladi
+    last_pk = 0
+
+    while True:
+        qs = model._base_manager.filter(is_active=True, expire_date__lte=now)
+        if dry_run:
+            qs = qs.filter(pk__gt=last_pk).order_by('pk')
+        rows = list(qs.values_list('pk', 'public_id')[:batch_size])
+        if not rows:
+            break
+        if dry_run:
+            deactivated += len(rows)
+            last_pk = rows[-1][0]
+            continue
+
+        deactivated += _deactivate(model, [pk for pk, _ in rows], now)
+        for _, public_id in rows:
+            hotcache.invalidate(model, public_id)
+
+    if reclaim and model is UploadedFile:
+        # Avvalroq (reclaim'siz) nofaol qilinganlar ham shu yerda
+        expired = (
+            UploadedFile._base_manager.filter(is_active=False, expire_date__lte=now)
+            .exclude(file='').exclude(file__isnull=True)
+        )
+        last_pk = 0
+        while True:
+            rows = list(
+                expired.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', 'file', 'owner_id', 'size')[:batch_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            reclaimed += len(rows) if dry_run else _reclaim(rows)
+
+    return deactivated, reclaimed
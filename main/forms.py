@@ -1,7 +1,9 @@
+import re
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
-from main.models import CustomUser, Notice, UploadedFile, UploadedImage
+from main.models import CustomUser, Notice, UploadedFile, UploadedImage, UploadSession
 
 
 # =========================
@@ -138,4 +140,19 @@ class UploadedImageForm(forms.ModelForm):
             'image': forms.ClearableFileInput(attrs={
                 'class': 'form-control form-control-lg'
             }),
-        } 
+        }
+
+
+# =========================
+# Upload Session Form (bo'laklab yuklash, view/upload.py)
+# =========================
+class UploadSessionForm(forms.ModelForm):
+    class Meta:
+        model = UploadSession
+        fields = ['title', 'filename', 'length', 'checksum', 'is_public', 'expire_date', 'download_limit']
+
+    def clean_checksum(self):
+        checksum = self.cleaned_data['checksum'].strip().lower()
+        if checksum and not re.fullmatch(r'[0-9a-f]{64}', checksum):
+            raise forms.ValidationError("sha256 (64 ta hex belgi) kerak")
+        return checksum
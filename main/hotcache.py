@@ -0,0 +1,264 @@
+"""
+public_id bo'yicha o'qiladigan obyektlar uchun "issiq" kesh.
+
+Viral public havolalar (``file_public_view``, ``public_file_download_view``,
+``notice_public_view``) bitta qatorni daqiqasiga minglab marta so'raydi.
+Kesh qatorning ustun qiymatlarini (is_public, is_active, expire_date,
+download_limit, fayl yo'li, title, ...) saqlaydi va obyektni ``from_db``
+orqali qayta quradi — bazaga murojaat yo'q, change tracking ham ishlaydi.
+
+Backend'lar:
+
+* ``DjangoCacheBackend`` — ``CACHES`` dagi istalgan alias (standart: 'hot',
+  file-based; Redis, memcached) — bir nechta worker uchun umumiy;
+* ``LocMemLRUBackend`` — jarayon ichidagi LRU + TTL.
+
+Yozuvlar save/delete signallarida, ``queryset.update()`` yo'llarida (expiry,
+skaner karantini) esa qo'lda o'chiriladi. Umumiy backend'da bu barcha
+worker'larga yetadi — hit bazaga bormaydi. ``LocMemLRUBackend`` va LocMem
+alias'i faqat shu jarayonda o'chadi, shuning uchun u yerda har hitda ruxsat
+ustunlari (``RECHECK_FIELDS``: is_public, is_active, expire_date, updated_at,
+fayl) bazadan tor SELECT bilan tekshiriladi; farq bo'lsa yozuv tashlanadi va
+qator qayta o'qiladi (``HOT_CACHE_RECHECK`` bilan majburlash/o'chirish mumkin).
+Hisoblagichlar (views, downloaded_count) TTL davomida eskirgan bo'lishi
+mumkin — limit tekshiruvi baribir bazadagi shartli UPDATE bilan bo'ladi.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import router, transaction
+from django.db.models.fields.files import FieldFile
+from django.http import Http404
+from django.utils.module_loading import import_string
+
+DEFAULT_TTL = 30
+DEFAULT_MAX_ENTRIES = 10000
+RECHECK_FIELDS = ('is_public', 'is_active', 'expire_date', 'updated_at', 'file')
+
+
+class LocMemLRUBackend:
+    # Invalidatsiya boshqa worker'larga yetmaydi
+    shared = False
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    # Xotiradagi lug'at — kutish yo'q, async variantlar shunchaki o'ralgan
+    async def aget(self, key):
+        return self.get(key)
+
+    async def aset(self, key, value):
+        self.set(key, value)
+
+    async def adelete(self, key):
+        self.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DjangoCacheBackend:
+    def __init__(self, alias='default', ttl=DEFAULT_TTL, **kwargs):
+        self.cache = caches[alias]
+        self.ttl = ttl
+        self.shared = not isinstance(self.cache, LocMemCache)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.ttl)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    async def aget(self, key):
+        return await self.cache.aget(key)
+
+    async def aset(self, key, value):
+        await self.cache.aset(key, value, self.ttl)
+
+    async def adelete(self, key):
+        await self.cache.adelete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class HotCache:
+    def __init__(self, backend, recheck=None):
+        self.backend = backend
+        self.recheck = not getattr(backend, 'shared', False) if recheck is None else recheck
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'stale': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    @staticmethod
+    def key(model, public_id):
+        return f'hot:{model._meta.label_lower}:{public_id}'
+
+    @staticmethod
+    def _row(obj):
+        names, values = [], []
+        for field in obj._meta.concrete_fields:
+            value = getattr(obj, field.attname)
+            if isinstance(value, FieldFile):
+                value = value.name
+            names.append(field.attname)
+            values.append(value)
+        return names, values
+
+    @staticmethod
+    def _recheck_fields(model, names):
+        fields = [field.attname for field in model._meta.concrete_fields if field.name in RECHECK_FIELDS]
+        return [name for name in fields if name in names]
+
+    def _recheck_query(self, model, row):
+        names, values = row
+        fields = self._recheck_fields(model, names)
+        cached = tuple(values[names.index(name)] for name in fields)
+        pk = values[names.index(model._meta.pk.attname)]
+        return model._base_manager.filter(pk=pk).values_list(*fields), cached
+
+    def _from_row(self, model, row):
+        names, values = row
+        return model.from_db(router.db_for_read(model), names, values)
+
+    def _stale(self, key):
+        self._count('stale')
+        self.backend.delete(key)
+
+    def get(self, model, public_id):
+        """Obyekt yoki None (bazada ham yo'q bo'lsa)."""
+        key = self.key(model, public_id)
+        row = self.backend.get(key)
+        if row is not None and self.recheck:
+            query, cached = self._recheck_query(model, row)
+            if query.first() != cached:
+                self._stale(key)
+                row = None
+        if row is not None:
+            self._count('hits')
+            return self._from_row(model, row)
+
+        self._count('misses')
+        obj = model._default_manager.filter(public_id=public_id).first()
+        if obj is not None:
+            self.backend.set(key, self._row(obj))
+        return obj
+
+    async def aget(self, model, public_id):
+        key = self.key(model, public_id)
+        row = await self.backend.aget(key)
+        if row is not None and self.recheck:
+            query, cached = self._recheck_query(model, row)
+            if await query.afirst() != cached:
+                self._stale(key)
+                row = None
+        if row is not None:
+            self._count('hits')
+            return self._from_row(model, row)
+
+        self._count('misses')
+        obj = await model._default_manager.filter(public_id=public_id).afirst()
+        if obj is not None:
+            await self.backend.aset(key, self._row(obj))
+        return obj
+
+    def invalidate(self, model, public_id):
+        if public_id is None:
+            return
+        key = self.key(model, public_id)
+        self._count('invalidations')
+        self.backend.delete(key)
+        # Tranzaksiya ichida eski qatorni qayta keshlab qo'ygan o'quvchilar uchun
+        transaction.on_commit(lambda: self.backend.delete(key))
+
+    async def ainvalidate(self, model, public_id):
+        # Async view'lar autocommit'da (aupdate allaqachon commit bo'lgan) — on_commit kerak emas
+        if public_id is None:
+            return
+        self._count('invalidations')
+        await self.backend.adelete(self.key(model, public_id))
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / total, 4) if total else 0.0
+        if hasattr(self.backend, '__len__'):
+            stats['entries'] = len(self.backend)
+        return stats
+
+
+def _build():
+    path = getattr(settings, 'HOT_CACHE_BACKEND', 'main.hotcache.DjangoCacheBackend')
+    options = dict(getattr(settings, 'HOT_CACHE_OPTIONS', {}))
+    options.setdefault('ttl', getattr(settings, 'HOT_CACHE_TTL', DEFAULT_TTL))
+    return HotCache(import_string(path)(**options), recheck=getattr(settings, 'HOT_CACHE_RECHECK', None))
+
+
+cache = _build()
+
+
+def get_or_404(model, public_id):
+    obj = cache.get(model, public_id)
+    if obj is None:
+        raise Http404(f"{model._meta.verbose_name} topilmadi")
+    return obj
+
+
+async def aget_or_404(model, public_id):
+    obj = await cache.aget(model, public_id)
+    if obj is None:
+        raise Http404(f"{model._meta.verbose_name} topilmadi")
+    return obj
+
+
+def invalidate(model, public_id):
+    cache.invalidate(model, public_id)
+
+
+async def ainvalidate(model, public_id):
+    await cache.ainvalidate(model, public_id)
+
+
+def metrics():
+    return cache.metrics()
@@ -0,0 +1,133 @@
+"""
+Public link sahifalari uchun HTTP kesh: shartli javoblar va Cache-Control.
+
+Notice / UploadedFile sahifasi faqat ``save()`` bo'lganda o'zgaradi
+(hisoblagichlar F() bilan yoziladi, ``updated_at``ga tegmaydi), shuning uchun
+validatorlar ``updated_at``dan olinadi:
+
+    ETag           -- W/"...": model, pk, updated_at, HTTP_CACHE_VERSION va
+                      sahifaga ta'sir qiladigan boshqa holat (limitli faylda
+                      downloaded_count, login qilgan user'da sessiya — sahifada
+                      username va CSRF token bor)
+    Last-Modified  -- updated_at; faqat sahifa boshqa holatga bog'liq bo'lmasa
+
+``If-None-Match`` / ``If-Modified-Since`` mos kelsa 304 — shablon render
+qilinmaydi. Anonim public sahifaning siqilgan tanasi ETag bo'yicha keshlanadi
+(``precompressed()``, main/compression.py). Ko'rishlar hisobi ikki rejimda:
+
+    revalidate (default)  ``public, no-cache`` — proxy/CDN saqlaydi, lekin har
+                          so'rovda origin'dan so'raydi; ko'rish 200 da ham,
+                          304 da ham view ichida sanaladi
+    beacon                ``public, max-age=0, s-maxage=N`` — CDN origin'ga
+                          bormasdan beradi, ko'rishni sahifadagi
+                          ``navigator.sendBeacon`` POST'i sanaydi
+
+Limitli (``download_limit``) obyektlar har doim revalidate — limit har
+ko'rishda band qilinadi. Login qilgan foydalanuvchi va private sahifalar:
+``private, no-cache``.
+
+Sozlamalar (settings.py, ixtiyoriy):
+    HTTP_CACHE_VIEW_BEACON  -- True bo'lsa beacon rejimi, default False
+    HTTP_CACHE_MAX_AGE      -- beacon rejimida CDN kesh muddati, sekund, default 300
+    HTTP_CACHE_VERSION      -- shablonlar o'zgarganda oshiriladi (ETag'ga qo'shiladi)
+"""
+import hashlib
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from main import compression
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def beacon_enabled(obj):
+    """Ko'rish beacon orqali sanaladimi (sahifa CDN'dan berilishi mumkin)."""
+    return (
+        _setting('HTTP_CACHE_VIEW_BEACON', False)
+        and obj.is_public
+        and getattr(obj, 'download_limit', None) is None
+    )
+
+
+def shared_max_age(obj, now=None):
+    """CDN kesh muddati — link muddati tugashidan oshmaydi."""
+    max_age = _setting('HTTP_CACHE_MAX_AGE', 300)
+    if obj.expire_date:
+        left = (obj.expire_date - (now or timezone.now())).total_seconds()
+        max_age = min(max_age, max(int(left), 0))
+    return max_age
+
+
+class PageCache:
+    """
+    Bitta so'rov uchun validatorlar::
+
+        page = PageCache(request, notice)
+        early = page.not_modified()       # 304 — render yo'q
+        ...
+        return page.finish(render(...))
+    """
+
+    def __init__(self, request, obj, *state):
+        self.request = request
+        self.obj = obj
+        user = request.user
+        self.shared = obj.is_public and not user.is_authenticated
+        self.beacon = self.shared and beacon_enabled(obj)
+
+        parts = [
+            obj._meta.label, obj.pk,
+            obj.updated_at.isoformat() if obj.updated_at else '',
+            _setting('HTTP_CACHE_VERSION', 1), self.beacon,
+            *state,
+        ]
+        if user.is_authenticated:
+            # login/logout'da sessiya kaliti (va CSRF token) almashadi
+            parts += [user.pk, request.session.session_key or '']
+        digest = hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()[:32]
+        # Kuchsiz: siqish (GZip) baytlarni o'zgartiradi, mazmun bir xil
+        self.etag = f'W/"{digest}"'
+
+        # If-Modified-Since faqat updated_at'ni biladi — boshqa holat bo'lsa yubormaymiz
+        if self.shared and not state and obj.updated_at:
+            self.last_modified = int(obj.updated_at.timestamp())
+        else:
+            self.last_modified = None
+
+    def not_modified(self):
+        """304 (yoki 412) javob, aks holda None."""
+        if self.request.method not in ('GET', 'HEAD'):
+            return None
+        response = get_conditional_response(self.request, etag=self.etag, last_modified=self.last_modified)
+        if response is not None:
+            self.finish(response)
+        return response
+
+    def precompressed(self):
+        """Shu ETag'ning keshdagi siqilgan tanasi (main/compression.py) yoki None."""
+        if not self.shared:
+            return None
+        response = compression.cached_response(self.request, self.etag)
+        return self.finish(response) if response is not None else None
+
+    def finish(self, response):
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        if not self.shared:
+            patch_cache_control(response, private=True, no_cache=True)
+        elif self.beacon:
+            patch_cache_control(response, public=True, max_age=0, s_maxage=shared_max_age(self.obj))
+        else:
+            patch_cache_control(response, public=True, no_cache=True)
+        # Anonim va login qilgan foydalanuvchi sahifasi har xil (sidebar)
+        patch_vary_headers(response, ('Cookie',))
+        if self.shared and response.status_code == 200:
+            # Bir xil ETag — bir xil bayt: siqilgan tana bir marta hisoblanadi
+            compression.remember(response, self.etag)
+        return response
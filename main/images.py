@@ -0,0 +1,217 @@
+"""
+UploadedImage uchun hosilaviy rasmlar (thumbnail va kenglik variantlari).
+
+Asl rasm bir marta ochiladi va barcha variantlar kattadan kichikka qarab
+ketma-ket kichraytiriladi (har biri oldingisidan), WebP va JPEG sifatida
+yoziladi. Natija mazmun xeshi bo'yicha diskda keshlanadi::
+
+    MEDIA_ROOT/derived/ab/<sha256>/w640.webp
+
+Bir xil rasm ikki marta yuklansa ham variantlar bir marta yaratiladi.
+Generatsiya so'rov yo'lidan tashqarida — ``ProcessPoolExecutor`` ichida
+(commit'dan keyin navbatga qo'yiladi) yoki ``IMAGE_VARIANTS_QUEUE = 'jobs'``
+bo'lsa baza navbatida (main/jobs.py, ``manage.py run_jobs``). Mavjud rasmlar uchun:
+``manage.py generate_image_variants``.
+
+``render_all`` Django'ga bog'liq emas — worker jarayonlarida ham, benchmark
+(benchmarks/image_variants.py) ichida ham to'g'ridan-to'g'ri chaqiriladi.
+"""
+import atexit
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL = 'thumb'
+
+# format -> (Pillow nomi, kengaytma, MIME)
+FORMATS = {
+    'webp': ('WEBP', 'webp', 'image/webp'),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg'),
+}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def variant_specs():
+    """{nom: (max_kenglik, max_balandlik)} — kattadan kichikka tartiblangan."""
+    specs = {
+        f'w{width}': (width, width * 4)
+        for width in _setting('IMAGE_VARIANT_WIDTHS', (320, 640, 1280))
+    }
+    specs[THUMBNAIL] = tuple(_setting('IMAGE_THUMBNAIL_SIZE', (200, 200)))
+    return dict(sorted(specs.items(), key=lambda item: item[1][0], reverse=True))
+
+
+def variant_formats():
+    return tuple(_setting('IMAGE_VARIANT_FORMATS', ('webp', 'jpeg')))
+
+
+def derived_root():
+    return os.path.join(settings.MEDIA_ROOT, _setting('IMAGE_DERIVED_DIR', 'derived'))
+
+
+def variant_dir(digest, root=None):
+    return os.path.join(root or derived_root(), digest[:2], digest)
+
+
+def variant_path(digest, variant, fmt, root=None):
+    return os.path.join(variant_dir(digest, root), f'{variant}.{FORMATS[fmt][1]}')
+
+
+# =========================
+# Generatsiya (Pillow)
+# =========================
+def _open(src_path, largest):
+    from PIL import Image, ImageOps
+
+    img = Image.open(src_path)
+    # JPEG uchun DCT bosqichida kichraytirish — dekodlash bir necha barobar tez.
+    # Kvadrat so'raladi: EXIF burilishidan keyin ham kenglik yetarli bo'ladi
+    side = min(largest)
+    img.draft('RGB', (side, side))
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ('RGB', 'RGBA'):
+        has_alpha = img.mode in ('LA', 'PA') or 'transparency' in img.info
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+    return img
+
+
+def _write(img, path, fmt, quality):
+    from PIL import Image
+
+    pil_format = FORMATS[fmt][0]
+    if pil_format == 'JPEG' and img.mode == 'RGBA':
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        img = background
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            options = {'quality': quality}
+            if pil_format == 'JPEG':
+                options.update(optimize=True, progressive=True)
+            else:
+                options['method'] = 4
+            img.save(fh, pil_format, **options)
+        # Parallel generatsiya bir xil natija beradi — oxirgisi yutadi
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return os.path.getsize(path)
+
+
+def render_all(src_path, digest, specs, formats, quality=80, root=None, force=False):
+    """
+    Bitta rasm uchun barcha variantlar. Mavjudlari o'tkazib yuboriladi
+    (``force`` bo'lmasa). Yozilgan fayllar soni va baytlar qaytadi.
+    """
+    from PIL import Image
+
+    todo = [
+        (name, size) for name, size in specs.items()
+        if force or not all(os.path.exists(variant_path(digest, name, fmt, root)) for fmt in formats)
+    ]
+    if not todo:
+        return 0, 0
+
+    written, total_bytes = 0, 0
+    img = _open(src_path, todo[0][1])
+    try:
+        for name, size in todo:
+            # Kattasidan kichraytirish — har safar asl rasmni qayta o'lchash shart emas
+            img.thumbnail(size, Image.LANCZOS, reducing_gap=3.0)
+            for fmt in formats:
+                total_bytes += _write(img, variant_path(digest, name, fmt, root), fmt, quality)
+                written += 1
+    finally:
+        img.close()
+    return written, total_bytes
+
+
+def render_variant(src_path, digest, variant, fmt, quality=80, root=None):
+    """Bitta variant (keshda yo'q bo'lsa view ichidagi zaxira yo'l)."""
+    from PIL import Image
+
+    size = variant_specs()[variant]
+    img = _open(src_path, size)
+    try:
+        img.thumbnail(size, Image.LANCZOS, reducing_gap=3.0)
+        _write(img, variant_path(digest, variant, fmt, root), fmt, quality)
+    finally:
+        img.close()
+
+
+# =========================
+# Worker pool
+# =========================
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = _setting('IMAGE_VARIANT_WORKERS', None) or os.cpu_count() or 1
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            atexit.register(_executor.shutdown, wait=True)
+        return _executor
+
+
+def job_for(image, force=False):
+    """Pool'ga yuboriladigan argumentlar (pickle qilinadigan)."""
+    return (
+        image.image.path,
+        image.content_hash,
+        variant_specs(),
+        variant_formats(),
+        _setting('IMAGE_VARIANT_QUALITY', 80),
+        derived_root(),
+        force,
+    )
+
+
+def _log_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.error("Rasm variantlarini yaratib bo'lmadi: %s", error)
+
+
+def schedule(image, force=False):
+    """Commit'dan keyin variantlarni navbatga qo'yadi."""
+    if not image.image or not image.content_hash:
+        return
+    if _setting('IMAGE_VARIANTS_QUEUE', 'pool') == 'jobs':
+        # Baza navbati (main/jobs.py): web jarayonida pool yo'q, qayta urinishlar bor
+        from main import tasks
+
+        tasks.generate_image_variants.delay(image.pk, force)
+        return
+    args = job_for(image, force)
+
+    def submit():
+        if not _setting('IMAGE_VARIANTS_ASYNC', True):
+            render_all(*args)
+            return
+        executor().submit(render_all, *args).add_done_callback(_log_failure)
+
+    transaction.on_commit(submit)
+
+
+def has_variants(digest):
+    return all(
+        os.path.exists(variant_path(digest, name, fmt))
+        for name in variant_specs() for fmt in variant_formats()
+    )
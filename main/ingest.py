@@ -0,0 +1,302 @@
+"""
+FileViewLog / FileDownloadLog yozuvlari uchun fon ingestion.
+
+View log yozuvini navbatga qo'yadi va darhol qaytadi; fon oqimi navbatni
+``bulk_create`` bilan partiyalab bazaga yozadi.
+
+Sozlamalar (settings.py, ixtiyoriy):
+    LOG_INGESTION_ASYNC     -- False bo'lsa har bir yozuv darhol create() qilinadi
+    LOG_QUEUE_SIZE          -- navbat sig'imi, default 10000
+    LOG_BATCH_SIZE          -- bitta bulk_create hajmi, default 500
+    LOG_FLUSH_INTERVAL      -- partiya to'lmasa ham shuncha sekundda yoziladi
+    LOG_QUEUE_POLICY        -- navbat to'lganda: 'block', 'drop' yoki 'spill'
+    LOG_QUEUE_BLOCK_TIMEOUT -- 'block' rejimida kutish (sekund), keyin drop
+    LOG_SPILL_PATH          -- 'spill' va flush xatolari uchun JSONL fayl
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def spill_path():
+    return _setting('LOG_SPILL_PATH', os.path.join(settings.BASE_DIR, 'var', 'logs.spill'))
+
+
+class LogPipeline:
+    # model label -> vaqt maydoni
+    TIME_FIELDS = {
+        'main.FileViewLog': 'viewed_at',
+        'main.FileDownloadLog': 'downloaded_at',
+    }
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.stats = defaultdict(float)
+
+    # ---------- kirish ----------
+    def record(self, label, **fields):
+        fields.setdefault(self.TIME_FIELDS[label], timezone.now())
+
+        if not _setting('LOG_INGESTION_ASYNC', True):
+            apps.get_model(label).objects.create(**fields)
+            return
+
+        q = self._ensure_worker()
+        item = (label, fields)
+        try:
+            if _setting('LOG_QUEUE_POLICY', 'block') == 'block':
+                q.put(item, timeout=_setting('LOG_QUEUE_BLOCK_TIMEOUT', 0.05))
+            else:
+                q.put_nowait(item)
+        except queue.Full:
+            self._overflow(item)
+            return
+        self._enqueued(q)
+
+    def record_many(self, label, rows):
+        """
+        Bir so'rovda ko'p yozuv (masalan ZIP to'plam): navbatsiz, bitta
+        ``bulk_create``. Baza xatosida yozuvlar spill faylga tushadi.
+        """
+        time_field = self.TIME_FIELDS[label]
+        now = timezone.now()
+        items = [(label, dict(fields, **{time_field: fields.get(time_field) or now})) for fields in rows]
+        if not items:
+            return 0
+        model = apps.get_model(label)
+        try:
+            model.objects.bulk_create([model(**fields) for _, fields in items])
+        except DatabaseError:
+            logger.exception("Log yozuvlarini yozib bo'lmadi, spill faylga o'tkazildi")
+            self.spill(items)
+            return 0
+        return len(items)
+
+    async def arecord(self, label, **fields):
+        """ASGI view'lar uchun: event loop hech qachon kutmaydi."""
+        fields.setdefault(self.TIME_FIELDS[label], timezone.now())
+
+        if not _setting('LOG_INGESTION_ASYNC', True):
+            await apps.get_model(label).objects.acreate(**fields)
+            return
+
+        q = self._ensure_worker()
+        try:
+            q.put_nowait((label, fields))
+        except queue.Full:
+            # 'block' siyosati kutishi kerak — buni loop'dan tashqarida qilamiz
+            await sync_to_async(self.record, thread_sensitive=False)(label, **fields)
+            return
+        self._enqueued(q)
+
+    def _enqueued(self, q):
+        self.stats['enqueued'] += 1
+        self.stats['max_depth'] = max(self.stats['max_depth'], q.qsize())
+
+    def _overflow(self, item):
+        if _setting('LOG_QUEUE_POLICY', 'block') == 'spill':
+            self.spill([item])
+        else:
+            self.stats['dropped'] += 1
+            logger.warning("Log navbati to'la, yozuv tashlab yuborildi: %s", item[0])
+
+    # ---------- fon oqimi ----------
+    def _ensure_worker(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return self._queue
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._queue = queue.Queue(maxsize=_setting('LOG_QUEUE_SIZE', 10000))
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name='log-ingest', daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.shutdown)
+        return self._queue
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect(block=True)
+            if batch:
+                self._flush(batch)
+                close_old_connections()
+
+    def _collect(self, block):
+        batch_size = _setting('LOG_BATCH_SIZE', 500)
+        deadline = time.monotonic() + _setting('LOG_FLUSH_INTERVAL', 2)
+        batch = []
+        while len(batch) < batch_size:
+            try:
+                if block:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch):
+        started = time.perf_counter()
+        try:
+            written = self.write(batch)
+        except Exception:
+            logger.exception("Log partiyasini yozib bo'lmadi, spill faylga o'tkazildi")
+            self.spill(batch)
+            return 0
+
+        elapsed = time.perf_counter() - started
+        self.stats['flushed'] += written
+        self.stats['flushes'] += 1
+        self.stats['flush_seconds_total'] += elapsed
+        self.stats['last_flush_seconds'] = elapsed
+        return written
+
+    def write(self, batch):
+        """(label, fields) ro'yxatini model bo'yicha bulk_create qiladi."""
+        from main.models import CustomUser, UploadedFile
+
+        grouped = defaultdict(list)
+        for label, fields in batch:
+            grouped[label].append(fields)
+
+        # Navbatda turgan paytda o'chirilgan fayl/userlar FK xatosi bermasin
+        file_ids = {f['file_id'] for rows in grouped.values() for f in rows}
+        user_ids = {f['user_id'] for rows in grouped.values() for f in rows if f.get('user_id')}
+        live_files = set(UploadedFile.objects.filter(pk__in=file_ids).values_list('pk', flat=True))
+        live_users = set(CustomUser.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+
+        written = 0
+        for label, rows in grouped.items():
+            model = apps.get_model(label)
+            objs = []
+            for fields in rows:
+                if fields['file_id'] not in live_files:
+                    continue
+                if fields.get('user_id') not in live_users:
+                    fields = dict(fields, user_id=None)
+                objs.append(model(**fields))
+            model.objects.bulk_create(objs, batch_size=_setting('LOG_BATCH_SIZE', 500))
+            written += len(objs)
+        return written
+
+    def drain(self):
+        """Navbatdagi hamma narsani shu oqimda yozadi (shutdown / buyruq uchun)."""
+        if self._queue is None:
+            return 0
+        written = 0
+        while True:
+            batch = self._collect(block=False)
+            if not batch:
+                return written
+            written += self._flush(batch)
+
+    def shutdown(self):
+        self._stop.set()
+        self.drain()
+
+    # ---------- spill ----------
+    def spill(self, items):
+        path = spill_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._spill_lock, open(path, 'a', encoding='utf-8') as fh:
+            for label, fields in items:
+                fh.write(json.dumps([label, fields], default=str) + '\n')
+        self.stats['spilled'] += len(items)
+
+    def replay_spill(self):
+        path = spill_path()
+        if not os.path.exists(path):
+            return 0
+
+        taken = path + '.%d' % os.getpid()
+        with self._spill_lock:
+            os.replace(path, taken)
+
+        batch_size = _setting('LOG_BATCH_SIZE', 500)
+        batch, written = [], 0
+        with open(taken, encoding='utf-8') as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                label, fields = json.loads(line)
+                time_field = self.TIME_FIELDS[label]
+                fields[time_field] = parse_datetime(fields[time_field])
+                batch.append((label, fields))
+                if len(batch) >= batch_size:
+                    written += self.write(batch)
+                    batch = []
+        if batch:
+            written += self.write(batch)
+        os.remove(taken)
+        return written
+
+    # ---------- metrikalar ----------
+    def metrics(self):
+        flushes = self.stats['flushes']
+        return {
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'queue_max_depth': int(self.stats['max_depth']),
+            'enqueued': int(self.stats['enqueued']),
+            'flushed': int(self.stats['flushed']),
+            'dropped': int(self.stats['dropped']),
+            'spilled': int(self.stats['spilled']),
+            'flushes': int(flushes),
+            'last_flush_seconds': self.stats['last_flush_seconds'],
+            'avg_flush_seconds': self.stats['flush_seconds_total'] / flushes if flushes else 0.0,
+        }
+
+
+pipeline = LogPipeline()
+
+
+def _user_id(user):
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def log_view(file, user=None):
+    pipeline.record('main.FileViewLog', file_id=file.pk, user_id=_user_id(user))
+
+
+def log_download(file, user=None):
+    pipeline.record('main.FileDownloadLog', file_id=file.pk, user_id=_user_id(user))
+
+
+def log_downloads(files, user=None):
+    user_id = _user_id(user)
+    return pipeline.record_many('main.FileDownloadLog', [{'file_id': f.pk, 'user_id': user_id} for f in files])
+
+
+async def alog_view(file, user=None):
+    await pipeline.arecord('main.FileViewLog', file_id=file.pk, user_id=_user_id(user))
+
+
+async def alog_download(file, user=None):
+    await pipeline.arecord('main.FileDownloadLog', file_id=file.pk, user_id=_user_id(user))
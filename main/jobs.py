@@ -0,0 +1,301 @@
+"""
+Baza ustidagi fon vazifalari navbati (tashqi broker yo'q).
+
+    @jobs.task(max_attempts=3)
+    def inspect_upload(file_id): ...
+
+    inspect_upload.delay(file.pk)      # Job qatori — joriy tranzaksiya bilan birga commit
+    inspect_upload(file.pk)            # oddiy chaqiruv ham ishlaydi
+
+Worker: ``manage.py run_jobs --processes 4``. Vazifa olish (claim):
+
+    PostgreSQL / MySQL  ``SELECT ... FOR UPDATE SKIP LOCKED`` — workerlar bir-birini
+                        kutmaydi, har biri boshqa qatorlarni oladi
+    SQLite              shartli ``UPDATE ... WHERE status='queued'`` + claim tokeni —
+                        yozuvchi bitta, qator ikki marta olinmaydi
+
+Xato bo'lsa ``run_at`` eksponensial backoff (jitter bilan) qadar suriladi;
+``max_attempts`` tugasa status ``dead`` (dead-letter, ``run_jobs --requeue-dead``).
+``JOB_LOCK_TIMEOUT`` dan uzoq ``running`` qolgan qator (worker o'lgan) qaytadan
+navbatga qo'yiladi. Bajarilganlar ``JOB_RETENTION_HOURS`` dan keyin o'chiriladi.
+
+Sozlamalar (settings.py, ixtiyoriy):
+    JOBS_EAGER           -- True bo'lsa navbatsiz: commit'dan keyin shu jarayonda
+    JOB_MAX_ATTEMPTS     -- default 5
+    JOB_BACKOFF_BASE     -- birinchi qayta urinish, sekund, default 5
+    JOB_BACKOFF_MAX      -- backoff chegarasi, sekund, default 3600
+    JOB_LOCK_TIMEOUT     -- sekund, default 600
+    JOB_RETENTION_HOURS  -- default 24
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from functools import update_wrapper
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+# Shu jarayondagi worker statistikasi (run_jobs chiqaradi)
+stats = defaultdict(float)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ---------- vazifalar ----------
+class Task:
+    def __init__(self, func, name, max_attempts=None):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        update_wrapper(self, func)
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return enqueue(self.name, args, kwargs, max_attempts=self.max_attempts)
+
+    def delay_in(self, seconds, *args, **kwargs):
+        return enqueue(self.name, args, kwargs, max_attempts=self.max_attempts, countdown=seconds)
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """Funksiyani navbat vazifasiga aylantiradi: ``.delay(*args)`` bilan navbatga."""
+    def register(func):
+        wrapped = Task(func, name or f'{func.__module__}.{func.__qualname__}', max_attempts)
+        _registry[wrapped.name] = wrapped
+        return wrapped
+    return register(func) if func is not None else register
+
+
+def get_task(name):
+    if name not in _registry:
+        # Worker jarayonida modul hali import qilinmagan bo'lishi mumkin
+        import_string(name)
+    return _registry[name]
+
+
+def enqueue(name, args=(), kwargs=None, max_attempts=None, countdown=0):
+    """Job qatori (yoki JOBS_EAGER'da commit'dan keyin darhol bajarish)."""
+    from main.models import Job
+
+    args, kwargs = list(args), dict(kwargs or {})
+    if _setting('JOBS_EAGER', False):
+        transaction.on_commit(lambda: get_task(name).func(*args, **kwargs))
+        return None
+    return Job.objects.create(
+        name=name,
+        payload={'args': args, 'kwargs': kwargs},
+        max_attempts=max_attempts or _setting('JOB_MAX_ATTEMPTS', 5),
+        run_at=timezone.now() + timedelta(seconds=countdown),
+    )
+
+
+def backoff(attempts):
+    """n-urinishdan keyingi kutish: base * 2^(n-1), chegaralangan, yarmi tasodifiy."""
+    delay = min(_setting('JOB_BACKOFF_BASE', 5) * 2 ** max(attempts - 1, 0), _setting('JOB_BACKOFF_MAX', 3600))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+# ---------- claim ----------
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'[:48]
+
+
+def claim(worker=None, limit=10):
+    """Tayyor vazifalardan ``limit`` tasini oladi (status=running, attempts+1)."""
+    from main.models import Job
+
+    now = timezone.now()
+    token = f'{worker or worker_name()}:{uuid.uuid4().hex[:8]}'
+    ready = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).order_by('run_at', 'id')
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(ready.select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit])
+            if not ids:
+                return []
+            Job.objects.filter(pk__in=ids).update(
+                status=Job.RUNNING, locked_by=token, locked_at=now, attempts=F('attempts') + 1,
+            )
+    else:
+        ids = list(ready.values_list('pk', flat=True)[:limit])
+        if not ids:
+            return []
+        # Boshqa worker ulgurgan qatorlar status sharti bilan tushib qoladi
+        Job.objects.filter(pk__in=ids, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=token, locked_at=now, attempts=F('attempts') + 1,
+        )
+    return list(Job.objects.filter(locked_by=token, status=Job.RUNNING).order_by('run_at', 'id'))
+
+
+# ---------- bajarish ----------
+def _fail(job, error):
+    from main.models import Job
+
+    now = timezone.now()
+    if job.attempts >= job.max_attempts:
+        job.status = Job.DEAD
+        fields = {'status': Job.DEAD, 'finished_at': now}
+        stats['dead_lettered'] += 1
+        logger.error("Vazifa dead-letter'ga tushdi: %s #%s (%s urinish)", job.name, job.pk, job.attempts)
+    else:
+        job.status = Job.QUEUED
+        fields = {'status': Job.QUEUED, 'run_at': now + timedelta(seconds=backoff(job.attempts))}
+        stats['retried'] += 1
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        locked_by='', locked_at=None, last_error=error[-4000:], **fields,
+    )
+
+
+def execute(job):
+    """Bitta claim qilingan vazifa; True — muvaffaqiyatli."""
+    from main.models import Job
+
+    started = time.perf_counter()
+    payload = job.payload or {}
+    try:
+        get_task(job.name).func(*payload.get('args', []), **payload.get('kwargs', {}))
+    except Exception:
+        stats['failed'] += 1
+        logger.warning("Vazifa xato bilan tugadi: %s #%s", job.name, job.pk, exc_info=True)
+        _fail(job, traceback.format_exc())
+        return False
+    finally:
+        stats['seconds'] += time.perf_counter() - started
+
+    job.status = Job.DONE
+    Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        status=Job.DONE, finished_at=timezone.now(), locked_by='', locked_at=None, last_error='',
+    )
+    stats['processed'] += 1
+    return True
+
+
+def run_pending(worker=None, batch_size=10, max_jobs=None):
+    """Tayyor vazifalar tugaguncha bajaradi (testlar, ``run_jobs --once``)."""
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        jobs = claim(worker, batch_size if max_jobs is None else min(batch_size, max_jobs - done))
+        if not jobs:
+            break
+        for job in jobs:
+            execute(job)
+            done += 1
+    return done
+
+
+# ---------- texnik xizmat ----------
+def requeue_stale(now=None):
+    """Worker o'lgan: JOB_LOCK_TIMEOUT'dan uzoq running — qaytadan navbatga yoki dead."""
+    from main.models import Job
+
+    now = now or timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - timedelta(seconds=_setting('JOB_LOCK_TIMEOUT', 600)))
+    error = "Lock timeout: worker javob bermadi"
+    dead = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.DEAD, locked_by='', locked_at=None, finished_at=now, last_error=error,
+    )
+    requeued = stale.update(status=Job.QUEUED, locked_by='', locked_at=None, run_at=now, last_error=error)
+    return requeued, dead
+
+
+def purge_finished(now=None, batch_size=1000):
+    from main.models import Job
+
+    cutoff = (now or timezone.now()) - timedelta(hours=_setting('JOB_RETENTION_HOURS', 24))
+    deleted = 0
+    while True:
+        ids = list(Job.objects.filter(status=Job.DONE, finished_at__lt=cutoff).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += Job.objects.filter(pk__in=ids).delete()[0]
+
+
+def requeue_dead(name=None):
+    """Dead-letter'dagilarni qaytadan (urinishlar nolga)."""
+    from main.models import Job
+
+    qs = Job.objects.filter(status=Job.DEAD)
+    if name:
+        qs = qs.filter(name=name)
+    return qs.update(status=Job.QUEUED, attempts=0, run_at=timezone.now(), finished_at=None)
+
+
+# ---------- worker ----------
+class Worker:
+    MAINTENANCE_INTERVAL = 60
+
+    def __init__(self, batch_size=10, poll_interval=1.0, name=None):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.name = name or worker_name()
+        self.stopping = threading.Event()
+        self._maintained = 0.0
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def _maintain(self):
+        if time.monotonic() - self._maintained < self.MAINTENANCE_INTERVAL:
+            return
+        self._maintained = time.monotonic()
+        requeued, dead = requeue_stale()
+        purged = purge_finished()
+        if requeued or dead or purged:
+            logger.info("Jobs: qaytadan %s, dead %s, o'chirildi %s", requeued, dead, purged)
+
+    def run(self):
+        while not self.stopping.is_set():
+            try:
+                self._maintain()
+                jobs = claim(self.name, self.batch_size)
+            except Exception:
+                logger.exception("Navbatdan vazifa olib bo'lmadi")
+                jobs = []
+            finally:
+                close_old_connections()
+            if not jobs:
+                self.stopping.wait(self.poll_interval)
+                continue
+            # Boshlangan partiya oxirigacha bajariladi (SIGTERM'da ham)
+            for job in jobs:
+                execute(job)
+                close_old_connections()
+
+
+# ---------- metrikalar ----------
+def metrics():
+    """Navbat holati (barcha workerlar bo'yicha, bazadan)."""
+    from main.models import Job
+
+    now = timezone.now()
+    counts = dict(Job.objects.values_list('status').annotate(n=Count('pk')).order_by())
+    oldest = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).aggregate(m=Min('run_at'))['m']
+    recent = Job.objects.filter(finished_at__gte=now - timedelta(minutes=1)).values_list('status').annotate(n=Count('pk')).order_by()
+    recent = dict(recent)
+    return {
+        'queued': counts.get(Job.QUEUED, 0),
+        'running': counts.get(Job.RUNNING, 0),
+        'done': counts.get(Job.DONE, 0),
+        'dead': counts.get(Job.DEAD, 0),
+        'oldest_ready_seconds': round((now - oldest).total_seconds(), 3) if oldest else 0.0,
+        'completed_last_minute': recent.get(Job.DONE, 0),
+        'dead_last_minute': recent.get(Job.DEAD, 0),
+    }
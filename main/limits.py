@@ -0,0 +1,118 @@
+"""
+Download / ko'rish limitlari.
+
+Limitni Python'da solishtirib keyin alohida UPDATE qilish o'rniga bitta
+shartli UPDATE ishlatiladi::
+
+    UPDATE ... SET downloaded_count = downloaded_count + 1
+    WHERE id = %s AND (download_limit IS NULL OR downloaded_count < download_limit)
+
+Ta'sirlangan qatorlar soni 1 bo'lsa joy band qilindi, 0 bo'lsa limit tugagan.
+Tekshirish va oshirish bitta so'rovda bo'lgani uchun parallel so'rovlar
+limitdan oshib keta olmaydi. Band qilingan oshirish egasining ``UserStats``
+ustuniga ham shu tranzaksiyada qo'shiladi (main/userstats.py).
+"""
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import F, Q
+
+from main import counters, userstats
+
+
+def reserve(model, pk, counter_field, limit_field='download_limit', amount=1):
+    """Bitta round-trip: True — band qilindi, False — limit tugagan."""
+    updated = model._base_manager.filter(pk=pk).filter(
+        Q(**{f'{limit_field}__isnull': True})
+        | Q(**{f'{counter_field}__lte': F(limit_field) - amount})
+    ).update(**{counter_field: F(counter_field) + amount})
+    return updated == 1
+
+
+async def areserve(model, pk, counter_field, limit_field='download_limit', amount=1):
+    """``reserve`` ning async (aupdate) varianti."""
+    updated = await model._base_manager.filter(pk=pk).filter(
+        Q(**{f'{limit_field}__isnull': True})
+        | Q(**{f'{counter_field}__lte': F(limit_field) - amount})
+    ).aupdate(**{counter_field: F(counter_field) + amount})
+    return updated == 1
+
+
+def available(model, pk, counter_field, limit_field='download_limit'):
+    """Band qilmasdan: limit hali tugamaganmi (bazadagi qiymat bo'yicha)."""
+    return model._base_manager.filter(pk=pk).filter(
+        Q(**{f'{limit_field}__isnull': True})
+        | Q(**{f'{counter_field}__lt': F(limit_field)})
+    ).exists()
+
+
+async def aavailable(model, pk, counter_field, limit_field='download_limit'):
+    return await model._base_manager.filter(pk=pk).filter(
+        Q(**{f'{limit_field}__isnull': True})
+        | Q(**{f'{counter_field}__lt': F(limit_field)})
+    ).aexists()
+
+
+def _reserve_counted(obj, counter_field, limit_field):
+    # Limitli yo'l buferdan o'tmaydi — UserStats deltasi shu yerda qo'shiladi
+    with transaction.atomic():
+        if not reserve(type(obj), obj.pk, counter_field, limit_field):
+            return False
+        stat = userstats.counter_field(obj, counter_field)
+        if stat:
+            userstats.add(obj.owner_id, **{stat: 1})
+    return True
+
+
+def _reserve_or_count(obj, counter_field, limit_field='download_limit'):
+    # Limitsiz obyektlar uchun aniq tartib shart emas -> buferlangan hisoblagich
+    if getattr(obj, limit_field) is None:
+        counters.incr(obj, counter_field)
+        return True
+
+    if not _reserve_counted(obj, counter_field, limit_field):
+        return False
+    setattr(obj, counter_field, getattr(obj, counter_field) + 1)
+    return True
+
+
+async def _areserve_or_count(obj, counter_field, limit_field='download_limit'):
+    if getattr(obj, limit_field) is None:
+        await counters.aincr(obj, counter_field)
+        return True
+
+    # Ikki UPDATE bitta tranzaksiyada — async ORM'da atomic yo'q
+    if not await sync_to_async(_reserve_counted)(obj, counter_field, limit_field):
+        return False
+    setattr(obj, counter_field, getattr(obj, counter_field) + 1)
+    return True
+
+
+def reserve_file_download(file):
+    """UploadedFile.download_limit bo'yicha yuklab olishni band qiladi."""
+    return _reserve_or_count(file, 'downloaded_count')
+
+
+def reserve_notice_view(notice):
+    """Notice.download_limit — public link orqali nechta ko'rish mumkinligi."""
+    return _reserve_or_count(notice, 'public_views')
+
+
+async def areserve_file_download(file):
+    return await _areserve_or_count(file, 'downloaded_count')
+
+
+async def areserve_notice_view(notice):
+    return await _areserve_or_count(notice, 'public_views')
+
+
+def download_available(file):
+    """HEAD / davom ettirish: limitli faylda joy qolganmi (band qilmaydi)."""
+    if file.download_limit is None:
+        return True
+    return available(type(file), file.pk, 'downloaded_count')
+
+
+async def adownload_available(file):
+    if file.download_limit is None:
+        return True
+    return await aavailable(type(file), file.pk, 'downloaded_count')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from main import counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Buferdagi hisoblagichlarni bazaga yozadi. Worker'lar to'xtatilgandan "
+        "keyin ishga tushiring: ular yozolmay qoldirgan spool fayl ham qo'llanadi."
+    )
+
+    def handle(self, *args, **options):
+        spooled = counters.buffer.load_spool()
+        flushed = counters.flush()
+        self.stdout.write(self.style.SUCCESS(
+            f"Spool: {spooled} ta yozuv, flush: {flushed} ta oshirish"
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from main import ingest
+
+
+class Command(BaseCommand):
+    help = (
+        "Spill fayldagi FileViewLog/FileDownloadLog yozuvlarini bulk_create "
+        "bilan bazaga qayta yozadi va navbat metrikalarini ko'rsatadi."
+    )
+
+    def handle(self, *args, **options):
+        replayed = ingest.pipeline.replay_spill()
+        drained = ingest.pipeline.drain()
+        self.stdout.write(self.style.SUCCESS(
+            f"Spill: {replayed} ta yozuv, navbat: {drained} ta yozuv"
+        ))
+        for name, value in ingest.pipeline.metrics().items():
+            self.stdout.write(f"  {name}: {value}")
@@ -0,0 +1,89 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from main import storage
+from main.models import Blob, UploadedFile
+
+
+class Command(BaseCommand):
+    help = (
+        "Blob refcount'larini UploadedFile qatorlaridan qayta hisoblaydi va "
+        "hech kim ishora qilmaydigan (yetim) blob fayllarni o'chiradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Faqat hisobot, hech narsa o'chirilmaydi")
+        parser.add_argument(
+            '--grace-minutes', type=int, default=60,
+            help="Shundan yangi fayllarga tegilmaydi (yuklanish jarayonidagi blob'lar)",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        grace = options['grace_minutes'] * 60
+        cutoff = time.time() - grace
+
+        # 1) Refcount drift: haqiqiy havolalar soni
+        actual = dict(
+            UploadedFile.objects.filter(file__startswith=storage.BLOB_PREFIX)
+            .values_list('file').annotate(n=Count('id')).values_list('file', 'n')
+        )
+        fixed = 0
+        for blob in Blob.objects.all().iterator():
+            expected = actual.pop(blob.name, 0)
+            if blob.refcount != expected:
+                fixed += 1
+                self.stdout.write(f"  refcount {blob.name}: {blob.refcount} -> {expected}")
+                if not dry_run:
+                    Blob.objects.filter(pk=blob.pk).update(refcount=expected)
+        for name, expected in actual.items():
+            # Qatori bor, Blob yozuvi yo'q
+            fixed += 1
+            self.stdout.write(f"  blob yozuvi yo'q: {name} ({expected})")
+            if not dry_run and storage.file_storage.exists(name):
+                Blob.objects.create(
+                    name=name,
+                    digest=storage.digest_from_name(name),
+                    size=storage.file_storage.size(name),
+                    refcount=expected,
+                )
+
+        # 2) refcount = 0 bo'lgan yozuvlar (grace'dan yangilari keyingi safar)
+        removed_rows = 0
+        for name in Blob.objects.filter(refcount__lte=0).values_list('name', flat=True).iterator():
+            if dry_run or storage.collect(name, grace):
+                removed_rows += 1
+
+        # 3) Diskdagi, bazada umuman yo'q fayllar
+        known = set(Blob.objects.values_list('name', flat=True))
+        root = storage.file_storage.path(storage.BLOB_PREFIX)
+        orphans, orphan_bytes = 0, 0
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, storage.file_storage.location).replace(os.sep, '/')
+                if name in known or os.path.getmtime(path) > cutoff:
+                    continue
+                if name.endswith(storage.TOMBSTONE_SUFFIX):
+                    # Uzilib qolgan collect(); ctime — rename vaqti
+                    if os.path.getctime(path) > cutoff:
+                        continue
+                    size = os.path.getsize(path)
+                    if not dry_run:
+                        os.unlink(path)
+                else:
+                    size = os.path.getsize(path)
+                    if not dry_run and not storage.collect(name, grace):
+                        continue
+                orphans += 1
+                orphan_bytes += size
+                self.stdout.write(f"  yetim: {name}")
+
+        prefix = "[dry-run] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}refcount tuzatildi: {fixed}, bo'sh yozuvlar: {removed_rows}, "
+            f"yetim fayllar: {orphans} ({orphan_bytes} bayt)"
+        ))
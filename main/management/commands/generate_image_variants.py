@@ -0,0 +1,85 @@
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from main import images
+from main.delivery import sha256_of
+from main.models import UploadedImage
+
+
+class Command(BaseCommand):
+    help = (
+        "Mavjud UploadedImage'lar uchun content_hash va thumbnail/kenglik "
+        "variantlarini yaratadi (backfill). Tayyorlari o'tkazib yuboriladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Jarayonlar soni (default: CPU soni)")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Bir martada o'qiladigan qatorlar")
+        parser.add_argument('--force', action='store_true', help="Mavjud variantlarni ham qayta yaratish")
+        parser.add_argument('--prune', action='store_true', help="Hech bir rasmga tegishli bo'lmagan variantlarni o'chirish")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        # 1) content_hash yo'q eski yozuvlar
+        hashed = 0
+        missing = UploadedImage.objects.filter(content_hash='').exclude(image='')
+        for image in missing.iterator(chunk_size=options['chunk_size']):
+            try:
+                digest = sha256_of(image.image)
+            except FileNotFoundError:
+                self.stderr.write(f"  fayl yo'q: #{image.pk} {image.image.name}")
+                continue
+            UploadedImage.objects.filter(pk=image.pk).update(content_hash=digest)
+            hashed += 1
+
+        # 2) Variantlar: bir xil xeshli rasmlar bir marta ishlanadi
+        jobs = {}
+        queryset = UploadedImage.objects.exclude(content_hash='').exclude(image='').only('id', 'image', 'content_hash')
+        for image in queryset.iterator(chunk_size=options['chunk_size']):
+            if image.content_hash in jobs:
+                continue
+            if not options['force'] and images.has_variants(image.content_hash):
+                continue
+            if not os.path.exists(image.image.path):
+                self.stderr.write(f"  fayl yo'q: #{image.pk} {image.image.name}")
+                continue
+            jobs[image.content_hash] = images.job_for(image, force=options['force'])
+
+        done, failed, written, total_bytes = 0, 0, 0, 0
+        if jobs:
+            with ProcessPoolExecutor(max_workers=options['workers'] or os.cpu_count()) as pool:
+                futures = {pool.submit(images.render_all, *args): digest for digest, args in jobs.items()}
+                for future in as_completed(futures):
+                    try:
+                        files, size = future.result()
+                    except Exception as error:
+                        failed += 1
+                        self.stderr.write(f"  xato {futures[future][:12]}: {error}")
+                        continue
+                    done += 1
+                    written += files
+                    total_bytes += size
+                    if done % 100 == 0:
+                        self.stdout.write(f"  {done}/{len(jobs)}")
+
+        # 3) Yetim variant kataloglari
+        pruned = 0
+        if options['prune']:
+            known = set(UploadedImage.objects.exclude(content_hash='').values_list('content_hash', flat=True))
+            root = images.derived_root()
+            for prefix in os.listdir(root) if os.path.isdir(root) else []:
+                for digest in os.listdir(os.path.join(root, prefix)):
+                    if digest not in known:
+                        shutil.rmtree(os.path.join(root, prefix, digest), ignore_errors=True)
+                        pruned += 1
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"xesh: {hashed}, rasm: {done} (xato {failed}), variant fayllar: {written} "
+            f"({total_bytes} bayt), o'chirildi: {pruned}, {elapsed:.1f}s"
+        ))
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "N kundan eski va rollup'ga kirgan FileViewLog/FileDownloadLog "
+        "qatorlarini kichik bo'laklarda o'chiradi (ixtiyoriy gzip arxiv)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'LOG_RETENTION_DAYS', 90))
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Bitta DELETE'dagi qatorlar")
+        parser.add_argument('--archive', default=None, help="O'chirishdan oldin yoziladigan .jsonl.gz fayl")
+        parser.add_argument('--pause', type=float, default=0.0, help="Bo'laklar orasida kutish (soniya)")
+        parser.add_argument('--source', choices=sorted(rollups.SOURCES), default=None)
+
+    def handle(self, *args, **options):
+        # Avval rollup — o'chiriladigan qatorlar statistikadan yo'qolmasin
+        rollups.run()
+        sources = [options['source']] if options['source'] else list(rollups.SOURCES)
+        for source in sources:
+            deleted = rollups.prune(
+                source,
+                options['days'],
+                chunk_size=options['chunk_size'],
+                archive=options['archive'],
+                pause=options['pause'],
+            )
+            self.stdout.write(self.style.SUCCESS(f"{source}: {deleted} ta qator o'chirildi"))
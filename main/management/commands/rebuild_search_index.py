@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from main import search
+from main.models import Notice, UploadedFile
+
+
+class Command(BaseCommand):
+    help = (
+        "Qidiruv indeksini qaytadan quradi. Qatorlar id bo'yicha bo'laklab "
+        "o'qiladi va har bir bo'lak alohida tranzaksiyada yoziladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--kind', choices=[search.NOTICE, search.FILE])
+
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        chunk_size = options['chunk_size']
+        kinds = [options['kind']] if options['kind'] else [search.NOTICE, search.FILE]
+
+        for kind in kinds:
+            started = time.monotonic()
+            backend.clear(kind)
+            total = 0
+            for documents in self._chunks(kind, chunk_size):
+                with transaction.atomic():
+                    backend.index_many(documents)
+                total += len(documents)
+                self.stdout.write(f"  {kind}: {total}", ending='\r')
+            self.stdout.write(self.style.SUCCESS(
+                f"{kind}: {total} ta yozuv, {time.monotonic() - started:.1f}s"
+            ))
+
+    def _chunks(self, kind, chunk_size):
+        if kind == search.NOTICE:
+            qs = Notice.objects.values_list('id', 'owner_id', 'is_public', 'title', 'main_text')
+        else:
+            qs = UploadedFile.objects.values_list('id', 'owner_id', 'is_public', 'title')
+
+        # OFFSET emas, id bo'yicha keyset — millionlab qatorda ham bir tekis
+        last_id = 0
+        while True:
+            rows = list(qs.filter(id__gt=last_id).order_by('id')[:chunk_size])
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            if kind == search.NOTICE:
+                yield [(kind, r[0], r[1], r[2], r[3], r[4]) for r in rows]
+            else:
+                yield [(kind, r[0], r[1], r[2], r[3], '') for r in rows]
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from main import counters, userstats
+
+
+class Command(BaseCommand):
+    help = (
+        "UserStats qatorlarini UploadedFile / Notice'dan bo'laklab qayta hisoblaydi, "
+        "farqni (drift) ko'rsatadi va tuzatadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Bir tranzaksiyadagi foydalanuvchilar soni")
+        parser.add_argument('--dry-run', action='store_true', help="Faqat hisobot, tuzatmaydi")
+
+    def handle(self, *args, **options):
+        # Shu jarayonda yozilmagan hisoblagichlar solishtirishga xalal bermasin
+        counters.flush()
+        report = userstats.reconcile(options['batch_size'], fix=not options['dry_run'])
+
+        prefix = "[dry-run] " if options['dry_run'] else ""
+        self.stdout.write(
+            f"{prefix}Foydalanuvchilar: {report['users']}, farqli: {report['drifted']}, "
+            f"qatori yo'q: {report['missing']}"
+        )
+        drift = ', '.join(f"{field}: {value}" for field, value in report['drift'].items() if value)
+        if drift:
+            self.stdout.write(f"{prefix}Farq (mutlaq yig'indi): {drift}")
+            for sample in report['samples']:
+                self.stdout.write(f"  {sample}")
+
+        style = self.style.WARNING if report['drifted'] or report['missing'] else self.style.SUCCESS
+        action = "topildi" if options['dry_run'] else "tuzatildi"
+        self.stdout.write(style(f"{prefix}Drift {action}: {report['drifted'] + report['missing']} ta foydalanuvchi"))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "FileViewLog/FileDownloadLog'ning yangi qatorlarini (watermark'dan keyin) "
+        "soatlik va kunlik rollup jadvallariga qo'shadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Bir tranzaksiyadagi id oralig'i")
+        parser.add_argument('--lag-seconds', type=int, default=None, help="Shundan yangi qatorlar keyinga qoldiriladi")
+        parser.add_argument('--loop', type=int, default=0, metavar='SECONDS', help="Har N soniyada qayta ishga tushirish")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = rollups.run(options['batch_size'], options['lag_seconds'])
+            summary = ', '.join(f"{source}: {count}" for source, count in processed.items())
+            self.stdout.write(self.style.SUCCESS(f"Rollup: {summary}"))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
@@ -0,0 +1,87 @@
+import multiprocessing
+import signal
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from main import jobs
+
+
+def _work(batch_size, poll_interval, index):
+    # fork'dan keyin ota jarayonning ulanishlari ishlatilmaydi
+    connections.close_all()
+    worker = jobs.Worker(batch_size=batch_size, poll_interval=poll_interval, name=f'{jobs.worker_name()}-{index}')
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    started = time.monotonic()
+    worker.run()
+    _report(worker.name, started)
+
+
+def _report(name, started):
+    elapsed = max(time.monotonic() - started, 1e-9)
+    sys.stdout.write(
+        f"{name}: bajarildi {jobs.stats['processed']:.0f}, xato {jobs.stats['failed']:.0f}, "
+        f"qayta {jobs.stats['retried']:.0f}, dead {jobs.stats['dead_lettered']:.0f}, "
+        f"{jobs.stats['processed'] / elapsed:.1f} vazifa/s\n"
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Fon vazifalari worker'i: Job navbatidan vazifalarni olib bajaradi "
+        "(qayta urinish, backoff, dead-letter)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help="Parallel worker jarayonlari")
+        parser.add_argument('--batch-size', type=int, default=10, help="Bir claim'dagi vazifalar")
+        parser.add_argument('--poll', type=float, default=1.0, help="Navbat bo'sh bo'lsa kutish (sekund)")
+        parser.add_argument('--once', action='store_true', help="Tayyor vazifalarni bajarib chiqish")
+        parser.add_argument('--requeue-dead', action='store_true', help="Dead-letter'dagilarni qaytadan navbatga")
+        parser.add_argument('--stats', action='store_true', help="Navbat holatini ko'rsatish")
+
+    def handle(self, *args, **options):
+        if options['requeue_dead']:
+            self.stdout.write(self.style.SUCCESS(f"Qaytadan navbatga: {jobs.requeue_dead()}"))
+            return
+        if options['stats']:
+            for key, value in jobs.metrics().items():
+                self.stdout.write(f"{key}: {value}")
+            return
+
+        if options['once']:
+            started = time.monotonic()
+            jobs.requeue_stale()
+            done = jobs.run_pending(batch_size=options['batch_size'])
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"Bajarildi: {done} ({jobs.stats['failed']:.0f} xato, {jobs.stats['dead_lettered']:.0f} dead), "
+                f"{done / elapsed if elapsed else 0:.1f} vazifa/s"
+            ))
+            return
+
+        processes = max(options['processes'], 1)
+        if processes == 1:
+            _work(options['batch_size'], options['poll'], 0)
+            return
+
+        connections.close_all()
+        children = [
+            multiprocessing.Process(target=_work, args=(options['batch_size'], options['poll'], i), daemon=False)
+            for i in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        def forward(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for child in children:
+            child.join()
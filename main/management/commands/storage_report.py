@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+
+from main import storage
+from main.models import Blob, UploadedFile
+
+
+def _human(n):
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if abs(n) < 1024 or unit == 'TB':
+            return f"{n:.1f} {unit}" if unit != 'B' else f"{n} B"
+        n /= 1024
+
+
+class Command(BaseCommand):
+    help = "Deduplikatsiya tufayli tejalgan disk hajmi haqida hisobot."
+
+    def handle(self, *args, **options):
+        blob_files = UploadedFile.objects.filter(file__startswith=storage.BLOB_PREFIX)
+        logical = blob_files.aggregate(n=Count('id'), total=Sum('size'))
+        physical = Blob.objects.filter(refcount__gt=0).aggregate(n=Count('id'), total=Sum('size'))
+        legacy = UploadedFile.objects.exclude(file__startswith=storage.BLOB_PREFIX).exclude(file='') \
+            .exclude(file__isnull=True).aggregate(n=Count('id'), total=Sum('size'))
+
+        logical_bytes = logical['total'] or 0
+        physical_bytes = physical['total'] or 0
+        saved = logical_bytes - physical_bytes
+        ratio = (logical_bytes / physical_bytes) if physical_bytes else 1.0
+
+        self.stdout.write(f"Blob'dagi fayllar:   {logical['n']} ta, {_human(logical_bytes)}")
+        self.stdout.write(f"Diskdagi blob'lar:   {physical['n']} ta, {_human(physical_bytes)}")
+        self.stdout.write(f"Eski (dedupsiz):     {legacy['n']} ta, {_human(legacy['total'] or 0)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Tejalgan joy: {_human(saved)} (dedup nisbati {ratio:.2f}x)"
+        ))
+
+        top = Blob.objects.filter(refcount__gt=1).order_by('-refcount')[:10]
+        if top:
+            self.stdout.write("Eng ko'p ulashilgan blob'lar:")
+            for blob in top:
+                self.stdout.write(f"  {blob.refcount:>5} × {_human(blob.size):>10}  {blob.name}")
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main import expiry
+from main.models import Notice, UploadedFile
+
+
+class Command(BaseCommand):
+    help = (
+        "Muddati o'tgan Notice va UploadedFile'larni partiyalab nofaol qiladi "
+        "(is_active=False), ixtiyoriy ravishda fayllar egallagan joyni bo'shatadi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--reclaim-storage', action='store_true',
+            help="Muddati o'tgan fayllarning blob havolasini bo'shatish (oxirgisi bo'lsa diskdan o'chadi)",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Faqat hisobot")
+        parser.add_argument('--loop', type=int, default=0, metavar='SECONDS', help="Har N soniyada qayta ishga tushirish")
+
+    def handle(self, *args, **options):
+        prefix = "[dry-run] " if options['dry_run'] else ""
+        while True:
+            for model in (Notice, UploadedFile):
+                deactivated, reclaimed = expiry.sweep(
+                    model,
+                    batch_size=options['batch_size'],
+                    reclaim=options['reclaim_storage'],
+                    dry_run=options['dry_run'],
+                )
+                line = f"{prefix}{model.__name__}: nofaol qilindi {deactivated}"
+                if model is UploadedFile and options['reclaim_storage']:
+                    line += f", fayl bo'shatildi {reclaimed}"
+                self.stdout.write(self.style.SUCCESS(line))
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
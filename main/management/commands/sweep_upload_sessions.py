@@ -0,0 +1,57 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from main import storage, uploads
+from main.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = (
+        "Uzoq vaqt yangilanmagan bo'laklab yuklash sessiyalarini va ularning "
+        ".part fayllarini o'chiradi, sessiyasi yo'q .part fayllarni ham tozalaydi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age-hours', type=float,
+            default=getattr(settings, 'UPLOAD_SESSION_MAX_AGE_HOURS', 24),
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['max_age_hours'])
+        dry_run = options['dry_run']
+
+        stale = UploadSession.objects.filter(updated_at__lt=cutoff)
+        sessions = 0
+        for session in stale.iterator():
+            if not dry_run:
+                try:
+                    uploads.discard(session)
+                except uploads.Busy:
+                    # Hozir bo'lak yozilmoqda — sessiya tirik
+                    continue
+            sessions += 1
+
+        # Sessiya qatori yo'q .part fayllar (masalan, qo'lda o'chirilgan)
+        directory = storage.file_storage.path(getattr(settings, 'UPLOAD_SESSION_DIR', 'uploads/sessions/'))
+        alive = {str(pk) for pk in UploadSession.objects.values_list('pk', flat=True)}
+        orphans = 0
+        if os.path.isdir(directory):
+            for filename in os.listdir(directory):
+                session_id = filename.split('.', 1)[0]
+                path = os.path.join(directory, filename)
+                if session_id in alive or os.path.getmtime(path) > cutoff.timestamp():
+                    continue
+                orphans += 1
+                if not dry_run:
+                    os.unlink(path)
+
+        prefix = "[dry-run] " if dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}eski sessiyalar: {sessions}, yetim .part fayllar: {orphans}"
+        ))
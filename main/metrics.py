@@ -0,0 +1,319 @@
+"""
+So'rov instrumentatsiyasi: har bir view bo'yicha SQL so'rovlar soni, baza
+vaqti, shablon render vaqti, javob hajmi va umumiy davomiylik.
+
+    InstrumentationMiddleware  -- so'rovni o'lchaydi, ``Server-Timing`` qo'yadi,
+                                  ``QUERY_BUDGETS`` ni tekshiradi
+    InstrumentedTemplates      -- shablon render vaqtini o'lchaydigan
+                                  DjangoTemplates (TEMPLATES['BACKEND'])
+    render_prometheus()        -- ``metrics/`` endpoint uchun matn
+
+So'rovlar ``connection_created`` orqali har bir ulanishga qo'yilgan
+execute_wrapper bilan sanaladi; joriy so'rov statistikasi contextvar'da,
+shuning uchun async view'larning ``sync_to_async`` oqimlaridagi so'rovlar
+ham shu so'rovga yoziladi. Ko'rsatkichlar jarayon ichida (worker bo'yicha).
+
+Sozlamalar (settings.py, ixtiyoriy):
+    METRICS_SERVER_TIMING   -- Server-Timing sarlavhasi, default True
+    METRICS_ALLOWED_IPS     -- metrics/ ga ruxsat etilgan IP'lar, default () — faqat staff
+    QUERY_BUDGETS           -- {url_name: maksimal so'rovlar soni}
+    QUERY_BUDGET_STRICT     -- True bo'lsa oshib ketish QueryBudgetExceeded
+"""
+import contextvars
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'amaliyot'
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNRESOLVED = '<unresolved>'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_seconds', 'template_seconds', 'template_depth', 'started')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+_current = contextvars.ContextVar('request_stats', default=None)
+
+
+def current():
+    """Joriy so'rov statistikasi (middleware tashqarisida None)."""
+    return _current.get()
+
+
+# ---------- SQL ----------
+# Tranzaksiya boshqaruvi sanalmaydi: production'da atomic() BEGIN/COMMIT beradi,
+# TestCase ichida esa SAVEPOINT — budjetlar ikkala muhitda bir xil bo'lsin
+_TRANSACTION_SQL = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT')
+
+
+def _count_queries(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None or sql.startswith(_TRANSACTION_SQL):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def install(sender=None, connection=None, **kwargs):
+    """``connection_created`` qabul qiluvchisi: ulanishga so'rov hisoblagichini qo'yadi."""
+    if _count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _count_queries)
+
+
+# ---------- shablonlar ----------
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        # render_to_string ichida yana render — faqat tashqi qatlam sanaladi
+        stats.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_depth -= 1
+            if not stats.template_depth:
+                stats.template_seconds += time.perf_counter() - started
+
+
+class InstrumentedTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+# ---------- yig'uvchi ----------
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.requests = defaultdict(int)           # (view, method, status) -> soni
+        self.queries = defaultdict(int)            # view -> jami so'rovlar
+        self.db_seconds = defaultdict(float)
+        self.template_seconds = defaultdict(float)
+        self.response_bytes = defaultdict(int)
+        self.duration_sum = defaultdict(float)
+        self.duration_buckets = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1))
+        self.budget_exceeded = defaultdict(int)
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+    def observe(self, view, method, status, stats, elapsed, size, over_budget=False):
+        with self._lock:
+            self.requests[(view, method, status)] += 1
+            self.queries[view] += stats.queries
+            self.db_seconds[view] += stats.db_seconds
+            self.template_seconds[view] += stats.template_seconds
+            self.response_bytes[view] += size
+            self.duration_sum[view] += elapsed
+            buckets = self.duration_buckets[view]
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if elapsed <= bound:
+                    buckets[i] += 1
+                    break
+            else:
+                buckets[-1] += 1
+            if over_budget:
+                self.budget_exceeded[view] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'queries': dict(self.queries),
+                'db_seconds': dict(self.db_seconds),
+                'template_seconds': dict(self.template_seconds),
+                'response_bytes': dict(self.response_bytes),
+                'duration_sum': dict(self.duration_sum),
+                'duration_buckets': {view: list(b) for view, b in self.duration_buckets.items()},
+                'budget_exceeded': dict(self.budget_exceeded),
+            }
+
+
+registry = Registry()
+
+
+# ---------- middleware ----------
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNRESOLVED
+    return match.url_name or match.view_name or UNRESOLVED
+
+
+def _response_size(response):
+    if response.streaming:
+        return int(response.get('Content-Length') or 0)
+    return len(response.content)
+
+
+def check_budget(view, stats):
+    """Budjetdan oshgan bo'lsa True (strict rejimda QueryBudgetExceeded)."""
+    budget = _setting('QUERY_BUDGETS', {}).get(view)
+    if budget is None or stats.queries <= budget:
+        return False
+    message = f"{view}: {stats.queries} ta SQL so'rov (budjet {budget})"
+    if _setting('QUERY_BUDGET_STRICT', False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+    return True
+
+
+def _finish(request, response, stats):
+    elapsed = stats.elapsed
+    view = _view_name(request)
+    over_budget = check_budget(view, stats)
+    registry.observe(view, request.method, response.status_code, stats, elapsed, _response_size(response), over_budget)
+
+    if _setting('METRICS_SERVER_TIMING', True):
+        response['Server-Timing'] = (
+            f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+            f'tpl;dur={stats.template_seconds * 1000:.2f}, '
+            f'total;dur={elapsed * 1000:.2f}'
+        )
+    return response
+
+
+@sync_and_async_middleware
+def InstrumentationMiddleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            stats = RequestStats()
+            token = _current.set(stats)
+            try:
+                response = await get_response(request)
+            finally:
+                _current.reset(token)
+            return _finish(request, response, stats)
+    else:
+        def middleware(request):
+            install(connection=connection)
+            stats = RequestStats()
+            token = _current.set(stats)
+            try:
+                response = get_response(request)
+            finally:
+                _current.reset(token)
+            return _finish(request, response, stats)
+    return middleware
+
+
+# ---------- Prometheus ----------
+def _labels(**labels):
+    return '{' + ','.join(f'{k}="{str(v)}"' for k, v in labels.items()) + '}'
+
+
+def _family(lines, name, kind, help_text, samples):
+    lines.append(f'# HELP {PREFIX}_{name} {help_text}')
+    lines.append(f'# TYPE {PREFIX}_{name} {kind}')
+    for suffix, labels, value in samples:
+        lines.append(f'{PREFIX}_{name}{suffix}{labels} {value}')
+
+
+def _subsystems():
+    """Boshqa modullarning ichki holati: (nom, turi, tavsif, qiymat)."""
+    from main import compression, counters, hotcache, ingest, jobs
+
+    gauges = [
+        ('counter_buffer_pending', 'gauge', "Bazaga yozilmagan hisoblagichlar", counters.buffer.size()),
+        ('counter_buffer_flushes_total', 'counter', "Hisoblagich flush'lari", counters.buffer.flushes),
+        ('counter_buffer_flushed_total', 'counter', "Flush qilingan ortirmalar", counters.buffer.flushed_increments),
+    ]
+    for key, value in ingest.pipeline.metrics().items():
+        kind = 'gauge' if key in ('queue_depth', 'queue_max_depth') or 'seconds' in key else 'counter'
+        name = f'log_ingest_{key}' + ('_total' if kind == 'counter' else '')
+        gauges.append((name, kind, f"Log ingestion: {key}", value))
+    for key, value in hotcache.metrics().items():
+        kind = 'counter' if key in ('hits', 'misses', 'invalidations') else 'gauge'
+        name = f'hot_cache_{key}' + ('_total' if kind == 'counter' else '')
+        gauges.append((name, kind, f"public_id hot cache: {key}", value))
+    for key, value in compression.metrics().items():
+        name = f'compression_{key}_total'
+        gauges.append((name, 'counter', f"Javob siqish: {key}", value))
+    # Fon navbati — barcha worker'lar bo'yicha, bazadan
+    for key, value in jobs.metrics().items():
+        gauges.append((f'job_queue_{key}', 'gauge', f"Fon navbati: {key}", value))
+    return gauges
+
+
+def render_prometheus():
+    """Prometheus text exposition format (0.0.4)."""
+    data = registry.snapshot()
+    lines = []
+
+    _family(lines, 'http_requests_total', 'counter', "View bo'yicha so'rovlar", [
+        ('', _labels(view=view, method=method, status=status), count)
+        for (view, method, status), count in sorted(data['requests'].items())
+    ])
+
+    samples = []
+    for view, buckets in sorted(data['duration_buckets'].items()):
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS + ('+Inf',), buckets):
+            cumulative += count
+            samples.append(('_bucket', _labels(view=view, le=bound), cumulative))
+        samples.append(('_sum', _labels(view=view), round(data['duration_sum'][view], 6)))
+        samples.append(('_count', _labels(view=view), cumulative))
+    _family(lines, 'http_request_duration_seconds', 'histogram', "So'rov davomiyligi", samples)
+
+    per_view = (
+        ('db_queries_total', 'queries', "SQL so'rovlar soni"),
+        ('db_query_seconds_total', 'db_seconds', "SQL so'rovlarga ketgan vaqt"),
+        ('template_render_seconds_total', 'template_seconds', "Shablon render vaqti"),
+        ('http_response_bytes_total', 'response_bytes', "Javob hajmi"),
+        ('query_budget_exceeded_total', 'budget_exceeded', "QUERY_BUDGETS dan oshgan so'rovlar"),
+    )
+    for name, key, help_text in per_view:
+        _family(lines, name, 'counter', help_text, [
+            ('', _labels(view=view), round(value, 6) if isinstance(value, float) else value)
+            for view, value in sorted(data[key].items())
+        ])
+
+    for name, kind, help_text, value in _subsystems():
+        _family(lines, name, kind, help_text, [('', '', value)])
+
+    return '\n'.join(lines) + '\n'
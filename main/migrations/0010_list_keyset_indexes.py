@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_uploadedfile_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='notice_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(fields=['is_public', '-created_at', '-id'], name='notice_public_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uploadedfile',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='file_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uploadedfile',
+            index=models.Index(fields=['is_public', '-created_at', '-id'], name='file_public_created_idx'),
+        ),
+    ]
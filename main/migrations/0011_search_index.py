@@ -0,0 +1,47 @@
+from django.db import migrations
+
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS main_search_index USING fts5("
+    "kind UNINDEXED, obj_id UNINDEXED, owner_id UNINDEXED, is_public UNINDEXED, "
+    "title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SQL)
+
+    # Mavjud yozuvlarni indekslash (katta bazada: manage.py rebuild_search_index)
+    Notice = apps.get_model('main', 'Notice')
+    UploadedFile = apps.get_model('main', 'UploadedFile')
+    with schema_editor.connection.cursor() as cursor:
+        for n in Notice.objects.values_list('id', 'owner_id', 'is_public', 'title', 'main_text').iterator():
+            cursor.execute(
+                "INSERT INTO main_search_index (rowid, kind, obj_id, owner_id, is_public, title, body) "
+                "VALUES (%s, 'notice', %s, %s, %s, %s, %s)",
+                [n[0] * 2, n[0], n[1], int(n[2]), n[3], n[4]],
+            )
+        for f in UploadedFile.objects.values_list('id', 'owner_id', 'is_public', 'title').iterator():
+            cursor.execute(
+                "INSERT INTO main_search_index (rowid, kind, obj_id, owner_id, is_public, title, body) "
+                "VALUES (%s, 'file', %s, %s, %s, %s, '')",
+                [f[0] * 2 + 1, f[0], f[1], int(f[2]), f[3]],
+            )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS main_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_list_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_stat_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadedfile',
+            name='is_active',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(condition=models.Q(('expire_date__isnull', False), ('is_active', True)), fields=['expire_date'], name='notice_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uploadedfile',
+            index=models.Index(condition=models.Q(('expire_date__isnull', False), ('is_active', True)), fields=['expire_date'], name='file_expiry_idx'),
+        ),
+    ]
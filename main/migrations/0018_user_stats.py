@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_access_request_user_approved'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('file_count', models.IntegerField(default=0)),
+                ('bytes_stored', models.BigIntegerField(default=0)),
+                ('notice_count', models.IntegerField(default=0)),
+                ('file_views', models.BigIntegerField(default=0)),
+                ('file_downloads', models.BigIntegerField(default=0)),
+                ('notice_views', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0020_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='access_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
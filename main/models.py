@@ -2,17 +2,25 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 import uuid
 from django.utils import timezone
+from main.tracking import ChangeTrackingMixin
 
 
 # =========================
 # Custom User
 # =========================
-class CustomUser(AbstractUser):
+class CustomUser(ChangeTrackingMixin, AbstractUser):
+    # access_version faqat F() bilan oshiriladi — eski nusxaning save()'i uni qaytarmaydi
+    tracker_exclude = ('access_version',)
+
     ROLE_CHOICES = (
         ('user', 'User'),
         ('admin', 'Admin'),
     )
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
+    # 💾 Shaxsiy saqlash kvotasi (bayt); bo‘sh bo‘lsa rol bo‘yicha (STORAGE_QUOTAS)
+    storage_quota = models.PositiveBigIntegerField(null=True, blank=True)
+    # 🔐 Ruxsatlar keshi kaliti (main/access.py): AccessRequest o‘zgarsa oshadi
+    access_version = models.PositiveIntegerField(default=0, editable=False)
 
     def __str__(self):
         return self.username
@@ -22,7 +30,14 @@ class CustomUser(AbstractUser):
 # Notice Model
 # =========================
 
-class Notice(models.Model):
+class Notice(ChangeTrackingMixin, models.Model):
+    # Hisoblagichlar faqat F() bilan yangilanadi, save() ularni yozmaydi
+    tracker_exclude = ('views', 'public_views')
+
+    # Qidiruv natijalarida main/search.py o‘rnatadi; shablonda har qatorda
+    # mavjud bo‘lmagan atributni qidirish (dir()) qimmat
+    search_snippet = ''
+
     # 👑 Egasi
     owner = models.ForeignKey(
         CustomUser,
@@ -70,20 +85,44 @@ class Notice(models.Model):
         """Link muddati tugaganmi?"""
         return self.expire_date and timezone.now() > self.expire_date
 
+    def save(self, *args, **kwargs):
+        # ⏳ Muddat uzaytirilsa sweeper o‘chirgan link qayta faollashadi
+        if not self.is_active and self.is_tracked() and self.has_changed('expire_date') and not self.is_expired():
+            self.is_active = True
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.title} ({self.owner.username})"
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # keyset pagination: o‘zimniki va public ro‘yxatlar
+            models.Index(fields=['owner', '-created_at', '-id'], name='notice_owner_created_idx'),
+            models.Index(fields=['is_public', '-created_at', '-id'], name='notice_public_created_idx'),
+            # ⏳ sweeper: faqat faol va muddatli qatorlar (main/expiry.py)
+            models.Index(
+                fields=['expire_date'],
+                name='notice_expiry_idx',
+                condition=models.Q(is_active=True, expire_date__isnull=False),
+            ),
+        ]
 
 
 # =========================
 # Uploaded File Model
 # =========================
+import os
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
+from django.urls import reverse
+from main import images, storage
+from main.delivery import sha256_of
+
+class UploadedFile(ChangeTrackingMixin, models.Model):
+    # Hisoblagichlar faqat F() bilan yangilanadi, save() ularni yozmaydi
+    tracker_exclude = ('views_count', 'downloaded_count')
 
-class UploadedFile(models.Model):
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -92,14 +131,24 @@ class UploadedFile(models.Model):
 
     title = models.CharField(max_length=200)
 
+    # 📦 Kontent-manzilli storage: bir xil fayl diskda bir marta saqlanadi
     file = models.FileField(
         upload_to='uploads/files/',
+        storage=storage.file_storage,
         blank=True,   # 🔥 EDIT paytida muammo bo‘lmasin
         null=True
     )
+    # Blob nomi sha256 bo‘lgani uchun yuklab olishda asl nom shu yerdan olinadi
+    original_name = models.CharField(max_length=255, blank=True, default='', editable=False)
 
     size = models.PositiveIntegerField(blank=True, null=True)
 
+    # 🔐 sha256 — kuchli ETag shu qiymatdan olinadi
+    content_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+
+    # 🔍 Yuklashdan keyingi tekshiruv natijasi (main/tasks.py: mime, scan, ...)
+    metadata = models.JSONField(default=dict, blank=True, editable=False)
+
     is_public = models.BooleanField(default=False)
 
     # 🔥 public_id faqat public fayllar uchun ishlatiladi
@@ -112,6 +161,8 @@ class UploadedFile(models.Model):
     )
 
     expire_date = models.DateTimeField(blank=True, null=True)
+    # ⏳ Muddati o‘tganda sweeper (main/expiry.py) False qiladi
+    is_active = models.BooleanField(default=True)
 
     views_count = models.PositiveIntegerField(default=0)
     download_limit = models.PositiveIntegerField(null=True, blank=True)
@@ -121,43 +172,222 @@ class UploadedFile(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
-        # Fayl o‘zgargan bo‘lsa size yangilanadi
-        if self.file:
-            try:
-                if not self.pk or UploadedFile.objects.get(pk=self.pk).file != self.file:
-                    self.size = self.file.size
-            except UploadedFile.DoesNotExist:
-                self.size = self.file.size
+        # ⏳ Muddat uzaytirilsa (fayl hali o‘chirilmagan bo‘lsa) qayta faollashadi;
+        # karantindagi fayl muddat bilan emas, tekshiruv bilan yopilgan
+        if (
+            not self.is_active and self.is_tracked() and self.file and not self.is_quarantined
+            and self.has_changed('expire_date') and not self.is_expired
+        ):
+            self.is_active = True
+
+        # Eski nom from_db nusxasidan (qo‘shimcha SELECT yo‘q)
+        old_name = self.previous('file')
+        changed = (self.file.name or '') != (old_name or '')
+
+        # Fayl o‘zgargan bo‘lsa size va hash yangilanadi
+        if self.file and changed:
+            if not self.file._committed:
+                self.original_name = os.path.basename(self.file.name)
+                # Storage oqim davomida xeshlaydi -> faylni ikkinchi marta o‘qimaymiz
+                self.file.save(self.file.name, self.file.file, save=False)
+            self.size = self.file.size
+            self.content_hash = storage.digest_from_name(self.file.name) or sha256_of(self.file)
 
         # Har bir faylga public_id beramiz (private ham)
         if not self.public_id:
             self.public_id = uuid.uuid4()
 
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
+            # 🔁 Blob refcount: yangisi +1, eskisi -1
+            if changed:
+                storage.acquire(self.file.name, self.size)
+                storage.release(old_name)
+
+
+    @property
+    def is_expired(self):
+        return bool(self.expire_date) and timezone.now() > self.expire_date
+
+    @property
+    def is_quarantined(self):
+        # 🦠 inspect_upload (main/tasks.py) yuqtirilgan deb topgan
+        return self.metadata.get('scan') == 'infected'
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-id'], name='file_owner_created_idx'),
+            models.Index(fields=['is_public', '-created_at', '-id'], name='file_public_created_idx'),
+            models.Index(
+                fields=['expire_date'],
+                name='file_expiry_idx',
+                condition=models.Q(is_active=True, expire_date__isnull=False),
+            ),
+        ]
+
+
+class UploadSession(models.Model):
+    """Bo‘laklab yuklash sessiyasi (main/uploads.py)."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+
+    # Yakunda yaratiladigan UploadedFile maydonlari
+    title = models.CharField(max_length=200)
+    filename = models.CharField(max_length=255)
+    is_public = models.BooleanField(default=False)
+    expire_date = models.DateTimeField(blank=True, null=True)
+    download_limit = models.PositiveIntegerField(null=True, blank=True)
+
+    length = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    checksum = models.CharField(max_length=64, blank=True, default='', help_text="sha256 (hex)")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} {self.offset}/{self.length}"
+
+
+class Blob(models.Model):
+    """Diskdagi bitta blob va unga ishora qiluvchi UploadedFile'lar soni."""
+    name = models.CharField(max_length=100, unique=True)
+    digest = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ×{self.refcount}"
 
 
 class FileViewLog(models.Model):
     file = models.ForeignKey(UploadedFile, on_delete=models.CASCADE, related_name='view_logs')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
-    viewed_at = models.DateTimeField(auto_now_add=True)
+    # auto_now_add emas: navbatdan kech yozilsa ham haqiqiy vaqt saqlanadi
+    viewed_at = models.DateTimeField(default=timezone.now, editable=False)
 
 
 class FileDownloadLog(models.Model):
     file = models.ForeignKey(UploadedFile, on_delete=models.CASCADE, related_name='download_logs')
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
-    downloaded_at = models.DateTimeField(auto_now_add=True)
+    downloaded_at = models.DateTimeField(default=timezone.now, editable=False)
+
+
+# =========================
+# 📊 Statistika rollup'lari (main/rollups.py)
+# =========================
+class StatRollup(models.Model):
+    HOUR = 'hour'
+    DAY = 'day'
+    PERIOD_CHOICES = ((HOUR, 'Soatlik'), (DAY, 'Kunlik'))
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    # Davr boshi (mahalliy vaqt bo‘yicha soat / kun)
+    bucket = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    downloads = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class FileStatRollup(StatRollup):
+    file = models.ForeignKey(UploadedFile, on_delete=models.CASCADE, related_name='stat_rollups')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['file', 'period', 'bucket'], name='file_rollup_unique'),
+        ]
+
+
+class OwnerStatRollup(StatRollup):
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='stat_rollups')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'period', 'bucket'], name='owner_rollup_unique'),
+        ]
+
+
+class RollupWatermark(models.Model):
+    """Log jadvalidagi qaysi id'gacha rollup'ga qo‘shilgani."""
+    source = models.CharField(max_length=20, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source}: {self.last_id}"
+
+
+class Job(models.Model):
+    """Fon vazifasi (main/jobs.py): navbat, qayta urinishlar, dead-letter."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    DEAD = 'dead'
+    STATUS_CHOICES = (
+        (QUEUED, 'Navbatda'),
+        (RUNNING, 'Bajarilmoqda'),
+        (DONE, 'Tugadi'),
+        (DEAD, 'Dead-letter'),
+    )
+
+    name = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    # Qayta urinishda backoff shu maydonni suradi
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True, default='')
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # worker: navbatdagi tayyor vazifalar
+            models.Index(fields=['run_at', 'id'], name='job_ready_idx', condition=models.Q(status='queued')),
+            # osilib qolgan (worker o‘lgan) vazifalar
+            models.Index(fields=['locked_at'], name='job_running_idx', condition=models.Q(status='running')),
+            models.Index(fields=['status', 'finished_at'], name='job_status_finished_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class UserStats(models.Model):
+    """Account sahifasi uchun jamlangan ko‘rsatkichlar (main/userstats.py)."""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='stats'
+    )
+    file_count = models.IntegerField(default=0)
+    # Fayli bor (reclaim qilinmagan) UploadedFile.size yig‘indisi
+    bytes_stored = models.BigIntegerField(default=0)
+    notice_count = models.IntegerField(default=0)
+    file_views = models.BigIntegerField(default=0)
+    file_downloads = models.BigIntegerField(default=0)
+    notice_views = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.file_count} fayl, {self.notice_count} eslatma"
 
 # =========================
 # Uploaded Image Model
 # =========================
-class UploadedImage(models.Model):
+class UploadedImage(ChangeTrackingMixin, models.Model):
     owner = models.ForeignKey(
         CustomUser,
         on_delete=models.CASCADE,
@@ -166,6 +396,9 @@ class UploadedImage(models.Model):
     title = models.CharField(max_length=200)
     image = models.ImageField(upload_to='uploads/images/')
 
+    # 🖼 Variantlar (thumbnail, w640, ...) shu xesh bo‘yicha keshlanadi
+    content_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+
     is_public = models.BooleanField(default=False)
     public_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
 
@@ -177,6 +410,28 @@ class UploadedImage(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        # Rasm o‘zgargan bo‘lsa xesh qayta hisoblanadi va variantlar navbatga qo‘yiladi
+        regenerate = bool(self.image) and (self.has_changed('image') or not self.content_hash)
+        if regenerate:
+            self.content_hash = sha256_of(self.image)
+        super().save(*args, **kwargs)
+        if regenerate:
+            images.schedule(self)
+
+    def variant_url(self, variant, fmt=None):
+        # v= — rasm almashsa URL ham o‘zgaradi (brauzer keshi immutable)
+        url = f"{reverse('image_variant', args=[self.public_id, variant])}?v={self.content_hash[:12]}"
+        return f'{url}&format={fmt}' if fmt else url
+
+    def srcset(self, fmt=None):
+        """``<img srcset>`` uchun: kenglik variantlari."""
+        return ', '.join(
+            f'{self.variant_url(name, fmt)} {size[0]}w'
+            for name, size in images.variant_specs().items()
+            if name != images.THUMBNAIL
+        )
+
     def __str__(self):
         return self.title
 
@@ -206,3 +461,7 @@ class AccessRequest(models.Model):
     class Meta:
         unique_together = ('user', 'notice', 'file', 'image')
         ordering = ['-created_at']
+        indexes = [
+            # main/access.py: foydalanuvchining tasdiqlangan ruxsatlari
+            models.Index(fields=['user', 'is_approved'], name='access_user_approved_idx'),
+        ]
@@ -0,0 +1,120 @@
+"""
+Keyset (cursor) pagination: ``(created_at, id)`` bo'yicha kamayish tartibida.
+
+OFFSET o'rniga oxirgi ko'rilgan qatordan keyingisi so'raladi::
+
+    WHERE created_at < %s OR (created_at = %s AND id < %s)
+    ORDER BY created_at DESC, id DESC LIMIT n
+
+shuning uchun sahifa chuqurligidan qat'i nazar (owner, -created_at, -id)
+indeksi bo'yicha bitta diapazon skan bo'ladi.
+
+Bir nechta queryset berilsa (masalan "o'zimniki" va "public"), har biri o'z
+indeksi bilan alohida so'raladi va natijalar Python'da birlashtiriladi —
+OR sharti indeksdan foydalanishga xalaqit bermaydi.
+"""
+import base64
+import binascii
+import heapq
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+
+DEFAULT_PER_PAGE = 50
+
+NEXT = 'n'
+PREV = 'p'
+
+
+def encode_cursor(direction, obj):
+    raw = json.dumps([direction, obj.created_at.isoformat(), obj.pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(direction, created_at, pk) yoki noto'g'ri bo'lsa None."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, created_at, pk = json.loads(base64.urlsafe_b64decode(padded))
+        if direction not in (NEXT, PREV):
+            return None
+        return direction, datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, prev_cursor):
+        self.object_list = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def page_size(request):
+    """``?limit=`` (JSON uchun), LIST_PAGE_SIZE_MAX bilan cheklangan."""
+    default = getattr(settings, 'LIST_PAGE_SIZE', DEFAULT_PER_PAGE)
+    try:
+        limit = int(request.GET.get('limit', default))
+    except ValueError:
+        limit = default
+    return max(1, min(limit, getattr(settings, 'LIST_PAGE_SIZE_MAX', 200)))
+
+
+def _key(obj):
+    return (obj.created_at, obj.pk)
+
+
+def paginate(querysets, cursor=None, per_page=DEFAULT_PER_PAGE):
+    if not isinstance(querysets, (list, tuple)):
+        querysets = [querysets]
+
+    decoded = decode_cursor(cursor)
+    direction = decoded[0] if decoded else NEXT
+
+    fetched = []
+    for qs in querysets:
+        if decoded:
+            _, created_at, pk = decoded
+            if direction == NEXT:
+                qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+            else:
+                qs = qs.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+        ordering = ('-created_at', '-pk') if direction == NEXT else ('created_at', 'pk')
+        fetched.append(list(qs.order_by(*ordering)[:per_page + 1]))
+
+    # Har bir ro'yxat allaqachon tartiblangan -> merge, dublikatlarsiz
+    merged, seen = [], set()
+    for obj in heapq.merge(*fetched, key=_key, reverse=(direction == NEXT)):
+        if obj.pk not in seen:
+            seen.add(obj.pk)
+            merged.append(obj)
+    has_more = len(merged) > per_page
+    items = merged[:per_page]
+
+    if direction == PREV:
+        items.reverse()
+        next_cursor = encode_cursor(NEXT, items[-1]) if items else None
+        prev_cursor = encode_cursor(PREV, items[0]) if items and has_more else None
+    else:
+        next_cursor = encode_cursor(NEXT, items[-1]) if items and has_more else None
+        prev_cursor = encode_cursor(PREV, items[0]) if items and decoded else None
+
+    return KeysetPage(items, next_cursor, prev_cursor)
@@ -0,0 +1,158 @@
+"""
+Saqlash kvotasi: foydalanuvchi bo'yicha (``CustomUser.storage_quota``) yoki
+rol bo'yicha (``STORAGE_QUOTAS``) chegara.
+
+Foydalanish hisoblanmaydi — ``UserStats.bytes_stored`` qatori o'qiladi
+(main/userstats.py, yaratish / almashtirish / o'chirishda F() bilan
+yangilanadi), shuning uchun tekshiruv fayllarni skanerlamaydi.
+
+Uch bosqich:
+
+    1. Content-Length   -- ``QuotaUploadHandler.handle_raw_input``: tana
+                           o'qilmasdan rad etiladi
+    2. oqim             -- ``receive_data_chunk`` fayl baytlarini sanaydi,
+                           chegaradan oshsa qolgani saqlanmaydi
+    3. saqlash          -- ``charging()``: UserStats yangilangan tranzaksiya
+                           ichida yakuniy tekshiruv (parallel yuklashlar
+                           qator qulfi orqali navbatlashadi)
+
+Upload handler ``request.POST`` o'qilishidan oldin qo'yilishi kerak — CSRF
+tekshiruvi ham POST'ni o'qiydi, shuning uchun view'lar ``csrf_exempt`` +
+ichki ``csrf_protect`` ko'rinishida (main/view/file.py).
+
+Sozlamalar (settings.py, ixtiyoriy):
+    STORAGE_QUOTAS         -- {rol: bayt yoki None (cheksiz)}
+    STORAGE_QUOTA_DEFAULT  -- ro'yxatda yo'q rol uchun, default None
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.db import transaction
+from django.http import QueryDict
+from django.template.defaultfilters import filesizeformat
+from django.utils.datastructures import MultiValueDict
+
+from main import userstats
+
+
+class QuotaExceeded(Exception):
+    status = 413
+
+    def __init__(self, needed, available):
+        self.needed = needed
+        self.available = available
+        super().__init__(
+            f"Saqlash kvotasi yetarli emas: {filesizeformat(available)} bo‘sh, "
+            f"{filesizeformat(needed)} kerak"
+        )
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def limit_for(user):
+    """Bayt; None — cheksiz."""
+    if user.storage_quota is not None:
+        return user.storage_quota
+    return _setting('STORAGE_QUOTAS', {}).get(user.role, _setting('STORAGE_QUOTA_DEFAULT', None))
+
+
+def usage(user_id):
+    from main.models import UserStats
+
+    stored = UserStats.objects.filter(pk=user_id).values_list('bytes_stored', flat=True).first()
+    if stored is None:
+        stored = userstats.refresh(user_id).bytes_stored
+    return stored
+
+
+def remaining(user, credit=0):
+    """Yana qancha bayt sig'adi; ``credit`` — almashtirilayotgan faylning hajmi."""
+    limit = limit_for(user)
+    if limit is None:
+        return None
+    return max(limit - usage(user.pk) + credit, 0)
+
+
+def check(user, incoming, credit=0):
+    available = remaining(user, credit)
+    if available is not None and incoming > available:
+        raise QuotaExceeded(incoming, available)
+
+
+@contextmanager
+def charging(uploaded, user=None):
+    """
+    ``UploadedFile.save()`` atrofida: tranzaksiya ichida UserStats yangilangach
+    chegara tekshiriladi, oshsa QuotaExceeded va hammasi bekor bo'ladi.
+    """
+    before = userstats.stored_bytes(uploaded, snapshot=True) if uploaded.pk else 0
+    with transaction.atomic():
+        yield
+        added = userstats.stored_bytes(uploaded) - before
+        limit = limit_for(user or uploaded.owner)
+        if added > 0 and limit is not None:
+            used = usage(uploaded.owner_id)
+            if used > limit:
+                raise QuotaExceeded(added, max(limit - used + added, 0))
+
+
+# ---------- upload handler ----------
+class QuotaUploadHandler(FileUploadHandler):
+    """
+    Birinchi handler bo'lib turadi: fayl baytlarini sanaydi va kvotadan
+    oshsa yuklashni to'xtatadi. Rad etish sababi ``request.quota_error``da.
+    """
+
+    def __init__(self, request=None, credit=0):
+        super().__init__(request)
+        self.credit = credit
+        self.available = None
+        self.received = 0
+
+    def _reject(self, needed):
+        self.request.quota_error = QuotaExceeded(needed, self.available)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.available = remaining(self.request.user, self.credit)
+        if self.available is None:
+            return None
+        # Oddiy maydonlar DATA_UPLOAD_MAX_MEMORY_SIZE dan oshmaydi — qolgani fayl
+        slack = settings.DATA_UPLOAD_MAX_MEMORY_SIZE or 0
+        if content_length > self.available + slack:
+            self._reject(content_length - slack)
+            # Tana o'qilmaydi: bo'sh POST/FILES
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.available is not None:
+            self.received += len(raw_data)
+            if self.received > self.available:
+                self._reject(self.received)
+                # Qolgan baytlar o'qib tashlanadi, saqlanmaydi; javob 413
+                raise StopUpload(connection_reset=False)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def install_upload_handler(request, credit=0):
+    """``request.POST`` / ``request.FILES`` o'qilishidan oldin chaqiriladi."""
+    if request.method == 'POST' and request.user.is_authenticated:
+        request.upload_handlers.insert(0, QuotaUploadHandler(request, credit))
+
+
+def rejection(request):
+    """
+    Upload handler rad etgan bo'lsa QuotaExceeded, aks holda None.
+
+    POST tanasini o'qitadi — CSRF tekshiruvidan oldin chaqiriladi: erta rad
+    etilganda tana o'qilmaydi, POST'da token yo'q va 413 o'rniga 403 chiqardi.
+    """
+    if request.method == 'POST':
+        request.FILES  # handler'lar shu yerda ishlaydi
+    return getattr(request, 'quota_error', None)
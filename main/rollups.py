@@ -0,0 +1,241 @@
+"""
+FileViewLog / FileDownloadLog ustidan inkremental rollup'lar.
+
+Har bir log jadvali uchun ``RollupWatermark`` qaysi id'gacha qayta
+ishlanganini saqlaydi. ``run()`` faqat yangi qatorlarni (id > watermark)
+partiyalab o'qiydi, (fayl, soat) bo'yicha GROUP BY qiladi va natijani
+soatlik/kunlik ``FileStatRollup`` hamda egasi bo'yicha ``OwnerStatRollup``
+jadvallariga qo'shadi. Rollup va watermark bitta tranzaksiyada yangilanadi,
+watermark shartli UPDATE bilan suriladi — parallel ishga tushgan ikkinchi
+jarayon partiyani ikki marta sanamaydi.
+
+``ROLLUP_LAG_SECONDS`` — oxirgi shuncha soniyadagi qatorlar keyingi safarga
+qoldiriladi (hali commit bo'lmagan, kichikroq id olgan tranzaksiyalar uchun).
+
+Eski xom qatorlar: ``prune_logs`` — faqat rollup'ga kirganlari, kichik
+bo'laklarda o'chiriladi (jadval uzoq bloklanmaydi).
+"""
+import gzip
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+VIEW = 'view'
+DOWNLOAD = 'download'
+
+# manba -> (model label, vaqt maydoni, rollup ustuni)
+SOURCES = {
+    VIEW: ('main.FileViewLog', 'viewed_at', 'views'),
+    DOWNLOAD: ('main.FileDownloadLog', 'downloaded_at', 'downloads'),
+}
+
+
+class WatermarkMoved(Exception):
+    """Boshqa jarayon shu partiyani allaqachon qo'shib bo'ldi."""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _model(source):
+    from django.apps import apps
+
+    return apps.get_model(SOURCES[source][0])
+
+
+def watermark(source):
+    from main.models import RollupWatermark
+
+    mark, _ = RollupWatermark.objects.get_or_create(source=source)
+    return mark.last_id
+
+
+def _upper_bound(source, after_id, lag):
+    """Shu id'gacha xavfsiz qayta ishlash mumkin (lag'dan eski qatorlar)."""
+    model = _model(source)
+    time_field = SOURCES[source][1]
+    cutoff = timezone.now() - timedelta(seconds=lag)
+    return model.objects.filter(pk__gt=after_id, **{f'{time_field}__lte': cutoff}).aggregate(m=Max('pk'))['m']
+
+
+def _day_of(hour):
+    return timezone.localtime(hour).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _rows(model, key_field, deltas):
+    keys = {key for key, _, _ in deltas}
+    buckets = {bucket for _, _, bucket in deltas}
+    return {
+        (getattr(row, f'{key_field}_id'), row.period, row.bucket): row
+        for row in model.objects.filter(**{f'{key_field}_id__in': keys, 'bucket__in': buckets})
+        .only('pk', f'{key_field}_id', 'period', 'bucket')
+    }
+
+
+def _apply(model, key_field, deltas, column):
+    """{(key_id, period, bucket): n} -> qatorlarga F() bilan qo'shish, yo'qlari avval yaratiladi."""
+    if not deltas:
+        return
+    existing = _rows(model, key_field, deltas)
+    missing = [key for key in deltas if key not in existing]
+    if missing:
+        # Boshqa manbani ishlayotgan parallel run shu (davr, bucket, fayl) qatorini
+        # yaratib ulgurgan bo'lishi mumkin — UNIQUE to'qnashuvi o'tkazib yuboriladi
+        model.objects.bulk_create(
+            [model(**{f'{key_field}_id': key, 'period': period, 'bucket': bucket}) for key, period, bucket in missing],
+            batch_size=500, ignore_conflicts=True,
+        )
+        existing = _rows(model, key_field, deltas)
+    to_update = []
+    for key, n in deltas.items():
+        row = existing[key]
+        # Qiymat bazada qo'shiladi: parallel yozuvchining hissasi ustidan yozilmaydi
+        setattr(row, column, F(column) + n)
+        to_update.append(row)
+    model.objects.bulk_update(to_update, [column], batch_size=500)
+
+
+def process_batch(source, after_id, upto_id):
+    """(after_id, upto_id] oralig'idagi log qatorlarini rollup'ga qo'shadi."""
+    from main.models import FileStatRollup, OwnerStatRollup, RollupWatermark, StatRollup
+
+    model = _model(source)
+    _, time_field, column = SOURCES[source]
+
+    groups = (
+        model.objects.filter(pk__gt=after_id, pk__lte=upto_id)
+        .annotate(hour=TruncHour(time_field, tzinfo=timezone.get_current_timezone()))
+        .values('file_id', 'file__owner_id', 'hour')
+        .annotate(n=Count('pk'))
+        .order_by()
+    )
+
+    per_file, per_owner = defaultdict(int), defaultdict(int)
+    rows = 0
+    for group in groups:
+        hour, n = group['hour'], group['n']
+        day = _day_of(hour)
+        rows += n
+        for period, bucket in ((StatRollup.HOUR, hour), (StatRollup.DAY, day)):
+            per_file[(group['file_id'], period, bucket)] += n
+            per_owner[(group['file__owner_id'], period, bucket)] += n
+
+    with transaction.atomic():
+        moved = RollupWatermark.objects.filter(source=source, last_id=after_id).update(
+            last_id=upto_id, updated_at=timezone.now()
+        )
+        if not moved:
+            raise WatermarkMoved(source)
+        _apply(FileStatRollup, 'file', per_file, column)
+        _apply(OwnerStatRollup, 'owner', per_owner, column)
+    return rows
+
+
+def run(batch_size=None, lag=None):
+    """Barcha manbalar bo'yicha yangi qatorlar; {manba: qo'shilgan qatorlar}."""
+    batch_size = batch_size or _setting('ROLLUP_BATCH_SIZE', 5000)
+    lag = _setting('ROLLUP_LAG_SECONDS', 60) if lag is None else lag
+
+    processed = {}
+    for source in SOURCES:
+        total = 0
+        after_id = watermark(source)
+        bound = _upper_bound(source, after_id, lag)
+        while bound is not None and after_id < bound:
+            upto_id = min(after_id + batch_size, bound)
+            try:
+                total += process_batch(source, after_id, upto_id)
+            except WatermarkMoved:
+                # Boshqa jarayon ishlayapti — navbatdagi ishga qoldiramiz
+                break
+            after_id = upto_id
+        processed[source] = total
+    return processed
+
+
+# =========================
+# O'qish (view'lar uchun)
+# =========================
+def file_daily(file, days=14):
+    """Oxirgi ``days`` kun: [(kun, views, downloads)], bo'sh kunlar 0 bilan."""
+    from main.models import FileStatRollup, StatRollup
+
+    today = _day_of(timezone.now())
+    start = today - timedelta(days=days - 1)
+    rows = {
+        timezone.localtime(row.bucket).date(): row
+        for row in FileStatRollup.objects.filter(file=file, period=StatRollup.DAY, bucket__gte=start)
+    }
+    series = []
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).date()
+        row = rows.get(day)
+        series.append((day, row.views if row else 0, row.downloads if row else 0))
+    return series
+
+
+# =========================
+# Retention
+# =========================
+def prune(source, days, chunk_size=1000, archive=None, pause=0.0):
+    """
+    ``days`` kundan eski va rollup'ga kirgan xom qatorlarni o'chiradi.
+    Har bo'lak alohida qisqa tranzaksiya; ``archive`` berilsa qatorlar
+    o'chirishdan oldin gzip JSONL'ga yoziladi. O'chirilganlar soni qaytadi.
+    """
+    model = _model(source)
+    time_field = SOURCES[source][1]
+    cutoff = timezone.now() - timedelta(days=days)
+    limit_id = watermark(source)
+
+    archive_fh = None
+    if archive:
+        os.makedirs(os.path.dirname(os.path.abspath(archive)), exist_ok=True)
+        archive_fh = gzip.open(archive, 'at', encoding='utf-8')
+
+    deleted, last_id = 0, 0
+    try:
+        while True:
+            # PK bo'yicha diapazon — vaqt ustunida indeks shart emas
+            rows = list(
+                model.objects.filter(pk__gt=last_id, pk__lte=limit_id)
+                .order_by('pk')
+                .values('pk', 'file_id', 'user_id', time_field)[:chunk_size]
+            )
+            if not rows:
+                break
+            old = [row for row in rows if row[time_field] < cutoff]
+            if old:
+                if archive_fh is not None:
+                    for row in old:
+                        archive_fh.write(json.dumps({
+                            'source': source,
+                            'id': row['pk'],
+                            'file_id': row['file_id'],
+                            'user_id': row['user_id'],
+                            time_field: row[time_field].isoformat(),
+                        }) + '\n')
+                    archive_fh.flush()
+                    os.fsync(archive_fh.fileno())
+                # Log jadvallariga FK/signal yo'q — Django bitta DELETE yuboradi
+                with transaction.atomic():
+                    deleted += model.objects.filter(pk__in=[row['pk'] for row in old]).delete()[0]
+            if len(old) < len(rows):
+                # Yangi qatorlar boshlandi (id va vaqt deyarli bir xil o'sadi)
+                break
+            last_id = rows[-1]['pk']
+            if pause:
+                time.sleep(pause)
+    finally:
+        if archive_fh is not None:
+            archive_fh.close()
+    return deleted
@@ -0,0 +1,221 @@
+"""
+Notice va UploadedFile uchun to'liq matnli qidiruv.
+
+SQLite'da FTS5 virtual jadvali (``main_search_index``) ishlatiladi: bm25
+bo'yicha reyting, prefiks qidiruv (``hisob`` -> ``hisobot``) va <mark> bilan
+ajratilgan snippetlar. Boshqa bazalarda ``LikeBackend`` eski icontains
+qidiruviga qaytadi. Indeks model signallari orqali yangilanadi
+(main/signals.py), to'liq qayta qurish: ``manage.py rebuild_search_index``.
+
+rowid = obj_id * 2 + tur kodi, shuning uchun yangilash/o'chirish rowid
+bo'yicha bitta qidiruv bilan bo'ladi.
+"""
+import json
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+TABLE = 'main_search_index'
+
+NOTICE = 'notice'
+FILE = 'file'
+KINDS = {NOTICE: 0, FILE: 1}
+
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def to_match_query(text):
+    """Foydalanuvchi matni -> xavfsiz FTS5 so'rovi: har bir so'z prefiks sifatida."""
+    tokens = _TOKEN_RE.findall(text or '')
+    return ' '.join('"%s"*' % token for token in tokens)
+
+
+def render_snippet(raw):
+    if not raw:
+        return ''
+    html = escape(raw).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+    return mark_safe(html)
+
+
+def rowid_for(kind, obj_id):
+    return obj_id * 2 + KINDS[kind]
+
+
+def document_for(obj):
+    """Model obyekti -> (kind, obj_id, owner_id, is_public, title, body)."""
+    from main.models import Notice, UploadedFile
+
+    if isinstance(obj, Notice):
+        return NOTICE, obj.pk, obj.owner_id, obj.is_public, obj.title, obj.main_text
+    if isinstance(obj, UploadedFile):
+        return FILE, obj.pk, obj.owner_id, obj.is_public, obj.title, ''
+    raise TypeError(f"{type(obj).__name__} indekslanmaydi")
+
+
+class SearchHit:
+    def __init__(self, obj_id, rank=0.0, snippet=''):
+        self.obj_id = obj_id
+        self.rank = rank
+        self.snippet = snippet
+
+
+class BaseBackend:
+    supports_snippets = False
+
+    def index_many(self, documents):
+        raise NotImplementedError
+
+    def index(self, obj):
+        self.index_many([document_for(obj)])
+
+    def remove(self, kind, obj_id):
+        raise NotImplementedError
+
+    def clear(self, kind=None):
+        raise NotImplementedError
+
+    def search(self, kind, text, user, include_public, limit, shared_ids=()):
+        """
+        Reyting bo'yicha tartiblangan SearchHit ro'yxati: user'niki, ``include_public``
+        bo'lsa public'lar va ``shared_ids`` (AccessRequest). is_active indeksda yo'q —
+        uni chaqiruvchi tekshiradi.
+        """
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(BaseBackend):
+    supports_snippets = True
+
+    def index_many(self, documents):
+        rows = [
+            (rowid_for(kind, obj_id), kind, obj_id, owner_id, int(bool(is_public)), title, body)
+            for kind, obj_id, owner_id, is_public, title, body in documents
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {TABLE} WHERE rowid = %s", [(r[0],) for r in rows])
+            cursor.executemany(
+                f"INSERT INTO {TABLE} (rowid, kind, obj_id, owner_id, is_public, title, body) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, kind, obj_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [rowid_for(kind, obj_id)])
+
+    def clear(self, kind=None):
+        with connection.cursor() as cursor:
+            if kind is None:
+                cursor.execute(f"DELETE FROM {TABLE}")
+            else:
+                cursor.execute(f"DELETE FROM {TABLE} WHERE kind = %s", [kind])
+
+    def search(self, kind, text, user, include_public, limit, shared_ids=()):
+        match = to_match_query(text)
+        if not match:
+            return []
+
+        snippet_column = 5 if kind == NOTICE else 4
+        visibility = ["owner_id = %s"]
+        params = [match, kind, user.pk]
+        if include_public:
+            visibility.append("is_public = 1")
+        if shared_ids:
+            # Bitta parametr — ruxsatlar ko'p bo'lsa ham SQLite o'zgaruvchilar chegarasi yo'q
+            visibility.append("obj_id IN (SELECT value FROM json_each(%s))")
+            params.append(json.dumps(sorted(shared_ids)))
+        visibility = "(" + " OR ".join(visibility) + ")"
+
+        # bm25: title ustuni body'dan 10 barobar og'irroq
+        sql = (
+            f"SELECT obj_id, bm25({TABLE}, 0, 0, 0, 0, 10.0, 1.0) AS rank, "
+            f"snippet({TABLE}, {snippet_column}, %s, %s, '…', 16) "
+            f"FROM {TABLE} WHERE {TABLE} MATCH %s AND kind = %s AND {visibility} "
+            "ORDER BY rank LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [_MARK_START, _MARK_END] + params + [limit])
+            return [SearchHit(obj_id, rank, render_snippet(raw)) for obj_id, rank, raw in cursor.fetchall()]
+
+
+class LikeBackend(BaseBackend):
+    """FTS bo'lmagan bazalar uchun: eski icontains qidiruvi, indeks saqlanmaydi."""
+
+    def index_many(self, documents):
+        pass
+
+    def remove(self, kind, obj_id):
+        pass
+
+    def clear(self, kind=None):
+        pass
+
+    def search(self, kind, text, user, include_public, limit, shared_ids=()):
+        from main.models import Notice, UploadedFile
+
+        if kind == NOTICE:
+            qs = Notice.objects.filter(Q(title__icontains=text) | Q(main_text__icontains=text))
+        else:
+            qs = UploadedFile.objects.filter(title__icontains=text)
+        visible = Q(owner=user)
+        if include_public:
+            visible |= Q(is_public=True)
+        if shared_ids:
+            visible |= Q(pk__in=shared_ids)
+        ids = qs.filter(visible).order_by('-created_at').values_list('pk', flat=True)[:limit]
+        return [SearchHit(obj_id) for obj_id in ids]
+
+
+def get_backend():
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == 'sqlite':
+        return SQLiteFTSBackend()
+    return LikeBackend()
+
+
+def _fetch(queryset, hits, query):
+    """Hit'lar tartibida ``queryset``dagi obyektlar, har biriga .search_snippet biriktiriladi."""
+    objects = queryset.in_bulk([hit.obj_id for hit in hits])
+    results = []
+    for hit in hits:
+        obj = objects.get(hit.obj_id)
+        if obj is not None:
+            obj.search_snippet = hit.snippet
+            results.append(obj)
+
+    # Raqam kiritilsa — ID bo'yicha ham (avvalgi xatti-harakat)
+    if query.isdigit() and int(query) not in objects:
+        extra = queryset.filter(pk=int(query)).first()
+        if extra is not None:
+            extra.search_snippet = ''
+            results.insert(0, extra)
+    return results
+
+
+def search_notices(user, query, limit=50):
+    """Ro'yxat bilan bir xil ko'rinish sharti (access.listed_filters)."""
+    from main import access
+    from main.models import Notice
+
+    shared = access.grants(user)['notice']
+    hits = get_backend().search(NOTICE, query, user, include_public=True, limit=limit, shared_ids=shared)
+    return _fetch(access.listed(Notice, user), hits, query)
+
+
+def search_files(user, query, limit=50):
+    from main.models import UploadedFile
+
+    hits = get_backend().search(FILE, query, user, include_public=False, limit=limit)
+    return _fetch(UploadedFile.objects.filter(owner=user), hits, query)
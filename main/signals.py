@@ -0,0 +1,127 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from django.conf import settings
+
+from main import access, hotcache, search, storage, tasks, userstats
+from main.models import AccessRequest, Notice, UploadedFile, UploadedImage, UserStats
+
+
+# =========================
+# 🔎 Qidiruv indeksi
+# =========================
+@receiver(post_save, sender=Notice)
+@receiver(post_save, sender=UploadedFile)
+def index_for_search(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.get_backend().index(instance)
+
+
+@receiver(post_delete, sender=Notice)
+def unindex_notice(sender, instance, **kwargs):
+    search.get_backend().remove(search.NOTICE, instance.pk)
+
+
+@receiver(post_delete, sender=UploadedFile)
+def unindex_file(sender, instance, **kwargs):
+    search.get_backend().remove(search.FILE, instance.pk)
+
+
+# =========================
+# 📦 Blob refcount
+# =========================
+@receiver(post_delete, sender=UploadedFile)
+def release_blob(sender, instance, **kwargs):
+    storage.release(instance.file.name)
+
+
+# =========================
+# 🔥 public_id hot cache
+# =========================
+@receiver(post_save, sender=Notice)
+@receiver(post_save, sender=UploadedFile)
+@receiver(post_delete, sender=Notice)
+@receiver(post_delete, sender=UploadedFile)
+def invalidate_hot_cache(sender, instance, **kwargs):
+    hotcache.invalidate(sender, instance.public_id)
+
+
+# =========================
+# 🔐 Kirish huquqi keshi
+# =========================
+@receiver(post_save, sender=AccessRequest)
+@receiver(post_delete, sender=AccessRequest)
+def invalidate_access(sender, instance, **kwargs):
+    access.invalidate(instance.user_id)
+
+
+@receiver(m2m_changed, sender=UploadedImage.allowed_users.through)
+def invalidate_image_access(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # user.allowed_images.add(...) — instance foydalanuvchining o'zi
+        user_ids = [instance.pk]
+    elif pk_set is not None:
+        user_ids = pk_set
+    else:
+        # clear(): pk_set yo'q, o'chirilishidan oldin ro'yxat olinadi
+        user_ids = list(instance.allowed_users.values_list('pk', flat=True))
+    for user_id in user_ids:
+        access.invalidate(user_id)
+
+
+# =========================
+# 📊 Foydalanuvchi statistikasi (main/userstats.py)
+# =========================
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_user_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=UploadedFile)
+def count_file(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        userstats.add(instance.owner_id, file_count=1, bytes_stored=userstats.stored_bytes(instance))
+    else:
+        # Fayl almashtirildi: _snapshot hali eski qiymatlarda (save() oxirida yangilanadi)
+        delta = userstats.stored_bytes(instance) - userstats.stored_bytes(instance, snapshot=True)
+        userstats.add(instance.owner_id, bytes_stored=delta)
+
+
+@receiver(post_delete, sender=UploadedFile)
+def uncount_file(sender, instance, **kwargs):
+    userstats.add(
+        instance.owner_id,
+        file_count=-1,
+        bytes_stored=-userstats.stored_bytes(instance),
+        file_views=-instance.views_count,
+        file_downloads=-instance.downloaded_count,
+    )
+
+
+@receiver(post_save, sender=Notice)
+def count_notice(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        userstats.add(instance.owner_id, notice_count=1)
+
+
+@receiver(post_delete, sender=Notice)
+def uncount_notice(sender, instance, **kwargs):
+    userstats.add(instance.owner_id, notice_count=-1, notice_views=-(instance.views + instance.public_views))
+
+
+# =========================
+# 🔍 Yuklashdan keyingi tekshiruv (main/tasks.py, fon navbati)
+# =========================
+@receiver(post_save, sender=UploadedFile)
+def schedule_inspection(sender, instance, created, raw=False, **kwargs):
+    if raw or not instance.file:
+        return
+    # Faqat yangi yoki almashtirilgan fayl (_snapshot hali eski qiymatda)
+    if created or instance.file.name != getattr(instance, '_snapshot', {}).get('file'):
+        tasks.inspect_upload.delay(instance.pk)
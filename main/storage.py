@@ -0,0 +1,160 @@
+"""
+UploadedFile uchun kontent-manzilli (deduplikatsiya qiluvchi) storage.
+
+Yuklangan fayl oqim davomida sha256 bilan xeshlanadi va
+``blobs/ab/cd/<sha256><ext>`` nomi ostida faqat bir marta saqlanadi. Bir xil
+faylni yuklagan yuzlab foydalanuvchilar bitta blob'ga ishora qiladi;
+``Blob.refcount`` nechta UploadedFile qatori shu blob'dan foydalanayotganini
+sanaydi va oxirgi havola yo'qolganda blob diskdan o'chiriladi (``collect``).
+
+O'chirish va parallel yuklash poygasi: yuklash mavjud blob'ni qayta
+ishlatganda uning mtime'ini yangilaydi (``_save``), ``acquire`` esa model
+saqlangandan keyin keladi. ``collect`` blob'ni avval tombstone nomiga
+ko'chiradi, so'ng mtime va refcount'ni qayta tekshiradi — shu oraliqda
+tegilgan yoki qayta olingan blob joyiga qaytariladi. ``BLOB_GC_GRACE_SECONDS``
+dan yangi blob'lar o'chirilmaydi (``manage.py gc_blobs`` keyinroq yig'adi).
+
+Eski (``uploads/files/...``) fayllar o'zgarishsiz ishlayveradi, refcount
+faqat blob nomlari uchun yuritiladi. Yetim blob'lar: ``manage.py gc_blobs``,
+tejalgan joy: ``manage.py storage_report``.
+"""
+import hashlib
+import os
+import tempfile
+import time
+import uuid
+
+from django.conf import settings
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+BLOB_PREFIX = 'blobs/'
+CHUNK_SIZE = 64 * 1024
+TOMBSTONE_SUFFIX = '.deleting'
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def digest_from_name(name):
+    """``blobs/ab/cd/<sha256>.pdf`` -> sha256, blob bo'lmasa None."""
+    if not is_blob_name(name):
+        return None
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def blob_name(digest, ext):
+    return f'{BLOB_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # Yakuniy nomni _save mazmun bo'yicha tanlaydi
+        return name
+
+    def _save(self, name, content):
+        ext = os.path.splitext(name)[1].lower()[:16]
+        tmp_dir = self.path(BLOB_PREFIX + 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        with tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False) as tmp:
+            try:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+
+        final = blob_name(digest.hexdigest(), ext)
+        final_path = self.path(final)
+        try:
+            # Xuddi shu mazmun allaqachon bor — nusxa kerak emas. mtime yangilanadi:
+            # collect() acquire()'gacha bo'lgan oraliqda blob'ni o'chirmaydi
+            os.utime(final_path)
+            os.unlink(tmp.name)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(tmp.name, final_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(final_path, self.file_permissions_mode)
+        return final
+
+
+file_storage = ContentAddressedStorage()
+
+
+# =========================
+# Refcount
+# =========================
+def acquire(name, size=None):
+    """Yangi UploadedFile qatori blob'ga ishora qila boshladi."""
+    from main.models import Blob
+
+    if not is_blob_name(name):
+        return
+    if Blob.objects.filter(name=name).update(refcount=F('refcount') + 1):
+        return
+    try:
+        with transaction.atomic():
+            Blob.objects.create(
+                name=name,
+                digest=digest_from_name(name),
+                size=size if size is not None else file_storage.size(name),
+                refcount=1,
+            )
+    except IntegrityError:
+        # Parallel so'rov yaratib ulgurdi
+        Blob.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+
+def release(name):
+    """Havola yo'qoldi; oxirgisi bo'lsa blob commit'dan keyin yig'iladi."""
+    from main.models import Blob
+
+    if not is_blob_name(name):
+        return
+    Blob.objects.filter(name=name).update(refcount=F('refcount') - 1)
+    if Blob.objects.filter(name=name, refcount__lte=0).exists():
+        transaction.on_commit(lambda: collect(name))
+
+
+def collect(name, grace=None):
+    """
+    Hech kim ishlatmayotgan blob'ni diskdan va bazadan o'chiradi.
+
+    Blob yangi bo'lsa (grace ichida yuklangan yoki qayta ishlatilgan) yoki
+    refcount yana > 0 bo'lsa tegilmaydi. O'chirilgan bo'lsa True.
+    """
+    from main.models import Blob
+
+    if grace is None:
+        grace = getattr(settings, 'BLOB_GC_GRACE_SECONDS', 3600)
+    path = file_storage.path(name)
+    cutoff = time.time() - grace
+    try:
+        if os.path.getmtime(path) > cutoff:
+            return False
+        tombstone = f'{path}.{uuid.uuid4().hex}{TOMBSTONE_SUFFIX}'
+        os.rename(path, tombstone)
+    except FileNotFoundError:
+        Blob.objects.filter(name=name, refcount__lte=0).delete()
+        return False
+
+    # rename'gacha tekkan _save mtime'ni yangilagan; acquire bo'lgan bo'lsa refcount > 0.
+    # rename'dan keyingi _save faylni yo'q deb ko'radi va qayta yozadi.
+    if os.path.getmtime(tombstone) > cutoff or Blob.objects.filter(name=name, refcount__gt=0).exists():
+        os.replace(tombstone, path)
+        return False
+    Blob.objects.filter(name=name, refcount__lte=0).delete()
+    os.unlink(tombstone)
+    return True
@@ -0,0 +1,113 @@
+"""
+Yuklashdan keyingi og'ir ishlar — so'rov ichida emas, fon navbatida (main/jobs.py).
+
+    inspect_upload           -- MIME aniqlash, sha256 tekshiruvi, rasm o'lchami,
+                                virus-scan o'rinbosari (EICAR test imzosi)
+    generate_image_variants  -- UploadedImage variantlari (IMAGE_VARIANTS_QUEUE='jobs')
+
+Natija ``UploadedFile.metadata`` ga yoziladi; yuqtirilgan fayl nofaol qilinadi.
+"""
+import hashlib
+import logging
+import mimetypes
+
+from django.utils import timezone
+
+from main import hotcache, images, jobs
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+
+# Haqiqiy antivirus o'rniga: barcha skanerlar taniydigan zararsiz test satri
+EICAR = b'X5O!P%@AP[4\\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*'
+
+# Fayl boshidagi imzo -> MIME (kengaytmaga ishonmaslik uchun)
+MAGIC = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'PK\x03\x04', 'application/zip'),
+    (b'\x1f\x8b', 'application/gzip'),
+    (b'7z\xbc\xaf\x27\x1c', 'application/x-7z-compressed'),
+    (b'Rar!\x1a\x07', 'application/vnd.rar'),
+)
+
+
+def sniff(head, filename):
+    for signature, content_type in MAGIC:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+
+def _image_size(uploaded):
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with uploaded.file.open('rb') as fh, Image.open(fh) as img:
+            return {'width': img.width, 'height': img.height}
+    except (UnidentifiedImageError, OSError):
+        return {}
+
+
+@jobs.task(max_attempts=3)
+def inspect_upload(file_id):
+    from main.models import UploadedFile
+
+    uploaded = UploadedFile.objects.filter(pk=file_id).first()
+    if uploaded is None or not uploaded.file:
+        return  # o'chirilgan yoki reclaim qilingan
+
+    name = uploaded.file.name
+    digest = hashlib.sha256()
+    head, tail = b'', b''
+    size = 0
+    infected = False
+    with uploaded.file.open('rb') as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_SIZE), b''):
+            if not head:
+                head = chunk[:16]
+            digest.update(chunk)
+            size += len(chunk)
+            # Imzo ikki bo'lak chegarasiga tushishi mumkin
+            window = tail + chunk
+            infected = infected or EICAR in window
+            tail = window[-len(EICAR):]
+
+    content_type = sniff(head, uploaded.original_name or name)
+    metadata = {
+        'mime': content_type,
+        'bytes': size,
+        'sha256_ok': digest.hexdigest() == uploaded.content_hash if uploaded.content_hash else None,
+        'scan': 'infected' if infected else 'clean',
+        'inspected_at': timezone.now().isoformat(),
+    }
+    if content_type.startswith('image/'):
+        metadata.update(_image_size(uploaded))
+
+    updates = {'metadata': metadata}
+    if not uploaded.content_hash:
+        updates['content_hash'] = digest.hexdigest()
+    if infected:
+        # updated_at: fragment kesh (file/list.html) va ETag yangilanadi — expiry._deactivate kabi
+        updates.update(is_active=False, updated_at=timezone.now())
+        logger.warning("Yuqtirilgan fayl nofaol qilindi: #%s %s", uploaded.pk, name)
+
+    # Fayl shu orada almashtirilgan bo'lsa natija eskirgan — yangisi o'z vazifasini oladi
+    if UploadedFile._base_manager.filter(pk=file_id, file=name).update(**updates) and infected:
+        hotcache.invalidate(UploadedFile, uploaded.public_id)
+
+
+@jobs.task(max_attempts=3)
+def generate_image_variants(image_id, force=False):
+    from main.models import UploadedImage
+
+    image = UploadedImage.objects.filter(pk=image_id).first()
+    if image is None or not image.image or not image.content_hash:
+        return
+    images.render_all(*images.job_for(image, force))
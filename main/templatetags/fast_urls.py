@@ -0,0 +1,71 @@
+"""
+``{% cached_url %}`` — ``{% url %}`` bilan bir xil natija, lekin ro'yxatlarda
+har qatorda qayta reverse qilinmaydi.
+
+Naqsh (url nomi + argument turlari) bir marta sentinel qiymatlar bilan
+reverse qilinadi va bo'laklarga ajratiladi; keyingi chaqiruvlar faqat
+bo'laklar orasiga id / public_id ni qo'yadi. int va UUID'dan boshqa
+argumentlar (yoki naqshni ajratib bo'lmasa) oddiy ``reverse`` ga o'tadi.
+"""
+import uuid
+from functools import lru_cache
+
+from django import template
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import NoReverseMatch, get_script_prefix, get_urlconf, reverse
+
+register = template.Library()
+
+_MEMO = 'fast_urls.parts'
+
+# argument turi -> konverterdan o'tadigan, URL'da boshqa uchramaydigan qiymat
+SENTINELS = {
+    int: lambda i: str(7310000000000000000 + i),
+    uuid.UUID: lambda i: f'{i:08x}-5e47-4e11-8d00-5e7e11e15e47',
+}
+
+
+@lru_cache(maxsize=512)
+def _parts(name, kinds, urlconf, prefix):
+    sentinels = [SENTINELS[kind](i) for i, kind in enumerate(kinds)]
+    try:
+        url = reverse(name, args=sentinels, urlconf=urlconf)
+    except NoReverseMatch:
+        return None
+
+    parts = []
+    for sentinel in sentinels:
+        if url.count(sentinel) != 1:
+            return None
+        head, url = url.split(sentinel)
+        parts.append(head)
+    parts.append(url)
+    return tuple(parts)
+
+
+@receiver(setting_changed)
+def _reset(setting, **kwargs):
+    if setting == 'ROOT_URLCONF':
+        _parts.cache_clear()
+
+
+@register.simple_tag(takes_context=True)
+def cached_url(context, name, *args):
+    kinds = tuple(type(arg) for arg in args)
+    parts = None
+    if all(kind in SENTINELS for kind in kinds):
+        # urlconf / script prefix (asgiref Local) render davomida bir marta o'qiladi
+        memo = context.render_context.setdefault(_MEMO, {})
+        key = (name, kinds)
+        if key not in memo:
+            memo[key] = _parts(name, kinds, get_urlconf(), get_script_prefix())
+        parts = memo[key]
+    if parts is None:
+        return reverse(name, args=args)
+
+    url = [parts[0]]
+    for arg, part in zip(args, parts[1:]):
+        url.append(str(arg))
+        url.append(part)
+    return ''.join(url)
@@ -1,3 +1,1554 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import io
+import os
+import queue
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.db.models import F
+from django.test import AsyncRequestFactory, Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from main import (
+    access, compression, counters, delivery, hotcache, images, ingest, jobs, limits, metrics, pagination, quotas, rollups,
+    search, storage, tasks, uploads, userstats,
+)
+from main.view import public_async
+from main.models import (
+    AccessRequest, Blob, FileDownloadLog, FileStatRollup, FileViewLog, Job, Notice, OwnerStatRollup, StatRollup, UploadedFile,
+    UploadedImage, UploadSession, UserStats,
+)
+
+
+MEDIA_ROOT = tempfile.mkdtemp(prefix='amaliyot-tests-')
+
+
+def consume(response):
+    # ASYNC_PUBLIC_VIEWS ostida download async iterator bilan yuboriladi
+    if response.is_async:
+        async def collect():
+            return b''.join([chunk async for chunk in response.streaming_content])
+        return async_to_sync(collect)()
+    return b''.join(response.streaming_content)
+
+
+class BudgetedViewsMixin:
+    """QUERY_BUDGETS'dagi har bir view uchun URL; yangi budjet qo'shilsa test ham qo'shilishi shart."""
+
+    def create_objects(self):
+        self.user = get_user_model().objects.create_user(username='owner', password='pass')
+        self.file = UploadedFile(owner=self.user, title='Hisobot', is_public=True)
+        self.file.file.save('hisobot.txt', ContentFile(b'salom dunyo'), save=False)
+        self.file.save()
+        self.notice = Notice.objects.create(owner=self.user, title='Eslatma', main_text='Matn', is_public=True)
+
+    def budget_urls(self):
+        return {
+            'file_public': (False, reverse('file_public', args=[self.file.public_id])),
+            'file_public_download': (False, reverse('file_public_download', args=[self.file.public_id])),
+            'notice_public': (False, reverse('notice_public', args=[self.notice.public_id])),
+            'file_list': (True, reverse('file_list')),
+            'file_list_json': (True, reverse('file_list_json')),
+            'file_detail': (True, reverse('file_detail', args=[self.file.pk])),
+            'file_download': (True, reverse('file_download', args=[self.file.pk])),
+            'notice_list': (True, reverse('notice_list')),
+            'notice_list_json': (True, reverse('notice_list_json')),
+            'notice_detail': (True, reverse('notice_detail', args=[self.notice.pk])),
+        }
+
+    def test_every_budgeted_view(self):
+        urls = self.budget_urls()
+        self.assertEqual(set(urls), set(settings.QUERY_BUDGETS))
+        # Public view'lar ikki marta: hot cache miss va hit (tekshiruv so'rovi bilan)
+        for name, (login, url) in sorted(urls.items(), key=lambda item: item[1][0]):
+            if login:
+                self.client.force_login(self.user)
+            for _ in range(1 if login else 2):
+                with self.subTest(view=name):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    if response.streaming:
+                        consume(response)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class QueryBudgetTests(BudgetedViewsMixin, TestCase):
+    """QUERY_BUDGETS: har bir view o'z chegarasidan oshmasligi kerak (strict rejim)."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        hotcache.cache.backend.clear()
+        self.create_objects()
+
+    def test_budget_exceeded(self):
+        url = reverse('file_public', args=[self.file.public_id])
+        with override_settings(QUERY_BUDGETS={'file_public': 0}):
+            with self.assertRaises(metrics.QueryBudgetExceeded):
+                self.client.get(url)
+
+            with override_settings(QUERY_BUDGET_STRICT=False), self.assertLogs('main.metrics', 'WARNING'):
+                self.client.get(url)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class LiveQueryBudgetTests(BudgetedViewsMixin, TransactionTestCase):
+    """TestCase tranzaksiyasiz: so'rovlar production'dagi kabi BEGIN/COMMIT bilan."""
+
+    def setUp(self):
+        hotcache.cache.backend.clear()
+        self.create_objects()
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        metrics.registry.reset()
+
+    def test_server_timing(self):
+        user = get_user_model().objects.create_user(username='owner', password='pass')
+        self.client.force_login(user)
+
+        timing = self.client.get(reverse('file_list'))['Server-Timing']
+
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="3 queries"', timing)
+        self.assertIn('tpl;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    def test_prometheus_endpoint(self):
+        self.client.get(reverse('notice_list'))
+
+        staff = get_user_model().objects.create_user(username='ops', password='pass', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        body = response.content.decode()
+        self.assertIn('amaliyot_http_requests_total{view="notice_list",method="GET",status="302"} 1', body)
+        self.assertIn('amaliyot_http_request_duration_seconds_count{view="notice_list"} 1', body)
+        self.assertIn('# TYPE amaliyot_hot_cache_hits_total counter', body)
+        self.assertIn('amaliyot_log_ingest_queue_depth', body)
+
+    def test_prometheus_endpoint_forbidden(self):
+        # Lokal proxy ortida har bir tashqi so'rov ham 127.0.0.1 dan keladi
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+        with override_settings(METRICS_ALLOWED_IPS=('10.0.0.5',)):
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.5').status_code, 200)
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.6').status_code, 404)
+
+    async def test_async_view_queries(self):
+        """sync_to_async oqimidagi so'rovlar ham joriy so'rovga yoziladi."""
+        async def view(request):
+            await sync_to_async(lambda: get_user_model().objects.count())()
+            await get_user_model().objects.acount()
+            return HttpResponse('ok')
+
+        middleware = metrics.InstrumentationMiddleware(view)
+        response = await middleware(RequestFactory().get('/'))
+
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class AccessTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(username='owner', password='pass')
+        self.guest = User.objects.create_user(username='guest', password='pass')
+        self.notice = Notice.objects.create(owner=self.owner, title='Yopiq', main_text='Matn')
+        self.file = UploadedFile.objects.create(owner=self.owner, title='Yopiq fayl')
+        access.invalidate(self.guest.pk)
+
+    def fresh(self, user):
+        return get_user_model().objects.get(pk=user.pk)
+
+    def test_owner_and_public(self):
+        self.assertTrue(access.can_view(self.owner, self.notice))
+        self.assertFalse(access.can_view(AnonymousUser(), self.notice))
+        self.notice.is_public = True
+        self.assertTrue(access.can_view(AnonymousUser(), self.notice))
+
+    def test_approval_invalidates_cache(self):
+        request = AccessRequest.objects.create(user=self.guest, notice=self.notice)
+        self.assertFalse(access.can_view(self.fresh(self.guest), self.notice))
+
+        request.is_approved = True
+        request.save()
+        self.assertTrue(access.can_view(self.fresh(self.guest), self.notice))
+        self.assertFalse(access.can_view(self.fresh(self.guest), self.file))
+
+        request.delete()
+        self.assertFalse(access.can_view(self.fresh(self.guest), self.notice))
+
+    def test_revocation_reaches_other_workers(self):
+        request = AccessRequest.objects.create(user=self.guest, notice=self.notice, is_approved=True)
+        guest = self.fresh(self.guest)
+        self.assertTrue(access.can_view(guest, self.notice))
+        stale_key, stale = access._key(guest), access.grants(guest)
+
+        request.is_approved = False
+        request.save()
+        # Boshqa worker'ning LocMem keshida eski yozuv hali turibdi
+        access._cache().set(stale_key, stale)
+        guest = self.fresh(self.guest)
+        self.assertNotEqual(access._key(guest), stale_key)
+        self.assertFalse(access.can_view(guest, self.notice))
+        self.assertFalse(async_to_sync(access.acan_view)(guest, self.notice))
+
+    def test_stale_user_save_keeps_version(self):
+        guest = self.fresh(self.guest)
+        AccessRequest.objects.create(user=self.guest, notice=self.notice, is_approved=True)
+        guest.first_name = 'Mehmon'
+        guest.save()
+        self.assertGreater(self.fresh(self.guest).access_version, guest.access_version)
+
+    def test_batch_check_single_query(self):
+        AccessRequest.objects.create(user=self.guest, file=self.file, is_approved=True)
+        others = [UploadedFile.objects.create(owner=self.owner, title=f'f{i}') for i in range(5)]
+
+        guest = self.fresh(self.guest)
+        with self.assertNumQueries(1):
+            visible = access.filter_visible(guest, [self.file] + others)
+        self.assertEqual(visible, [self.file])
+
+        # Keshdan — yangi so'rovdagi user obyekti uchun ham
+        guest = self.fresh(self.guest)
+        with self.assertNumQueries(0):
+            access.filter_visible(guest, others)
+
+    def test_allowed_users_m2m(self):
+        image = UploadedImage.objects.create(owner=self.owner, title='Rasm')
+        self.assertFalse(access.can_view(self.fresh(self.guest), image))
+
+        image.allowed_users.add(self.guest)
+        self.assertTrue(access.can_view(self.fresh(self.guest), image))
+
+        image.allowed_users.clear()
+        self.assertFalse(access.can_view(self.fresh(self.guest), image))
+
+    def test_views(self):
+        self.client.force_login(self.guest)
+        notice_url = reverse('notice_public', args=[self.notice.public_id])
+        self.assertEqual(self.client.get(notice_url).status_code, 403)
+        self.assertEqual(self.client.get(reverse('file_download', args=[self.file.pk])).status_code, 403)
+
+        AccessRequest.objects.create(user=self.guest, notice=self.notice, is_approved=True)
+        self.assertEqual(self.client.get(notice_url).status_code, 200)
+        self.assertContains(self.client.get(reverse('notice_list')), 'Yopiq')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class UserStatsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='owner', password='pass')
+
+    def stats(self):
+        return UserStats.objects.get(pk=self.user.pk)
+
+    def upload(self, content, **kwargs):
+        uploaded = UploadedFile(owner=self.user, title='Fayl', **kwargs)
+        uploaded.file.save('fayl.txt', ContentFile(content), save=False)
+        uploaded.save()
+        return uploaded
+
+    def test_incremental(self):
+        uploaded = self.upload(b'12345')
+        notice = Notice.objects.create(owner=self.user, title='Eslatma', main_text='Matn')
+        counters.incr(uploaded, 'views_count')
+        counters.incr(uploaded, 'downloaded_count', 2)
+        counters.incr(notice, 'views')
+
+        stats = self.stats()
+        self.assertEqual(
+            (stats.file_count, stats.bytes_stored, stats.notice_count, stats.file_views, stats.file_downloads, stats.notice_views),
+            (1, 5, 1, 1, 2, 1),
+        )
+
+        # Fayl almashtirildi — hajm farqi qo'shiladi
+        uploaded = UploadedFile.objects.get(pk=uploaded.pk)
+        uploaded.file.save('yangi.txt', ContentFile(b'123'), save=False)
+        uploaded.save()
+        self.assertEqual(self.stats().bytes_stored, 3)
+
+        uploaded.refresh_from_db()
+        uploaded.delete()
+        notice.refresh_from_db()
+        notice.delete()
+        stats = self.stats()
+        self.assertEqual((stats.file_count, stats.bytes_stored, stats.file_views, stats.notice_views), (0, 0, 0, 0))
+
+    def test_limited_reservations(self):
+        uploaded = self.upload(b'12345', download_limit=2)
+        notice = Notice.objects.create(owner=self.user, title='Eslatma', main_text='Matn', is_public=True, download_limit=1)
+        self.assertTrue(limits.reserve_file_download(uploaded))
+        self.assertTrue(limits.reserve_notice_view(notice))
+        self.assertFalse(limits.reserve_notice_view(notice))
+        counters.incr(notice, 'views')
+
+        stats = self.stats()
+        self.assertEqual((stats.file_downloads, stats.notice_views), (1, 2))
+        self.assertEqual(userstats.reconcile(fix=False)['drifted'], 0)
+
+        uploaded.refresh_from_db()
+        uploaded.delete()
+        notice.refresh_from_db()
+        notice.delete()
+        stats = self.stats()
+        self.assertEqual((stats.file_downloads, stats.notice_views), (0, 0))
+
+    def test_reconcile(self):
+        self.upload(b'abc')
+        # bulk_create signalsiz — drift
+        UploadedFile.objects.bulk_create([UploadedFile(owner=self.user, title='x', size=10, file='x.txt', views_count=4)])
+        UserStats.objects.filter(pk=self.user.pk).delete()
+        other = get_user_model().objects.create_user(username='other', password='pass')
+        Notice.objects.bulk_create([Notice(owner=other, title='n', main_text='m', views=7)])
+
+        report = userstats.reconcile(batch_size=1, fix=False)
+        self.assertEqual((report['users'], report['drifted'], report['missing']), (2, 1, 1))
+        self.assertFalse(UserStats.objects.filter(pk=self.user.pk).exists())
+
+        userstats.reconcile(batch_size=1)
+        self.assertEqual(userstats.compute([self.user.pk, other.pk]), {
+            row['user_id']: {field: row[field] for field in userstats.FIELDS}
+            for row in UserStats.objects.values('user_id', *userstats.FIELDS)
+        })
+        self.assertEqual(self.stats().bytes_stored, 13)
+        self.assertEqual(userstats.reconcile()['drifted'], 0)
+
+    def test_account_page(self):
+        self.upload(b'12345')
+        self.client.force_login(self.user)
+        # sessiya + user + UserStats
+        with self.assertNumQueries(3):
+            response = self.client.get('/account/')
+        self.assertContains(response, 'Fayllar:</strong> 1')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, STORAGE_QUOTAS={'user': 10}, STORAGE_QUOTA_DEFAULT=None)
+class QuotaTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='owner', password='pass')
+        self.client.force_login(self.user)
+
+    def upload(self, content, url=None):
+        return self.client.post(url or reverse('file_create'), {
+            'title': 'Fayl',
+            'file': SimpleUploadedFile('fayl.txt', content),
+        })
+
+    def test_create_within_and_over_quota(self):
+        self.assertEqual(self.upload(b'12345').status_code, 302)
+        response = self.upload(b'12345678')
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(UploadedFile.objects.count(), 1)
+        self.assertEqual(quotas.usage(self.user.pk), 5)
+
+    def test_per_user_override(self):
+        self.user.storage_quota = 100
+        self.user.save()
+        self.assertEqual(self.upload(b'x' * 50).status_code, 302)
+
+    def test_content_length_rejected_before_parsing(self):
+        with override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=100):
+            response = self.upload(b'x' * 1000)
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(UploadedFile.objects.exists())
+
+    def test_rejected_before_csrf_check(self):
+        self.client = Client(enforce_csrf_checks=True)
+        self.client.force_login(self.user)
+        with override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=100):
+            response = self.upload(b'x' * 1000)
+        self.assertEqual(response.status_code, 413)
+        # Kvotaga sig'adigan, lekin tokensiz yuklash — 403
+        self.assertEqual(self.upload(b'12345').status_code, 403)
+        self.assertFalse(UploadedFile.objects.exists())
+
+    def test_replace_credits_old_file(self):
+        self.upload(b'12345678')
+        uploaded = UploadedFile.objects.get()
+        response = self.upload(b'123456789', url=reverse('file_edit', args=[uploaded.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(quotas.usage(self.user.pk), 9)
+
+    def test_charging_rolls_back(self):
+        self.upload(b'12345')
+        uploaded = UploadedFile(owner=self.user, title='Katta')
+        uploaded.file.save('katta.txt', ContentFile(b'12345678'), save=False)
+        with self.assertRaises(quotas.QuotaExceeded):
+            with quotas.charging(uploaded, self.user):
+                uploaded.save()
+        self.assertEqual(UploadedFile.objects.count(), 1)
+        self.assertEqual(quotas.usage(self.user.pk), 5)
+
+    def test_resumable_session_declared_length(self):
+        response = self.client.post(reverse('upload_session_create'), {'filename': 'a.bin', 'length': 11})
+        self.assertEqual(response.status_code, 413)
+
+
+CALLS = []
+
+
+@jobs.task(max_attempts=2)
+def flaky(value, fail=False):
+    if fail:
+        raise ValueError(value)
+    CALLS.append(value)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, JOBS_EAGER=False)
+class JobTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_and_run(self):
+        flaky.delay('a')
+        flaky.delay('b')
+        self.assertEqual(jobs.run_pending(), 2)
+        self.assertEqual(CALLS, ['a', 'b'])
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 2)
+        # Oddiy chaqiruv navbatsiz
+        flaky('c')
+        self.assertEqual(CALLS[-1], 'c')
+
+    def test_retry_backoff_then_dead_letter(self):
+        job = flaky.delay('x', fail=True)
+        with self.assertLogs('main.jobs', 'WARNING'):
+            jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('ValueError', job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('main.jobs', 'ERROR'):
+            jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.DEAD, 2))
+
+        self.assertEqual(jobs.requeue_dead(), 1)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.QUEUED)
+
+    def test_claim_is_exclusive(self):
+        for i in range(5):
+            flaky.delay(i)
+        first = jobs.claim('w1', limit=3)
+        second = jobs.claim('w2', limit=10)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({job.pk for job in first} & {job.pk for job in second})
+        self.assertEqual(jobs.claim('w3'), [])
+
+    def test_stale_lock_requeued(self):
+        flaky.delay('s')
+        jobs.claim('dead-worker')
+        later = timezone.now() + timedelta(seconds=601)
+        self.assertEqual(jobs.requeue_stale(now=later), (1, 0))
+        self.assertEqual(Job.objects.get().status, Job.QUEUED)
+
+    def test_upload_inspection(self):
+        user = get_user_model().objects.create_user(username='owner', password='pass')
+        uploaded = UploadedFile(owner=user, title='Virus', is_public=True)
+        uploaded.file.save('eicar.txt', ContentFile(b'xx' + tasks.EICAR + b'yy'), save=False)
+        uploaded.save()
+        job = Job.objects.get(name='main.tasks.inspect_upload')
+        self.assertEqual(job.payload['args'], [uploaded.pk])
+
+        before = uploaded.updated_at
+        # Fragment kesh karantindan oldingi qatorni saqlab qolgan
+        self.client.force_login(user)
+        self.assertContains(self.client.get(reverse('file_list')), 'Virus')
+        with self.assertLogs('main.tasks', 'WARNING'):
+            jobs.run_pending()
+        uploaded.refresh_from_db()
+        self.assertGreater(uploaded.updated_at, before)
+        self.assertEqual(uploaded.metadata['scan'], 'infected')
+        self.assertEqual(uploaded.metadata['mime'], 'text/plain')
+        self.assertTrue(uploaded.metadata['sha256_ok'])
+        self.assertFalse(uploaded.is_active)
+
+        # Muddatni uzaytirish karantinni ochmaydi
+        uploaded.expire_date = timezone.now() + timedelta(days=1)
+        uploaded.save()
+        uploaded.refresh_from_db()
+        self.assertFalse(uploaded.is_active)
+
+        response = self.client.get(reverse('file_list'))
+        self.assertContains(response, 'Karantin')
+        self.assertNotContains(response, 'Expired')
+
+    def test_metrics(self):
+        flaky.delay('m')
+        data = jobs.metrics()
+        self.assertEqual(data['queued'], 1)
+        jobs.run_pending()
+        self.assertEqual(jobs.metrics()['completed_last_minute'], 1)
+
+
+class HttpCacheTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+        self.notice = Notice.objects.create(owner=self.owner, title='Ochiq', main_text='Matn', is_public=True)
+        self.url = reverse('notice_public', args=[self.notice.public_id])
+
+    def views(self):
+        self.notice.refresh_from_db()
+        return self.notice.public_views
+
+    def test_not_modified_skips_render_but_counts(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        self.assertIn('no-cache', first['Cache-Control'])
+        self.assertIn('public', first['Cache-Control'])
+        self.assertIn('Cookie', first['Vary'])
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.templates, [])
+        self.assertEqual(self.views(), 2)
+
+        by_date = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(by_date.status_code, 304)
+
+        # save() -> updated_at -> yangi ETag
+        self.notice.title = 'Yangi'
+        self.notice.save()
+        third = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third['ETag'], first['ETag'])
+
+    def test_limit_enforced_on_revalidation(self):
+        self.notice.download_limit = 1
+        self.notice.save()
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 404)
+
+    def test_authenticated_private(self):
+        anonymous = self.client.get(self.url)
+        self.client.force_login(self.owner)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=anonymous['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    @override_settings(HTTP_CACHE_VIEW_BEACON=True, HTTP_CACHE_MAX_AGE=120)
+    def test_beacon_mode(self):
+        response = self.client.get(self.url)
+        self.assertIn('s-maxage=120', response['Cache-Control'])
+        self.assertContains(response, 'sendBeacon')
+        self.assertEqual(self.views(), 0)
+
+        seen = reverse('notice_public_seen', args=[self.notice.public_id])
+        self.assertEqual(self.client.post(seen).status_code, 204)
+        self.assertEqual(self.client.get(seen).status_code, 405)
+        self.assertEqual(self.views(), 1)
+
+        # Limitli notice beacon'ga tushmaydi
+        self.notice.download_limit = 5
+        self.notice.save()
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'sendBeacon')
+        self.client.post(seen)
+        self.assertEqual(self.views(), 2)
+
+    @override_settings(MEDIA_ROOT=MEDIA_ROOT)
+    def test_file_page_tracks_download_count(self):
+        uploaded = UploadedFile(owner=self.owner, title='Fayl', is_public=True, download_limit=3)
+        uploaded.file.save('fayl.txt', ContentFile(b'abc'), save=False)
+        uploaded.save()
+        url = reverse('file_public', args=[uploaded.public_id])
+
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.assertFalse(first.has_header('Last-Modified'))
+
+        self.client.get(reverse('file_public_download', args=[uploaded.public_id]))
+        # Hot cache'dagi qator TTL tugagach yangilanadi — sahifa va ETag birga
+        hotcache.invalidate(UploadedFile, uploaded.public_id)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+        uploaded.refresh_from_db()
+        self.assertEqual(uploaded.views_count, 3)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class CompressionTests(TestCase):
+    def setUp(self):
+        caches['compressed'].clear()
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+        self.notice = Notice.objects.create(
+            owner=self.owner, title='Katta', main_text='Juda uzun matn. ' * 500, is_public=True,
+        )
+        self.url = reverse('notice_public', args=[self.notice.public_id])
+
+    def upload(self, name, content):
+        uploaded = UploadedFile(owner=self.owner, title=name, is_public=True)
+        uploaded.file.save(name, ContentFile(content), save=False)
+        uploaded.save()
+        return reverse('file_public_download', args=[uploaded.public_id])
+
+    def test_private_pages_padded_gzip(self):
+        for i in range(5):
+            Notice.objects.create(owner=self.owner, title=f'Eslatma {i}', main_text='Matn ' * 100)
+        self.client.force_login(self.owner)
+        sizes = set()
+        for _ in range(10):
+            response = self.client.get(reverse('notice_list'), HTTP_ACCEPT_ENCODING='br, gzip')
+            # BREACH: brotli yo'q, gzip sarlavhasida tasodifiy to'ldirgich
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('Eslatma 4', gzip.decompress(response.content).decode())
+            sizes.add(len(response.content))
+        self.assertGreater(len(sizes), 1)
+
+    def test_negotiate(self):
+        self.assertEqual(compression.negotiate('deflate, gzip;q=0.5'), 'gzip')
+        self.assertIsNone(compression.negotiate('gzip;q=0'))
+        self.assertIsNone(compression.negotiate('identity'))
+        self.assertIsNone(compression.negotiate(''))
+
+    def test_public_page_compressed_once(self):
+        first = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', first['Vary'])
+        body = gzip.decompress(first.content)
+        self.assertIn('Juda uzun matn.', body.decode())
+        self.assertLess(len(first.content), len(body) // 3)
+
+        # Keshdan: render ham, siqish ham yo'q, ko'rish esa sanaladi
+        second = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(second.templates, [])
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.notice.refresh_from_db()
+        self.assertEqual(self.notice.public_views, 2)
+
+        plain = self.client.get(self.url)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+        self.notice.main_text = 'Yangi matn. ' * 500
+        self.notice.save()
+        third = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertIn('Yangi matn.', gzip.decompress(third.content).decode())
+
+    def test_downloads_not_compressed(self):
+        text = self.upload('log.txt', b'qator\n' * 2000)
+        response = self.client.get(text, HTTP_ACCEPT_ENCODING='gzip')
+        # If-Range bilan davom ettirish: kuchli ETag, oraliqlar va uzunlik saqlanadi
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Length'], '12000')
+        self.assertFalse(response['ETag'].startswith('W/'))
+        self.assertEqual(consume(response), b'qator\n' * 2000)
+
+        partial = self.client.get(text, HTTP_ACCEPT_ENCODING='gzip', HTTP_RANGE='bytes=0-5', HTTP_IF_RANGE=response['ETag'])
+        self.assertEqual(partial.status_code, 206)
+        self.assertFalse(partial.has_header('Content-Encoding'))
+
+        archive = self.upload('arxiv.zip', b'PK\x03\x04' + b'\x00' * 4000)
+        response = self.client.get(archive, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Content-Length'], '4004')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class DeliveryTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+        self.content = bytes(range(256)) * 4
+
+    def upload(self, **kwargs):
+        uploaded = UploadedFile(owner=self.owner, title='Fayl', is_public=True, **kwargs)
+        uploaded.file.save('fayl.bin', ContentFile(self.content), save=False)
+        uploaded.save()
+        return uploaded, reverse('file_public_download', args=[uploaded.public_id])
+
+    def count(self, uploaded):
+        uploaded.refresh_from_db()
+        return uploaded.downloaded_count
+
+    def test_parse_range_header(self):
+        parse = delivery.parse_range_header
+        self.assertEqual(parse('bytes=0-99', 1000), [(0, 99)])
+        self.assertEqual(parse('bytes=-100', 1000), [(900, 999)])
+        self.assertEqual(parse('bytes=900-', 1000), [(900, 999)])
+        self.assertEqual(parse('bytes=950-2000', 1000), [(950, 999)])
+        self.assertEqual(parse('bytes=0-10,5-20,21-30,50-60', 1000), [(0, 30), (50, 60)])
+        self.assertIsNone(parse('bytes=5-1', 1000))
+        self.assertIsNone(parse('items=0-1', 1000))
+        self.assertIsNone(parse('bytes=a-b', 1000))
+        self.assertIsNone(parse('', 1000))
+        with self.assertRaises(delivery.RangeNotSatisfiable):
+            parse('bytes=2000-', 1000)
+
+    def test_range_and_if_range(self):
+        uploaded, url = self.upload()
+        full = self.client.get(url)
+        self.assertEqual(consume(full), self.content)
+        etag = full['ETag']
+
+        partial = self.client.get(url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE=etag)
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(consume(partial), self.content[10:20])
+
+        # Boshqa versiya / eski sana — butun fayl
+        stale = self.client.get(url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"boshqa"')
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(consume(stale), self.content)
+        old = self.client.get(url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='Mon, 01 Jan 2001 00:00:00 GMT')
+        self.assertEqual(old.status_code, 200)
+
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=5000-').status_code, 416)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_limit_on_head_and_resume(self):
+        uploaded, url = self.upload(download_limit=1)
+
+        # HEAD limitni yemaydi
+        self.assertEqual(self.client.head(url).status_code, 200)
+        self.assertEqual(self.count(uploaded), 0)
+
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        consume(first)
+        self.assertEqual(self.count(uploaded), 1)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        # Shu brauzer (cookie tokeni bilan) uzilganini davom ettira oladi
+        resumed = self.client.get(url, HTTP_RANGE='bytes=1-')
+        self.assertEqual(resumed.status_code, 206)
+        self.assertEqual(len(consume(resumed)), 1023)
+        self.assertEqual(self.count(uploaded), 1)
+
+        # Tokensiz Range ham, HEAD ham limit tugaganini ko'radi
+        stranger = Client()
+        self.assertEqual(stranger.get(url, HTTP_RANGE='bytes=1-').status_code, 404)
+        self.assertEqual(stranger.head(url).status_code, 404)
+        self.assertEqual(self.count(uploaded), 1)
+
+        # Fayl almashtirilsa eski token yaroqsiz
+        uploaded.file.save('yangi.bin', ContentFile(b'yangi mazmun'), save=False)
+        uploaded.save()
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=1-').status_code, 404)
+
+
+class LimitTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+
+    def test_reserve_boundary(self):
+        uploaded = UploadedFile.objects.create(owner=self.owner, title='Fayl', download_limit=2)
+        self.assertTrue(limits.reserve(UploadedFile, uploaded.pk, 'downloaded_count'))
+        self.assertTrue(limits.reserve(UploadedFile, uploaded.pk, 'downloaded_count'))
+        self.assertFalse(limits.reserve(UploadedFile, uploaded.pk, 'downloaded_count'))
+        uploaded.refresh_from_db()
+        self.assertEqual(uploaded.downloaded_count, 2)
+        self.assertFalse(limits.available(UploadedFile, uploaded.pk, 'downloaded_count'))
+
+    def test_reserve_amount(self):
+        uploaded = UploadedFile.objects.create(owner=self.owner, title='Fayl', download_limit=3, downloaded_count=2)
+        self.assertFalse(limits.reserve(UploadedFile, uploaded.pk, 'downloaded_count', amount=2))
+        self.assertTrue(limits.reserve(UploadedFile, uploaded.pk, 'downloaded_count', amount=1))
+
+    def test_areserve_boundary(self):
+        uploaded = UploadedFile.objects.create(owner=self.owner, title='Fayl', download_limit=1)
+        areserve = async_to_sync(limits.areserve)
+        self.assertTrue(areserve(UploadedFile, uploaded.pk, 'downloaded_count'))
+        self.assertFalse(areserve(UploadedFile, uploaded.pk, 'downloaded_count'))
+        self.assertFalse(async_to_sync(limits.adownload_available)(uploaded))
+
+    def test_unlimited_and_helpers(self):
+        uploaded = UploadedFile.objects.create(owner=self.owner, title='Fayl')
+        for _ in range(3):
+            self.assertTrue(limits.reserve_file_download(uploaded))
+        uploaded.refresh_from_db()
+        self.assertEqual(uploaded.downloaded_count, 3)
+
+        notice = Notice.objects.create(owner=self.owner, title='N', main_text='M', is_public=True, download_limit=1)
+        self.assertTrue(limits.reserve_notice_view(notice))
+        self.assertEqual(notice.public_views, 1)
+        self.assertFalse(limits.reserve_notice_view(notice))
+        self.assertFalse(async_to_sync(limits.areserve_notice_view)(notice))
+
+
+@override_settings(COUNTER_BUFFERING=True, COUNTER_FLUSH_INTERVAL=3600, COUNTER_MAX_PENDING=100)
+class CounterBufferTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+        self.file = UploadedFile.objects.create(owner=self.owner, title='Fayl')
+        self.buffer = counters.CounterBuffer()
+
+    def tearDown(self):
+        self.buffer._stop.set()
+
+    def db(self, field):
+        return UploadedFile.objects.values_list(field, flat=True).get(pk=self.file.pk)
+
+    def test_buffered_until_flush(self):
+        self.buffer.incr(self.file, 'views_count')
+        self.buffer.incr(self.file, 'views_count', 2)
+        self.assertEqual(self.db('views_count'), 0)
+        self.assertEqual(self.buffer.pending(self.file, 'views_count'), 3)
+        self.assertEqual(self.buffer.apply_pending(self.file, 'views_count').views_count, 3)
+
+        self.assertEqual(self.buffer.flush(), 6)  # fayl + egasining UserStats ustuni
+        self.assertEqual(self.db('views_count'), 3)
+        self.assertEqual(UserStats.objects.get(pk=self.owner.pk).file_views, 3)
+        self.assertEqual(self.buffer.size(), 0)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    @override_settings(COUNTER_MAX_PENDING=2)
+    def test_flush_on_size(self):
+        other = UploadedFile.objects.create(owner=self.owner, title='Boshqa')
+        self.buffer.incr(self.file, 'downloaded_count')
+        self.assertEqual(self.buffer.flushes, 1)  # fayl + UserStats = 2 kalit
+        self.buffer.incr(other, 'downloaded_count')
+        self.assertEqual(self.db('downloaded_count'), 1)
+        self.assertEqual(UserStats.objects.get(pk=self.owner.pk).file_downloads, 2)
+
+    def test_failed_flush_keeps_increments(self):
+        self.buffer.incr(self.file, 'views_count')
+        with mock.patch.object(self.buffer, '_write', side_effect=RuntimeError('db yo‘q')):
+            with self.assertRaises(RuntimeError):
+                self.buffer.flush()
+        self.assertEqual(self.buffer.pending(self.file, 'views_count'), 1)
+        self.buffer.flush()
+        self.assertEqual(self.db('views_count'), 1)
+
+    def test_spool_replay(self):
+        path = os.path.join(tempfile.mkdtemp(prefix='amaliyot-spool-'), 'counters.spool')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path), ignore_errors=True)
+        with override_settings(COUNTER_SPOOL_PATH=path):
+            self.buffer.incr(self.file, 'views_count', 4)
+            self.assertEqual(self.buffer.spool(), 2)
+            self.assertEqual(self.buffer.size(), 0)
+            self.assertTrue(os.path.exists(path))
+
+            # Keyingi jarayon: yangi bufer spool'ni o'qib bazaga yozadi
+            replay = counters.CounterBuffer()
+            self.addCleanup(replay._stop.set)
+            self.assertEqual(replay.load_spool(), 2)
+            self.assertFalse(os.path.exists(path))
+            self.assertEqual(replay.load_spool(), 0)
+        self.assertEqual(self.db('views_count'), 4)
+        self.assertEqual(UserStats.objects.get(pk=self.owner.pk).file_views, 4)
+
+
+@override_settings(LOG_INGESTION_ASYNC=True, LOG_QUEUE_SIZE=1)
+class LogIngestTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+        self.file = UploadedFile.objects.create(owner=self.owner, title='Fayl')
+        self.pipeline = ingest.LogPipeline()
+        # Fon oqimisiz: navbatni testning o'zi bo'shatadi
+        self.pipeline._queue = queue.Queue(maxsize=1)
+        self.pipeline._thread = object()
+        self.pipeline._pid = os.getpid()
+        self.spill_dir = tempfile.mkdtemp(prefix='amaliyot-spill-')
+        self.addCleanup(shutil.rmtree, self.spill_dir, ignore_errors=True)
+        self.spill_path = os.path.join(self.spill_dir, 'logs.spill')
+
+    def record(self):
+        self.pipeline.record('main.FileViewLog', file_id=self.file.pk, user_id=self.owner.pk)
+
+    @override_settings(LOG_QUEUE_POLICY='drop')
+    def test_overflow_drops(self):
+        self.record()
+        with self.assertLogs('main.ingest', 'WARNING'):
+            self.record()
+        self.assertEqual(self.pipeline.metrics()['dropped'], 1)
+        self.assertEqual(self.pipeline.drain(), 1)
+        self.assertEqual(FileViewLog.objects.count(), 1)
+
+    @override_settings(LOG_QUEUE_POLICY='block', LOG_QUEUE_BLOCK_TIMEOUT=0.01)
+    def test_block_times_out_then_drops(self):
+        self.record()
+        with self.assertLogs('main.ingest', 'WARNING'):
+            self.record()
+        self.assertEqual(self.pipeline.metrics()['dropped'], 1)
+
+    @override_settings(LOG_QUEUE_POLICY='spill')
+    def test_overflow_spills_and_replays(self):
+        with override_settings(LOG_SPILL_PATH=self.spill_path):
+            self.record()
+            self.record()
+            self.record()
+            self.assertEqual(self.pipeline.metrics()['spilled'], 2)
+            self.assertEqual(FileViewLog.objects.count(), 0)
+
+            self.assertEqual(self.pipeline.replay_spill(), 2)
+            self.assertFalse(os.path.exists(self.spill_path))
+            self.assertEqual(self.pipeline.replay_spill(), 0)
+        self.pipeline.drain()
+        self.assertEqual(FileViewLog.objects.filter(file=self.file, user=self.owner).count(), 3)
+
+    def test_write_skips_deleted_rows(self):
+        other = get_user_model().objects.create_user(username='ketgan', password='pass')
+        gone = UploadedFile.objects.create(owner=self.owner, title="O'chiriladi")
+        batch = [
+            ('main.FileViewLog', {'file_id': self.file.pk, 'user_id': other.pk, 'viewed_at': timezone.now()}),
+            ('main.FileDownloadLog', {'file_id': gone.pk, 'user_id': None, 'downloaded_at': timezone.now()}),
+        ]
+        other.delete()
+        gone.delete()
+        self.assertEqual(self.pipeline.write(batch), 1)
+        self.assertIsNone(FileViewLog.objects.get().user_id)
+        self.assertFalse(FileDownloadLog.objects.exists())
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+        other = get_user_model().objects.create_user(username='other', password='pass')
+        base = timezone.now()
+        self.notices = []
+        for i in range(7):
+            notice = Notice.objects.create(owner=self.owner if i % 2 else other, title=f'N{i}', main_text='M', is_public=i < 4)
+            # Uchtasi bir xil vaqtda — tartib id bo'yicha ajraladi
+            Notice.objects.filter(pk=notice.pk).update(created_at=base - timedelta(minutes=min(i, 3)))
+            self.notices.append(notice)
+        self.expected = list(Notice.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def walk(self, querysets, per_page):
+        pages, cursor = [], None
+        while True:
+            page = pagination.paginate(querysets, cursor, per_page)
+            pages.append(page)
+            if not page.has_next:
+                return pages
+            cursor = page.next_cursor
+
+    def test_cursor_round_trip(self):
+        notice = Notice.objects.get(pk=self.notices[0].pk)
+        cursor = pagination.encode_cursor(pagination.NEXT, notice)
+        self.assertEqual(pagination.decode_cursor(cursor), (pagination.NEXT, notice.created_at, notice.pk))
+        self.assertIsNone(pagination.decode_cursor('buzuq!'))
+        self.assertIsNone(pagination.decode_cursor(pagination.encode_cursor('x', notice)))
+
+    def test_forward_and_back(self):
+        pages = self.walk(Notice.objects.all(), 3)
+        self.assertEqual([len(p) for p in pages], [3, 3, 1])
+        self.assertEqual([n.pk for p in pages for n in p], self.expected)
+        self.assertFalse(pages[0].has_previous)
+
+        # Oxirgi sahifadan orqaga — xuddi shu sahifalar
+        back = pagination.paginate(Notice.objects.all(), pages[2].prev_cursor, 3)
+        self.assertEqual([n.pk for n in back], [n.pk for n in pages[1]])
+        first = pagination.paginate(Notice.objects.all(), back.prev_cursor, 3)
+        self.assertEqual([n.pk for n in first], [n.pk for n in pages[0]])
+        self.assertFalse(first.has_previous)
+
+    def test_merge_dedupes_overlapping_querysets(self):
+        mine = Notice.objects.filter(owner=self.owner)
+        public = Notice.objects.filter(is_public=True)
+        expected = [pk for pk in self.expected if pk in set(mine.values_list('pk', flat=True)) | set(public.values_list('pk', flat=True))]
+
+        pages = self.walk([mine, public], 2)
+        seen = [n.pk for p in pages for n in p]
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), len(set(seen)))
+
+
+@skipUnless(connection.vendor == 'sqlite', "FTS5 indeksi faqat SQLite'da")
+class SearchTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+        self.other = get_user_model().objects.create_user(username='other', password='pass')
+
+    def titles(self, query, user=None):
+        return [n.title for n in search.search_notices(user or self.owner, query)]
+
+    def test_title_ranks_above_body(self):
+        Notice.objects.create(owner=self.owner, title='Kundalik', main_text='Oylik hisobot shu yerda')
+        Notice.objects.create(owner=self.owner, title='Hisobot', main_text='Qisqa matn')
+        Notice.objects.create(owner=self.owner, title='Boshqa', main_text='Aloqasi yo‘q')
+        self.assertEqual(self.titles('hisobot'), ['Hisobot', 'Kundalik'])
+        # Prefiks qidiruv va snippet
+        results = search.search_notices(self.owner, 'hisob')
+        self.assertEqual(len(results), 2)
+        self.assertIn('<mark>', str(results[1].search_snippet))
+
+    def test_visibility(self):
+        Notice.objects.create(owner=self.other, title='Yopiq reja', main_text='x')
+        Notice.objects.create(owner=self.other, title='Ochiq reja', main_text='x', is_public=True)
+        self.assertEqual(self.titles('reja'), ['Ochiq reja'])
+        self.assertEqual(sorted(self.titles('reja', self.other)), ['Ochiq reja', 'Yopiq reja'])
+
+        UploadedFile.objects.create(owner=self.other, title='reja.pdf', is_public=True)
+        self.assertEqual(search.search_files(self.owner, 'reja'), [])
+
+    def test_same_predicate_as_list(self):
+        Notice.objects.create(owner=self.other, title='Eski reja', main_text='x', is_public=True, is_active=False)
+        shared = Notice.objects.create(owner=self.other, title='Ulashilgan reja', main_text='x')
+        hidden = Notice.objects.create(owner=self.other, title='Yashirin reja', main_text='x')
+        Notice.objects.create(owner=self.owner, title='Mening eski rejam', main_text='x', is_active=False)
+        AccessRequest.objects.create(user=self.owner, notice=shared, is_approved=True)
+        owner = get_user_model().objects.get(pk=self.owner.pk)
+
+        self.assertEqual(sorted(self.titles('reja', owner)), ['Mening eski rejam', 'Ulashilgan reja'])
+        self.client.force_login(self.owner)
+        listed = [n['title'] for n in self.client.get(reverse('notice_list_json')).json()['results']]
+        self.assertEqual(sorted(listed), ['Mening eski rejam', 'Ulashilgan reja'])
+        # Raqam bo'yicha qidiruv ham ruxsatsiz qatorni bermaydi
+        self.assertEqual(search.search_notices(owner, str(hidden.pk)), [])
+
+    def test_update_and_delete(self):
+        notice = Notice.objects.create(owner=self.owner, title='Eski sarlavha', main_text='x')
+        uploaded = UploadedFile.objects.create(owner=self.owner, title='jadval.xlsx')
+        self.assertEqual(self.titles('eski'), ['Eski sarlavha'])
+
+        notice.title = 'Yangi sarlavha'
+        notice.save()
+        self.assertEqual(self.titles('eski'), [])
+        self.assertEqual(self.titles('yangi'), ['Yangi sarlavha'])
+
+        notice.delete()
+        uploaded.delete()
+        self.assertEqual(self.titles('sarlavha'), [])
+        self.assertEqual(search.search_files(self.owner, 'jadval'), [])
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {search.TABLE}")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_match_query_is_escaped(self):
+        self.assertEqual(search.to_match_query('a"b OR c*'), '"a"* "b"* "OR"* "c"*')
+        self.assertEqual(search.search_notices(self.owner, '"*()'), [])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class StorageTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+
+    def upload(self, content):
+        uploaded = UploadedFile(owner=self.owner, title='Fayl')
+        uploaded.file.save('fayl.bin', ContentFile(content), save=False)
+        uploaded.save()
+        return uploaded
+
+    def age(self, name, seconds=7200):
+        # Blob grace'dan eski (yuklanganiga ancha bo'lgan)
+        path = storage.file_storage.path(name)
+        old = os.path.getmtime(path) - seconds
+        os.utime(path, (old, old))
+
+    def test_shared_blob_kept_until_last_release(self):
+        first = self.upload(b'bir xil mazmun 1')
+        second = self.upload(b'bir xil mazmun 1')
+        name = first.file.name
+        self.assertEqual(second.file.name, name)
+        self.assertEqual(Blob.objects.get(name=name).refcount, 2)
+        self.age(name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(Blob.objects.get(name=name).refcount, 1)
+        self.assertTrue(storage.file_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(Blob.objects.filter(name=name).exists())
+        self.assertFalse(storage.file_storage.exists(name))
+
+    def test_recent_blob_left_for_gc(self):
+        uploaded = self.upload(b'yangi blob 2')
+        name = uploaded.file.name
+        with self.captureOnCommitCallbacks(execute=True):
+            uploaded.delete()
+        self.assertTrue(storage.file_storage.exists(name))
+        self.assertEqual(Blob.objects.get(name=name).refcount, 0)
+
+        call_command('gc_blobs', '--grace-minutes', '0', stdout=io.StringIO())
+        self.assertFalse(Blob.objects.filter(name=name).exists())
+        self.assertFalse(storage.file_storage.exists(name))
+
+    def test_reuse_before_acquire_survives_collect(self):
+        uploaded = self.upload(b'poyga 3')
+        name = uploaded.file.name
+        self.age(name)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            uploaded.delete()
+        # Parallel yuklash blob'ni topdi (yozmadi), acquire hali bo'lmagan
+        self.assertEqual(storage.file_storage.save('boshqa.bin', ContentFile(b'poyga 3')), name)
+        for callback in callbacks:
+            callback()
+        self.assertTrue(storage.file_storage.exists(name))
+        storage.acquire(name)
+        self.assertEqual(Blob.objects.get(name=name).refcount, 1)
+
+    def test_collect_restores_reacquired_blob(self):
+        uploaded = self.upload(b'qayta olingan 4')
+        name = uploaded.file.name
+        self.age(name)
+        Blob.objects.filter(name=name).update(refcount=0)
+        real_rename = os.rename
+
+        def rename_then_acquire(src, dst):
+            real_rename(src, dst)
+            Blob.objects.filter(name=name).update(refcount=1)
+
+        with mock.patch('main.storage.os.rename', side_effect=rename_then_acquire):
+            self.assertFalse(storage.collect(name))
+        self.assertTrue(storage.file_storage.exists(name))
+        self.assertEqual(os.listdir(os.path.dirname(storage.file_storage.path(name))), [os.path.basename(name)])
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class UploadSessionTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='owner', password='pass')
+        self.client.force_login(self.user)
+        self.content = b'bo\xe2\x80\x98laklab yuklangan fayl ' * 10
+
+    def create(self, **fields):
+        data = {'filename': 'hisobot.txt', 'length': len(self.content), **fields}
+        return self.client.post(reverse('upload_session_create'), data, content_type='application/json')
+
+    def patch(self, session_id, offset, chunk):
+        return self.client.generic(
+            'PATCH', reverse('upload_session', args=[session_id]), chunk,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_round_trip(self):
+        checksum = hashlib.sha256(self.content).hexdigest()
+        response = self.create(checksum=checksum, download_limit=3)
+        self.assertEqual(response.status_code, 201)
+        session_id = response.json()['id']
+
+        self.assertEqual(self.patch(session_id, 0, self.content[:100]).status_code, 204)
+        head = self.client.head(reverse('upload_session', args=[session_id]))
+        self.assertEqual(head['Upload-Offset'], '100')
+        response = self.patch(session_id, 100, self.content[100:])
+        self.assertEqual(response['Upload-Offset'], str(len(self.content)))
+
+        response = self.client.post(reverse('upload_session_finalize', args=[session_id]))
+        self.assertEqual(response.status_code, 201)
+        uploaded = UploadedFile.objects.get()
+        self.assertEqual(uploaded.content_hash, checksum)
+        self.assertEqual(uploaded.download_limit, 3)
+        with uploaded.file.open('rb') as fh:
+            self.assertEqual(fh.read(), self.content)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_invalid_fields_rejected(self):
+        for fields in (
+            {'download_limit': 'abc'},
+            {'expire_date': 'ertaga'},
+            {'length': -1},
+            {'length': 'ko‘p'},
+            {'filename': ''},
+            {'checksum': 'zz'},
+        ):
+            with self.subTest(fields=fields):
+                response = self.create(**fields)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('fields', response.json())
+        response = self.client.post(reverse('upload_session_create'), '[1]', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_offset_mismatch(self):
+        session_id = self.create().json()['id']
+        self.patch(session_id, 0, self.content[:10])
+        response = self.patch(session_id, 0, self.content[:10])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Upload-Offset'], '10')
+
+    def test_concurrent_patch_is_refused(self):
+        session = UploadSession.objects.get(pk=self.create().json()['id'])
+        with uploads.locked(session):
+            # Birinchi PATCH hali yozmoqda: ikkinchisi qo'shib yozmaydi
+            response = self.patch(session.pk, 0, self.content[:10])
+            self.assertEqual(response.status_code, 409)
+            with open(uploads.part_path(session), 'ab') as fh:
+                fh.write(self.content[:20])
+            # HEAD yarim yozilgan bo'lakni kesib tashlamaydi
+            self.assertEqual(uploads.reconcile(session), 0)
+            self.assertEqual(os.path.getsize(uploads.part_path(session)), 20)
+        session.refresh_from_db()
+        self.assertEqual(session.offset, 0)
+        self.assertEqual(uploads.reconcile(session), 0)
+        self.assertEqual(os.path.getsize(uploads.part_path(session)), 0)
+
+    def finalize(self, session=None):
+        if session is None:
+            session = UploadSession.objects.get(pk=self.create().json()['id'])
+            self.patch(session.pk, 0, self.content)
+        path = uploads.part_path(session)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('upload_session_finalize', args=[session.pk]))
+        return session, path, response
+
+    def test_existing_blob_touched(self):
+        name = storage.file_storage.save('eski.txt', ContentFile(self.content))
+        target = storage.file_storage.path(name)
+        os.utime(target, (0, 0))
+        _, path, response = self.finalize()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(UploadedFile.objects.get().file.name, name)
+        # collect() acquire()'gacha o'chirmasin
+        self.assertGreater(os.path.getmtime(target), 0)
+        self.assertFalse(storage.collect(name))
+        self.assertFalse(os.path.exists(path))
+
+    @override_settings(STORAGE_QUOTAS={'user': 300}, STORAGE_QUOTA_DEFAULT=None)
+    def test_quota_race_keeps_part(self):
+        session = UploadSession.objects.get(pk=self.create().json()['id'])
+        self.patch(session.pk, 0, self.content)
+        uploaded = UploadedFile(owner=self.user, title='Boshqa')
+        uploaded.file.save('boshqa.bin', ContentFile(b'x' * 100), save=False)
+        uploaded.save()
+        # quotas.check o'tdi, shu orada boshqa yuklash joyni egalladi
+        with mock.patch('main.quotas.check'):
+            session, path, response = self.finalize(session)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(UploadedFile.objects.count(), 1)
+        session.refresh_from_db()
+        self.assertEqual(session.offset, len(self.content))
+        with open(path, 'rb') as fh:
+            self.assertEqual(fh.read(), self.content)
+
+    def test_checksum_mismatch(self):
+        session_id = self.create(checksum='0' * 64).json()['id']
+        self.patch(session_id, 0, self.content)
+        response = self.client.post(reverse('upload_session_finalize', args=[session_id]))
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(UploadedFile.objects.exists())
+
+    def test_discard(self):
+        session = UploadSession.objects.get(pk=self.create().json()['id'])
+        self.patch(session.pk, 0, self.content[:10])
+        path, lock = uploads.part_path(session), uploads.lock_path(session)
+        response = self.client.delete(reverse('upload_session', args=[session.pk]))
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(lock))
+
+
+class TrackerTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+        Notice.objects.create(owner=self.owner, title='Eslatma', main_text='Matn')
+        self.notice = Notice.objects.get()
+
+    def save_sql(self, obj):
+        with CaptureQueriesContext(connection) as ctx:
+            obj.save()
+        return [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+
+    def test_only_changed_fields_written(self):
+        self.notice.title = 'Yangi sarlavha'
+        self.assertEqual(self.notice.changed_fields(), {'title'})
+        [sql] = self.save_sql(self.notice)
+        self.assertIn('"title"', sql)
+        self.assertIn('"updated_at"', sql)
+        self.assertNotIn('"main_text"', sql)
+        self.assertNotIn('"views"', sql)
+        self.assertEqual(self.notice.changed_fields(), set())
+
+    def test_concurrent_counter_not_overwritten(self):
+        # Boshqa so'rov ko'rishni sanadi, bu nusxa esa eski qiymatni ko'tarib yuribdi
+        Notice.objects.filter(pk=self.notice.pk).update(views=F('views') + 5)
+        self.notice.main_text = 'Tahrirlangan'
+        self.notice.save()
+        self.notice.refresh_from_db()
+        self.assertEqual(self.notice.views, 5)
+        self.assertEqual(self.notice.main_text, 'Tahrirlangan')
+
+    def test_excluded_fields_never_dirty(self):
+        self.notice.views = 99
+        self.assertEqual(self.notice.changed_fields(), set())
+
+    def test_previous_and_refresh(self):
+        self.notice.title = 'Boshqa'
+        self.assertEqual(self.notice.previous('title'), 'Eslatma')
+        self.notice.refresh_from_db(fields=['title'])
+        self.assertFalse(self.notice.has_changed('title'))
+
+    def test_explicit_update_fields_respected(self):
+        self.notice.title = 'A'
+        self.notice.main_text = 'B'
+        with CaptureQueriesContext(connection) as ctx:
+            self.notice.save(update_fields=['title'])
+        [sql] = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertNotIn('"main_text"', sql)
+        # Yozilmagan maydon keyingi save() da yoziladi
+        self.assertEqual(self.notice.changed_fields(), {'main_text'})
+        self.notice.save()
+        self.notice.refresh_from_db()
+        self.assertEqual(self.notice.main_text, 'B')
+
+    @override_settings(MEDIA_ROOT=MEDIA_ROOT)
+    def test_file_field_change(self):
+        uploaded = UploadedFile(owner=self.owner, title='Fayl')
+        uploaded.file.save('a.txt', ContentFile(b'birinchi'), save=False)
+        uploaded.save()
+        uploaded = UploadedFile.objects.get()
+        self.assertEqual(uploaded.changed_fields(), set())
+        uploaded.file.save('b.txt', ContentFile(b'ikkinchi'), save=False)
+        self.assertIn('file', uploaded.changed_fields())
+
+
+class HotCacheTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+        self.notice = Notice.objects.create(owner=self.owner, title='Ommaviy', main_text='Matn', is_public=True)
+        self.cache = hotcache.HotCache(hotcache.LocMemLRUBackend())
+
+    def test_hit_rechecks_authorization_columns(self):
+        self.cache.get(Notice, self.notice.public_id)
+        with self.assertNumQueries(1):
+            self.assertTrue(self.cache.get(Notice, self.notice.public_id).is_public)
+        self.assertEqual(self.cache.metrics()['hits'], 1)
+
+        # Boshqa worker private qildi: bu jarayonda signal ishlamagan
+        Notice.objects.filter(pk=self.notice.pk).update(is_public=False)
+        self.assertFalse(self.cache.get(Notice, self.notice.public_id).is_public)
+        self.assertEqual(self.cache.metrics()['stale'], 1)
+
+    def test_deleted_row_not_served(self):
+        self.cache.get(Notice, self.notice.public_id)
+        Notice.objects.filter(pk=self.notice.pk).delete()
+        self.assertIsNone(self.cache.get(Notice, self.notice.public_id))
+        self.assertIsNone(async_to_sync(self.cache.aget)(Notice, self.notice.public_id))
+
+    def test_shared_backend_skips_recheck(self):
+        cache = hotcache.HotCache(hotcache.LocMemLRUBackend(), recheck=False)
+        cache.get(Notice, self.notice.public_id)
+        with self.assertNumQueries(0):
+            cache.get(Notice, self.notice.public_id)
+        self.assertFalse(hotcache.DjangoCacheBackend('default').shared)
+
+    def test_default_backend_shared(self):
+        # Standart 'hot' alias'i file-based: hit bazaga bormaydi
+        self.assertTrue(hotcache.cache.backend.shared)
+        self.assertFalse(hotcache.cache.recheck)
+        hotcache.get_or_404(Notice, self.notice.public_id)
+        with self.assertNumQueries(0):
+            hotcache.get_or_404(Notice, self.notice.public_id)
+
+        # Boshqa worker'ning save() signali umumiy yozuvni o'chiradi
+        other = hotcache.HotCache(hotcache.DjangoCacheBackend('hot'))
+        self.notice.is_public = False
+        self.notice.save()
+        self.assertFalse(other.get(Notice, self.notice.public_id).is_public)
+
+    @override_settings(MEDIA_ROOT=MEDIA_ROOT)
+    def test_deactivated_file_hidden(self):
+        uploaded = UploadedFile.objects.create(owner=self.owner, title='Fayl', is_public=True)
+        url = reverse('file_public', args=[uploaded.public_id])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        # expiry._deactivate / karantin: queryset.update() + qo'lda invalidatsiya
+        UploadedFile.objects.filter(pk=uploaded.pk).update(is_active=False)
+        hotcache.invalidate(UploadedFile, uploaded.public_id)
+        self.assertTemplateUsed(self.client.get(url), 'file/expired.html')
+
+
+def png(size, color=(200, 40, 40), mode='RGB'):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, IMAGE_VARIANTS_ASYNC=False, IMAGE_VARIANTS_QUEUE='pool')
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+
+    def upload(self, content, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return UploadedImage.objects.create(
+                owner=self.owner, title='Rasm', image=SimpleUploadedFile('rasm.png', content), **fields,
+            )
+
+    def size_of(self, digest, variant, fmt):
+        from PIL import Image
+
+        with Image.open(images.variant_path(digest, variant, fmt)) as img:
+            return img.size, img.mode
+
+    def test_variants_generated_on_commit(self):
+        image = self.upload(png((1600, 900), (10, 20, 30)))
+        digest = image.content_hash
+        self.assertTrue(images.has_variants(digest))
+        self.assertEqual(self.size_of(digest, 'w640', 'webp')[0], (640, 360))
+        self.assertEqual(self.size_of(digest, 'w1280', 'jpeg')[0], (1280, 720))
+        width, height = self.size_of(digest, images.THUMBNAIL, 'jpeg')[0]
+        self.assertLessEqual(max(width, height), 200)
+
+    def test_small_image_not_upscaled_and_alpha_flattened(self):
+        image = self.upload(png((100, 50), (0, 0, 255, 128), mode='RGBA'))
+        self.assertEqual(self.size_of(image.content_hash, 'w1280', 'webp')[0], (100, 50))
+        self.assertEqual(self.size_of(image.content_hash, 'w320', 'jpeg')[1], 'RGB')
+
+    def test_same_content_rendered_once(self):
+        content = png((800, 600), (1, 2, 3))
+        first = self.upload(content)
+        second = self.upload(content)
+        self.assertEqual(first.content_hash, second.content_hash)
+        args = images.job_for(second)
+        self.assertEqual(images.render_all(*args), (0, 0))
+        written, total = images.render_all(*images.job_for(second, force=True))
+        self.assertEqual(written, len(images.variant_specs()) * len(images.variant_formats()))
+        self.assertGreater(total, 0)
+
+    def test_variant_view(self):
+        image = self.upload(png((900, 900), (9, 9, 9)), is_public=True)
+        url = reverse('image_variant', args=[image.public_id, 'w320'])
+
+        response = self.client.get(url, HTTP_ACCEPT='image/webp,*/*')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('Accept', response['Vary'])
+        consume(response)
+        self.assertEqual(self.client.get(url)['Content-Type'], 'image/jpeg')
+
+        response = self.client.get(image.variant_url('w320', 'jpeg'))
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], data={'format': 'jpeg'}).status_code, 304)
+        self.assertEqual(self.client.get(reverse('image_variant', args=[image.public_id, 'w9999'])).status_code, 404)
+
+    def test_missing_variant_rendered_in_view(self):
+        image = self.upload(png((700, 700), (4, 5, 6)), is_public=True)
+        path = images.variant_path(image.content_hash, 'w640', 'jpeg')
+        os.unlink(path)
+        response = self.client.get(reverse('image_variant', args=[image.public_id, 'w640']), {'format': 'jpeg'})
+        self.assertEqual(response.status_code, 200)
+        consume(response)
+        self.assertTrue(os.path.exists(path))
+
+    def test_private_image_requires_login(self):
+        image = self.upload(png((300, 300), (7, 7, 7)))
+        response = self.client.get(reverse('image_variant', args=[image.public_id, images.THUMBNAIL]))
+        self.assertEqual(response.status_code, 302)
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+        self.file = UploadedFile.objects.create(owner=self.owner, title='Fayl')
+        self.when = timezone.now() - timedelta(hours=2)
+
+    def day_row(self, model=FileStatRollup, **lookup):
+        return model.objects.get(period=StatRollup.DAY, **(lookup or {'file': self.file}))
+
+    def test_run_is_incremental(self):
+        FileViewLog.objects.bulk_create([FileViewLog(file=self.file, viewed_at=self.when) for _ in range(3)])
+        FileDownloadLog.objects.create(file=self.file, downloaded_at=self.when)
+        self.assertEqual(rollups.run(lag=0), {rollups.VIEW: 3, rollups.DOWNLOAD: 1})
+        self.assertEqual(rollups.run(lag=0), {rollups.VIEW: 0, rollups.DOWNLOAD: 0})
+
+        FileViewLog.objects.create(file=self.file, viewed_at=self.when)
+        rollups.run(lag=0)
+        row = self.day_row()
+        self.assertEqual((row.views, row.downloads), (4, 1))
+        self.assertEqual(self.day_row(OwnerStatRollup, owner=self.owner).views, 4)
+
+    def test_concurrent_create_is_merged(self):
+        FileViewLog.objects.bulk_create([FileViewLog(file=self.file, viewed_at=self.when) for _ in range(2)])
+        FileDownloadLog.objects.create(file=self.file, downloaded_at=self.when)
+        rollups.run(lag=0)
+
+        # Ikkinchi run qatorni "yo'q" deb o'qidi, u esa bu orada yaratildi
+        FileViewLog.objects.create(file=self.file, viewed_at=self.when)
+        real_rows = rollups._rows
+        calls = []
+
+        def stale_first_read(*args):
+            calls.append(args)
+            return {} if len(calls) == 1 else real_rows(*args)
+
+        with mock.patch.object(rollups, '_rows', side_effect=stale_first_read):
+            rollups.run(lag=0)
+        row = self.day_row()
+        self.assertEqual((row.views, row.downloads), (3, 1))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class AsyncViewTests(TestCase):
+    """main/view/public_async.py — ASYNC_PUBLIC_VIEWS'dan qat'i nazar to'g'ridan-to'g'ri chaqiriladi."""
+
+    def setUp(self):
+        hotcache.cache.backend.clear()
+        self.factory = AsyncRequestFactory()
+        self.owner = get_user_model().objects.create_user(username='owner', password='pass')
+        self.file = UploadedFile(owner=self.owner, title='Hisobot', is_public=True)
+        self.file.file.save('hisobot.txt', ContentFile(b'async salom'), save=False)
+        self.file.save()
+        self.notice = Notice.objects.create(owner=self.owner, title='Eslatma', main_text='Matn', is_public=True)
+
+    async def test_file_public_counts_view(self):
+        response = await public_async.file_public_view(self.factory.get('/'), self.file.public_id)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Hisobot', response.content)
+        file = await UploadedFile.objects.aget(pk=self.file.pk)
+        self.assertEqual(file.views_count, 1)
+        self.assertEqual(await FileViewLog.objects.filter(file=file).acount(), 1)
+
+    async def test_matches_sync_validators(self):
+        request = self.factory.get('/')
+        response = await public_async.notice_public_view(request, self.notice.public_id)
+        sync_response = await sync_to_async(Client().get)(reverse('notice_public', args=[self.notice.public_id]))
+        self.assertEqual(response['ETag'], sync_response['ETag'])
+        self.assertEqual(response['Cache-Control'], sync_response['Cache-Control'])
+
+        request = self.factory.get('/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual((await public_async.notice_public_view(request, self.notice.public_id)).status_code, 304)
+
+    async def test_private_redirects_anonymous(self):
+        await UploadedFile.objects.filter(pk=self.file.pk).aupdate(is_public=False)
+        response = await public_async.file_public_view(self.factory.get('/'), self.file.public_id)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].startswith('/login/'))
+
+    async def test_download_streams_and_reserves_limit(self):
+        await UploadedFile.objects.filter(pk=self.file.pk).aupdate(download_limit=1)
+        response = await public_async.public_file_download_view(self.factory.get('/'), self.file.public_id)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(body, b'async salom')
+        self.assertEqual((await UploadedFile.objects.aget(pk=self.file.pk)).downloaded_count, 1)
+
+        with self.assertRaises(Http404):
+            await public_async.public_file_download_view(self.factory.get('/'), self.file.public_id)
+
+    async def test_notice_view_limit(self):
+        await Notice.objects.filter(pk=self.notice.pk).aupdate(download_limit=1)
+        response = await public_async.notice_public_view(self.factory.get('/'), self.notice.public_id)
+        self.assertEqual(response.status_code, 200)
+        with self.assertRaises(Http404):
+            await public_async.notice_public_view(self.factory.get('/'), self.notice.public_id)
+
+    async def test_expired_notice(self):
+        await Notice.objects.filter(pk=self.notice.pk).aupdate(expire_date=timezone.now() - timedelta(minutes=1))
+        response = await public_async.notice_public_view(self.factory.get('/'), self.notice.public_id)
+        self.assertNotIn(b'Matn', response.content)
+        self.assertFalse((await Notice.objects.aget(pk=self.notice.pk)).is_active)
+
+    async def test_missing_public_id(self):
+        with self.assertRaises(Http404):
+            await public_async.file_public_view(self.factory.get('/'), uuid.uuid4())
@@ -0,0 +1,101 @@
+"""
+Yengil maydon o'zgarishlari kuzatuvchisi.
+
+Model bazadan yuklanganda (``from_db``) maydon qiymatlarining nusxasi
+olinadi. ``save()`` shu nusxa bilan solishtirib faqat o'zgargan maydonlarni
+``update_fields`` orqali yozadi — eski qiymatni bilish uchun qo'shimcha
+SELECT kerak emas, parallel oshirilgan hisoblagichlar (views_count,
+downloaded_count, ...) esa tahrirlashda ustidan yozilmaydi.
+
+    class Notice(ChangeTrackingMixin, models.Model):
+        tracker_exclude = ('views', 'public_views')
+"""
+from django.db.models import FileField
+from django.db.models.fields.files import FieldFile
+
+
+def _normalize(value):
+    if isinstance(value, FieldFile):
+        return value.name or ''
+    return value
+
+
+class ChangeTrackingMixin:
+    # save() hech qachon yozmaydigan maydonlar (faqat F() bilan yangilanadi)
+    tracker_exclude = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot = {
+            name: _normalize(value) for name, value in zip(field_names, values)
+        }
+        return instance
+
+    def _take_snapshot(self, fields=None):
+        snapshot = getattr(self, '_snapshot', {}) if fields is not None else {}
+        for field in self._meta.concrete_fields:
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            if field.attname in self.__dict__:
+                snapshot[field.attname] = _normalize(self.__dict__[field.attname])
+        self._snapshot = snapshot
+
+    def _tracked_fields(self):
+        exclude = set(self.tracker_exclude)
+        return [
+            field for field in self._meta.concrete_fields
+            if not field.primary_key and field.name not in exclude
+        ]
+
+    def is_tracked(self):
+        return hasattr(self, '_snapshot') and not self._state.adding
+
+    def changed_fields(self):
+        """O'zgargan maydon nomlari (field.name)."""
+        snapshot = getattr(self, '_snapshot', {})
+        changed = set()
+        for field in self._tracked_fields():
+            if field.attname not in self.__dict__:
+                continue  # deferred va tegilmagan
+            current = _normalize(self.__dict__[field.attname])
+            if field.attname not in snapshot:
+                changed.add(field.name)
+            elif isinstance(field, FileField):
+                # None va '' — ikkalasi ham "fayl yo'q"
+                if (current or '') != (snapshot[field.attname] or ''):
+                    changed.add(field.name)
+            elif current != snapshot[field.attname]:
+                changed.add(field.name)
+        return changed
+
+    def has_changed(self, name):
+        return name in self.changed_fields()
+
+    def previous(self, name):
+        """Bazadagi (yuklangan paytdagi) qiymat; nusxa bo'lmasa bitta SELECT."""
+        if self._state.adding:
+            return None
+        field = self._meta.get_field(name)
+        snapshot = getattr(self, '_snapshot', None)
+        if snapshot is not None and field.attname in snapshot:
+            return snapshot[field.attname]
+        return type(self)._base_manager.filter(pk=self.pk).values_list(field.attname, flat=True).first()
+
+    def save(self, *args, **kwargs):
+        if self.is_tracked() and 'update_fields' not in kwargs and not kwargs.get('force_insert'):
+            dirty = self.changed_fields()
+            # auto_now (updated_at) har doim yoziladi
+            dirty.update(
+                field.name for field in self._tracked_fields()
+                if getattr(field, 'auto_now', False)
+            )
+            kwargs['update_fields'] = dirty
+        super().save(*args, **kwargs)
+        # update_fields'dan tashqaridagi o'zgarishlar hali yozilmagan — "iflos" qoladi
+        update_fields = kwargs.get('update_fields')
+        self._take_snapshot(None if update_fields is None else set(update_fields))
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._take_snapshot(fields)
@@ -0,0 +1,263 @@
+"""
+Bo'laklab (resumable) yuklash — tus protokoliga o'xshash.
+
+1. ``POST   /file/uploads/``                 sessiya ochish (title, filename, length, checksum)
+2. ``PATCH  /file/uploads/<id>/``            ``Upload-Offset`` header bilan navbatdagi bo'lak
+3. ``HEAD   /file/uploads/<id>/``            server qayergacha olganini bilish (davom ettirish)
+4. ``POST   /file/uploads/<id>/finalize/``   sha256 tekshiriladi, UploadedFile yaratiladi
+
+Bo'laklar to'g'ridan-to'g'ri storage ichidagi ``.part`` faylga yoziladi,
+holat esa UploadSession qatorida — klient yoki server qayta ishga tushsa
+ham yuklash to'xtagan joyidan davom etadi. Yakunda .part fayl nusxalanmaydi,
+blob nomiga hard link qilinadi; .part o'zi tranzaksiya commit bo'lgach
+o'chiriladi (kvota rad etsa sessiya offset'i saqlanadi). Rollback'dan qolgan
+yetim blob'ni ``manage.py gc_blobs`` yig'adi.
+
+Bitta sessiyaga parallel so'rovlar (ikki PATCH bir xil offsetga, PATCH va
+HEAD/finalize) ``.part.lock`` fayl qulfi bilan navbatlanadi: qulf band bo'lsa
+darhol 409 — klient HEAD bilan offsetni so'rab qayta urinadi.
+"""
+import hashlib
+import os
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from main import quotas, storage
+
+try:
+    import fcntl
+except ImportError:  # Windows: faqat bazadagi shartli UPDATE himoya qiladi
+    fcntl = None
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    status = 400
+
+
+class OffsetMismatch(UploadError):
+    status = 409
+
+
+class TooLarge(UploadError):
+    status = 413
+
+
+class ChecksumMismatch(UploadError):
+    status = 422
+
+
+class Incomplete(UploadError):
+    status = 409
+
+
+class Busy(UploadError):
+    status = 409
+
+
+class Gone(UploadError):
+    status = 404
+
+
+def part_name(session):
+    directory = getattr(settings, 'UPLOAD_SESSION_DIR', 'uploads/sessions/')
+    return f'{directory.rstrip("/")}/{session.pk}.part'
+
+
+def part_path(session):
+    return storage.file_storage.path(part_name(session))
+
+
+@contextmanager
+def locked(session):
+    """
+    Sessiya ustida eksklyuziv qulf (jarayonlar orasida ham). Band bo'lsa Busy.
+    Qulf olingach offset bazadan qayta o'qiladi — kutish paytida o'zgargan bo'lishi mumkin.
+    """
+    path = lock_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as fh:
+        if fcntl is not None:
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise Busy("Sessiyaga boshqa so'rov yozmoqda") from None
+        try:
+            try:
+                session.refresh_from_db(fields=['offset'])
+            except type(session).DoesNotExist:
+                raise Gone("Sessiya yakunlangan yoki bekor qilingan") from None
+            yield session
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def lock_path(session):
+    return part_path(session) + '.lock'
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def reconcile(session):
+    """
+    Server qulagandan keyin bazadagi offset va diskdagi fayl hajmini
+    moslashtiradi: kichigiga tushiriladi (yarim yozilgan bo'lak tashlanadi).
+    Hozir bo'lak yozilayotgan bo'lsa bazadagi offset qaytadi.
+    """
+    try:
+        with locked(session):
+            return _reconcile(session)
+    except Busy:
+        return session.offset
+
+
+def _reconcile(session):
+    path = part_path(session)
+    on_disk = os.path.getsize(path) if os.path.exists(path) else 0
+    if on_disk > session.offset:
+        with open(path, 'r+b') as fh:
+            fh.truncate(session.offset)
+    elif on_disk < session.offset:
+        type(session).objects.filter(pk=session.pk).update(offset=on_disk)
+        session.offset = on_disk
+    return session.offset
+
+
+def write_chunk(session, offset, stream):
+    """``stream``'dan o'qib ``offset``'dan boshlab yozadi, yangi offset qaytadi."""
+    with locked(session):
+        return _write_chunk(session, offset, stream)
+
+
+def _write_chunk(session, offset, stream):
+    _reconcile(session)
+    if offset != session.offset:
+        raise OffsetMismatch(f"Upload-Offset {offset} != {session.offset}")
+
+    path = part_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    max_chunk = getattr(settings, 'UPLOAD_CHUNK_MAX_SIZE', 64 * 1024 * 1024)
+    written = 0
+    # reconcile'dan keyin fayl oxiri == offset, 'ab' shu joydan davom etadi
+    with open(path, 'ab') as fh:
+        while True:
+            data = stream.read(CHUNK_SIZE)
+            if not data:
+                break
+            written += len(data)
+            if offset + written > session.length or written > max_chunk:
+                fh.truncate(offset)
+                raise TooLarge("Bo'lak e'lon qilingan hajmdan katta")
+            fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+
+    new_offset = offset + written
+    # Qulfsiz platformada parallel PATCH'lardan faqat bittasi o'tadi
+    updated = type(session).objects.filter(pk=session.pk, offset=offset).update(
+        offset=new_offset, updated_at=timezone.now(),
+    )
+    if not updated:
+        raise OffsetMismatch("Sessiya parallel yangilandi")
+    session.offset = new_offset
+    return new_offset
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def finalize(session):
+    """Tekshiradi va UploadedFile yaratadi; sessiya o'chiriladi."""
+    lock = lock_path(session)  # delete() pk'ni None qiladi
+    with locked(session):
+        obj = _finalize(session)
+    _unlink(lock)
+    return obj
+
+
+def _finalize(session):
+    from main.models import UploadedFile
+
+    _reconcile(session)
+    if session.offset != session.length:
+        raise Incomplete(f"{session.offset}/{session.length} bayt qabul qilingan")
+
+    path = part_path(session)
+    if not os.path.exists(path):
+        # 0 baytli fayl
+        open(path, 'wb').close()
+    digest = _sha256_file(path)
+    if session.checksum and session.checksum.lower() != digest:
+        raise ChecksumMismatch("sha256 mos kelmadi")
+
+    # 💾 Blob joyiga ko'chirishdan oldin (kvota o'zgargan bo'lishi mumkin)
+    owner = session.owner
+    quotas.check(owner, session.length)
+
+    ext = os.path.splitext(session.filename)[1].lower()[:16]
+    name = storage.blob_name(digest, ext)
+    _place_blob(path, storage.file_storage.path(name))
+
+    with transaction.atomic():
+        obj = UploadedFile(
+            owner_id=session.owner_id,
+            title=session.title,
+            is_public=session.is_public,
+            expire_date=session.expire_date,
+            download_limit=session.download_limit,
+            original_name=session.filename,
+        )
+        obj.file = name
+        with quotas.charging(obj, owner):
+            obj.save()
+        session.delete()
+        # Kvota (parallel yuklash) rad etsa .part va offset saqlanib qoladi
+        transaction.on_commit(lambda: _unlink(path))
+    return obj
+
+
+def _place_blob(path, target):
+    """
+    .part faylni blob nomiga hard link qiladi (.part commit'gacha qoladi).
+    Blob allaqachon bor bo'lsa mtime yangilanadi — storage._save kabi:
+    collect() acquire()'gacha bo'lgan oraliqda uni o'chirmaydi.
+    """
+    try:
+        os.utime(target)
+        return
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(path, target)
+    except FileExistsError:
+        os.utime(target)
+        return
+    if storage.file_storage.file_permissions_mode is not None:
+        os.chmod(target, storage.file_storage.file_permissions_mode)
+
+
+def discard(session):
+    path, lock = part_path(session), lock_path(session)
+    try:
+        with locked(session):
+            _unlink(path)
+            session.delete()
+    except Gone:
+        pass
+    _unlink(lock)
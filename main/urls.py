@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
 
@@ -5,6 +6,20 @@ import main.view.home as views
 import main.view.notes as note_views
 import main.view.file as file
 import main.view.login as login_view
+import main.view.upload as upload_views
+import main.view.image as image_views
+import main.view.metrics as metrics_views
+import main.view.public_async as public_async
+
+# 🌍 Public link view'lari: ASGI ostida async-native variantlar (ASYNC_PUBLIC_VIEWS)
+if getattr(settings, 'ASYNC_PUBLIC_VIEWS', False):
+    notice_public = public_async.notice_public_view
+    file_public = public_async.file_public_view
+    file_public_download = public_async.public_file_download_view
+else:
+    notice_public = note_views.notice_public_view
+    file_public = file.file_public_view
+    file_public_download = file.public_file_download_view
 
 loging = [
     path("login/", login_view.login_view, name="login"),
@@ -15,12 +30,14 @@ loging = [
 notece = [
     # 🔒 OWNER + PUBLIC LIST
     path("notice/list/", note_views.notice_list_view, name="notice_list"),
+    path("notice/list/json/", note_views.notice_list_json_view, name="notice_list_json"),
 
     # 🔒 CREATE NOTICE
     path("notice/create/", note_views.notice_create_view, name="notice_create"),
 
     # 🌍 PUBLIC LINK (expire_date + limit + views + is_active)
-    path("notice/public/<uuid:public_id>/", note_views.notice_public_view, name="notice_public"),
+    path("notice/public/<uuid:public_id>/", notice_public, name="notice_public"),
+    path("notice/public/<uuid:public_id>/seen/", note_views.notice_public_seen_view, name="notice_public_seen"),
     
     # 🔒 DETAIL (faqat owner)
     path("notice/<int:notice_id>/", note_views.notice_detail_view, name="notice_detail"),
@@ -35,14 +52,28 @@ notece = [
 file = [
   # 📁 FILE LIST / CRUD
     path('file/', file.file_list_view, name='file_list'),
+    path('file/json/', file.file_list_json_view, name='file_list_json'),
     path('file/create/', file.file_create_view, name='file_create'),
     path('file/<int:file_id>/', file.file_detail_view, name='file_detail'),
     path('file/<int:file_id>/edit/', file.file_edit_view, name='file_edit'),
     path('file/<int:file_id>/delete/', file.file_delete_view, name='file_delete'),
 
 # 🔗 PUBLIC / PRIVATE LINK VIEW
-    path('file/public/<uuid:public_id>/', file.file_public_view, name='file_public'),
+    path('file/public/<uuid:public_id>/', file_public, name='file_public'),
+    path('file/public/<uuid:public_id>/seen/', file.file_public_seen_view, name='file_public_seen'),
+
+
+    # ⏫ BO‘LAKLAB (RESUMABLE) YUKLASH
+    path('file/uploads/', upload_views.upload_session_create_view, name='upload_session_create'),
+    path('file/uploads/<uuid:session_id>/', upload_views.upload_session_view, name='upload_session'),
+    path(
+        'file/uploads/<uuid:session_id>/finalize/',
+        upload_views.upload_session_finalize_view,
+        name='upload_session_finalize'
+    ),
 
+    # 📦 BIR NECHTA FAYL — ZIP
+    path('file/bundle/', file.file_bundle_view, name='file_bundle'),
 
     # ⬇️ DOWNLOAD (PRIVATE)
     path(
@@ -54,13 +85,23 @@ file = [
     # ⬇️ DOWNLOAD (PUBLIC LINK)
     path(
         'file/public/<uuid:public_id>/download/',
-        file.public_file_download_view,
+        file_public_download,
         name='file_public_download'
     ),
-    path('file/public/<uuid:public_id>/', file.file_public_view, name='file_public')
+    path('file/public/<uuid:public_id>/', file_public, name='file_public')
 
 ]
+image = [
+    # 🖼 THUMBNAIL / RESPONSIVE VARIANTLAR
+    path('image/<uuid:public_id>/<slug:variant>/', image_views.image_variant_view, name='image_variant'),
+]
+
+# 📊 MONITORING
+monitoring = [
+    path('metrics/', metrics_views.metrics_view, name='metrics'),
+]
+
 urlpatterns = [
     path('', views.home),  
     path("account/", views.account),
-] + notece + file + loging
+] + notece + file + image + loging + monitoring
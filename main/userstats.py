@@ -0,0 +1,148 @@
+"""
+Foydalanuvchi bo'yicha jamlangan statistika (account sahifasi).
+
+``UserStats`` — har foydalanuvchiga bitta qator: fayllar soni, egallangan
+joy (fayli bor ``UploadedFile.size`` yig'indisi), eslatmalar soni, fayl /
+eslatma ko'rishlari (public link orqali ko'rishlar ham) va yuklab olishlar. Sahifa ochilganda COUNT/SUM
+qilinmaydi — qiymatlar F() bilan inkremental yuritiladi:
+
+    main/signals.py   -- yaratish, o'chirish, fayl almashtirish
+    main/counters.py  -- views_count / downloaded_count / views oshirishlari
+                         egasining qatoriga ham shu partiyada qo'shiladi
+    main/expiry.py    -- reclaim paytida bo'shatilgan joy
+
+Qator yo'q bo'lsa (eski foydalanuvchi) ``for_user`` uni to'liq hisoblab
+yaratadi. bulk_create / queryset.update() signalsiz o'tadi —
+``manage.py reconcile_user_stats`` qayta hisoblab farqni ko'rsatadi va tuzatadi.
+"""
+from itertools import chain
+
+from django.db.models import Count, F, Q, Sum
+
+LABEL = 'main.UserStats'
+FIELDS = ('file_count', 'bytes_stored', 'notice_count', 'file_views', 'file_downloads', 'notice_views')
+
+# (model label, hisoblagich maydoni) -> UserStats ustuni
+COUNTER_FIELDS = {
+    ('main.UploadedFile', 'views_count'): 'file_views',
+    ('main.UploadedFile', 'downloaded_count'): 'file_downloads',
+    ('main.Notice', 'views'): 'notice_views',
+    ('main.Notice', 'public_views'): 'notice_views',
+}
+
+
+def counter_field(obj, field):
+    return COUNTER_FIELDS.get((obj._meta.label, field))
+
+
+def stored_bytes(uploaded, snapshot=False):
+    """Fayl egallagan joy; ``snapshot=True`` — bazadan yuklangan paytdagi qiymat."""
+    if snapshot:
+        values = getattr(uploaded, '_snapshot', {})
+        return (values.get('size') or 0) if values.get('file') else 0
+    return (uploaded.size or 0) if uploaded.file else 0
+
+
+def add(user_id, **deltas):
+    """Atomar oshirish. Qator yo'q bo'lsa hech narsa qilinmaydi — ``for_user`` yaratadi."""
+    from main.models import UserStats
+
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if user_id is None or not deltas:
+        return
+    UserStats.objects.filter(pk=user_id).update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def compute(user_ids):
+    """{user_id: {ustun: qiymat}} — bazadan to'liq hisoblash (ikki GROUP BY so'rov)."""
+    from main.models import Notice, UploadedFile
+
+    files = (
+        UploadedFile._base_manager.filter(owner_id__in=user_ids)
+        .values('owner_id')
+        .annotate(
+            file_count=Count('pk'),
+            bytes_stored=Sum('size', filter=Q(file__isnull=False) & ~Q(file='')),
+            file_views=Sum('views_count'),
+            file_downloads=Sum('downloaded_count'),
+        )
+        .order_by()
+    )
+    notices = (
+        Notice._base_manager.filter(owner_id__in=user_ids)
+        .values('owner_id')
+        .annotate(notice_count=Count('pk'), notice_views=Sum(F('views') + F('public_views')))
+        .order_by()
+    )
+    result = {user_id: dict.fromkeys(FIELDS, 0) for user_id in user_ids}
+    for row in chain(files, notices):
+        user_id = row.pop('owner_id')
+        result[user_id].update({field: value or 0 for field, value in row.items()})
+    return result
+
+
+def refresh(user_id):
+    from main.models import UserStats
+
+    stats, _ = UserStats.objects.update_or_create(pk=user_id, defaults=compute([user_id])[user_id])
+    return stats
+
+
+def for_user(user):
+    """Dashboard uchun: bitta so'rov (qator bo'lmasa bir marta to'liq hisoblanadi)."""
+    from main import counters
+    from main.models import UserStats
+
+    try:
+        stats = UserStats.objects.get(pk=user.pk)
+    except UserStats.DoesNotExist:
+        stats = refresh(user.pk)
+    # Hali bazaga yozilmagan ko'rishlar ham ko'rinsin
+    return counters.apply_pending(stats, *dict.fromkeys(COUNTER_FIELDS.values()))
+
+
+def reconcile(batch_size=500, fix=True):
+    """
+    Barcha foydalanuvchilarni ``batch_size`` lik bo'laklarda qayta hisoblaydi.
+    Farq F() delta bilan tuzatiladi (oradagi parallel oshirishlar yo'qolmaydi).
+    Natija: {'users', 'drifted', 'missing', 'drift': {ustun: |farq| yig'indisi}, 'samples'}.
+    """
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from main.models import UserStats
+
+    report = {'users': 0, 'drifted': 0, 'missing': 0, 'drift': dict.fromkeys(FIELDS, 0), 'samples': []}
+    last_pk = 0
+    while True:
+        user_ids = list(
+            get_user_model()._base_manager.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not user_ids:
+            break
+        last_pk = user_ids[-1]
+        report['users'] += len(user_ids)
+
+        with transaction.atomic():
+            expected = compute(user_ids)
+            existing = {row['user_id']: row for row in UserStats.objects.filter(pk__in=user_ids).values('user_id', *FIELDS)}
+            missing = []
+            for user_id, values in expected.items():
+                row = existing.get(user_id)
+                if row is None:
+                    report['missing'] += 1
+                    missing.append(UserStats(user_id=user_id, **values))
+                    continue
+                deltas = {field: values[field] - row[field] for field in FIELDS if values[field] != row[field]}
+                if not deltas:
+                    continue
+                report['drifted'] += 1
+                for field, delta in deltas.items():
+                    report['drift'][field] += abs(delta)
+                if len(report['samples']) < 20:
+                    report['samples'].append({'user_id': user_id, **deltas})
+                if fix:
+                    add(user_id, **deltas)
+            if fix and missing:
+                UserStats.objects.bulk_create(missing, ignore_conflicts=True)
+    return report
@@ -1,12 +1,18 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.http import FileResponse, Http404
+from django.http import Http404
+from django.conf import settings
 from django.contrib import messages
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
-from django.db.models import F, Q
-from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_POST
 from main.forms import UploadedFileForm
-from main.models import UploadedFile, FileViewLog, FileDownloadLog
+from main.models import UploadedFile
+from main import access, bundles, counters, expiry, hotcache, httpcache, ingest, limits, quotas, rollups, search, userstats
+from main.delivery import FileDelivery
+from main.pagination import KeysetPage, paginate, page_size
 
 # -------------------------------
 # OWNER FILE DETAIL (faqat o'z fayllari)
@@ -15,76 +21,155 @@ from main.models import UploadedFile, FileViewLog, FileDownloadLog
 def file_detail_view(request, file_id):
     file = get_object_or_404(UploadedFile, id=file_id)
 
-    if file.owner != request.user:
+    if file.owner_id != request.user.pk:
         return HttpResponseForbidden("Sizga bu faylni ko‘rishga ruxsat yo‘q.")
 
     # Owner uchun ham view log
-    FileViewLog.objects.create(file=file, user=request.user)
-    UploadedFile.objects.filter(id=file.id).update(views_count=F('views_count') + 1)
-    file.refresh_from_db()
+    ingest.log_view(file, request.user)
+    counters.incr(file, 'views_count')
+    counters.apply_pending(file, 'views_count', 'downloaded_count')
 
-    return render(request, "file/detail.html", {"file": file})
+    # 📊 Kunlik statistika — xom loglar emas, rollup jadvalidan
+    daily = rollups.file_daily(file)
+
+    return render(request, "file/detail.html", {"file": file, "daily_stats": daily})
 
 
 # -------------------------------
 # LINK ORQALI FILE VIEW (public/private)
 # -------------------------------
 def file_public_view(request, public_id):
-    file = get_object_or_404(UploadedFile, public_id=public_id)
+    file = hotcache.get_or_404(UploadedFile, public_id)
 
     # 🔒 Private → faqat login shart
     if not file.is_public and not request.user.is_authenticated:
         return redirect(f'/login/?next=/file/public/{file.public_id}/')
 
-    # ⏰ Expire
-    if file.expire_date and timezone.now() > file.expire_date:
+    # 🔐 Private → egasi yoki tasdiqlangan AccessRequest
+    if not access.can_view(request.user, file):
+        return HttpResponseForbidden("Sizga bu faylni ko‘rishga ruxsat yo‘q.")
+
+    # ⏰ Expire (sweeper is_active=False qiladi, ulgurmagan bo‘lsa shu yerda)
+    if not expiry.ensure_active(file):
         return render(request, "file/expired.html", {"file": file})
 
-    # 👁 View count
-    UploadedFile.objects.filter(id=file.id).update(
-        views_count=F('views_count') + 1
-    )
+    # Limitli faylda sahifa downloaded_count'ni ko‘rsatadi — ETag'ga kiradi
+    page = httpcache.PageCache(request, file, *([file.downloaded_count] if file.download_limit else []))
+
+    # 👁 View count (buferlangan; beacon rejimida sahifadagi POST sanaydi)
+    if not page.beacon:
+        counters.incr(file, 'views_count')
+        ingest.log_view(file, request.user)
+
+    # ♻️ 304 yoki keshdagi siqilgan tana — shablon render qilinmaydi
+    early = page.not_modified() or page.precompressed()
+    if early is not None:
+        return early
+
+    counters.apply_pending(file, 'views_count', 'downloaded_count')
+    return page.finish(render(request, "file/detail.html", {"file": file, "beacon": page.beacon}))
 
-    FileViewLog.objects.create(
-        file=file,
-        user=request.user if request.user.is_authenticated else None
-    )
 
-    return render(request, "file/detail.html", {"file": file})
+# 📡 Ko‘rish beacon'i (HTTP_CACHE_VIEW_BEACON)
+@csrf_exempt
+@require_POST
+def file_public_seen_view(request, public_id):
+    file = hotcache.get_or_404(UploadedFile, public_id)
+    if httpcache.beacon_enabled(file) and expiry.ensure_active(file):
+        counters.incr(file, 'views_count')
+        ingest.log_view(file, request.user)
+    return HttpResponse(status=204)
 
 
 
 # -------------------------------
 # FILE LIST (faqat owner fayllari)
 # -------------------------------
-@login_required(login_url='/login/')
-def file_list_view(request):
+def _file_list_page(request):
     query = request.GET.get('q')
-    files = UploadedFile.objects.filter(owner=request.user).order_by('-created_at')
 
     if query:
-        filters = Q(title__icontains=query)
-        if query.isdigit():
-            filters |= Q(id=int(query))
-        files = files.filter(filters)
+        # 🔎 FTS: reyting bo‘yicha, cursor'siz bitta sahifa
+        page = KeysetPage(search.search_files(request.user, query, page_size(request)), None, None)
+    else:
+        files = UploadedFile.objects.filter(owner=request.user)
+        page = paginate(files, request.GET.get('cursor'), page_size(request))
+
+    for f in page:
+        counters.apply_pending(f, 'views_count', 'downloaded_count')
+    return page, query
+
+
+@login_required(login_url='/login/')
+def file_list_view(request):
+    page, query = _file_list_page(request)
 
     return render(request, "file/list.html", {
-        "object_list": files,
+        "object_list": page.object_list,
+        "page": page,
         "query": query or '',
     })
 
 
+# JSON variant (infinite scroll uchun)
+@login_required(login_url='/login/')
+def file_list_json_view(request):
+    page, _ = _file_list_page(request)
+
+    return JsonResponse({
+        "results": [
+            {
+                "id": f.id,
+                "title": f.title,
+                "created_at": f.created_at.isoformat(),
+                "is_public": f.is_public,
+                "size": f.size,
+                "views_count": f.views_count,
+                "downloaded_count": f.downloaded_count,
+                "download_limit": f.download_limit,
+                "url": reverse('file_detail', args=[f.id]),
+                "public_url": reverse('file_public', args=[f.public_id]) if f.public_id else None,
+            }
+            for f in page
+        ],
+        "next": page.next_cursor,
+        "prev": page.prev_cursor,
+    })
+
+
 # -------------------------------
 # FILE CREATE
 # -------------------------------
+# 💾 Kvota handler'i request.FILES o‘qilishidan oldin qo‘yiladi (CSRF tekshiruvi
+# ham POST'ni o‘qiydi) — shuning uchun csrf_exempt + ichki csrf_protect.
+# Kvota rad etishi CSRF'dan oldin: erta rad etilganda tana o‘qilmaydi (token yo‘q)
 @login_required(login_url='/login/')
+@csrf_exempt
 def file_create_view(request):
+    quotas.install_upload_handler(request)
+    rejected = quotas.rejection(request)
+    if rejected:
+        return _quota_rejected(request, rejected, {"form": UploadedFileForm()})
+    return _file_create(request)
+
+
+def _quota_rejected(request, exc, context):
+    messages.error(request, f"❌ {exc}")
+    return render(request, "file/form.html", context, status=exc.status)
+
+
+@csrf_protect
+def _file_create(request):
     if request.method == "POST":
         form = UploadedFileForm(request.POST, request.FILES)
         if form.is_valid():
             obj = form.save(commit=False)
             obj.owner = request.user
-            obj.save()
+            try:
+                with quotas.charging(obj):
+                    obj.save()
+            except quotas.QuotaExceeded as exc:
+                return _quota_rejected(request, exc, {"form": form})
             messages.success(request, "✅ Fayl muvaffaqiyatli yuklandi!")
             return redirect("file_list")
         else:
@@ -99,23 +184,33 @@ def file_create_view(request):
 # FILE EDIT
 # -------------------------------
 @login_required(login_url='/login/')
+@csrf_exempt
 def file_edit_view(request, file_id):
     file = get_object_or_404(UploadedFile, id=file_id)
 
-    if file.owner != request.user:
+    if file.owner_id != request.user.pk:
         messages.error(request, "⚠ Siz bu faylni tahrirlash huquqiga ega emassiz")
         return redirect('file_list')
 
+    # Almashtirilsa eski fayl joyi bo‘shaydi
+    quotas.install_upload_handler(request, credit=userstats.stored_bytes(file))
+    rejected = quotas.rejection(request)
+    if rejected:
+        return _quota_rejected(request, rejected, {"form": UploadedFileForm(instance=file), "file": file})
+    return _file_edit(request, file)
+
+
+@csrf_protect
+def _file_edit(request, file):
     if request.method == "POST":
         form = UploadedFileForm(request.POST, request.FILES, instance=file)
         if form.is_valid():
-            updated_file = form.save(commit=False)
-            updated_file.owner = file.owner
-            if updated_file.views_count is None:
-                updated_file.views_count = 0
-            if updated_file.downloaded_count is None:
-                updated_file.downloaded_count = 0
-            updated_file.save()
+            # Faqat o‘zgargan maydonlar yoziladi (views/download hisoblagichlari emas)
+            try:
+                with quotas.charging(file, request.user):
+                    form.save()
+            except quotas.QuotaExceeded as exc:
+                return _quota_rejected(request, exc, {"form": form, "file": file})
             messages.success(request, "✏️ Fayl muvaffaqiyatli yangilandi!")
             return redirect(file_list_view)
         else:
@@ -151,56 +246,105 @@ def file_download_view(request, file_id):
     if not file.is_public and not request.user.is_authenticated:
         return redirect(f'/login/?next=/file/{file.id}/')
 
+    if not access.can_view(request.user, file):
+        return HttpResponseForbidden("Sizga bu faylni yuklab olishga ruxsat yo‘q.")
+
     # ⏰ Expire
-    if file.expire_date and timezone.now() > file.expire_date:
+    if not expiry.ensure_active(file):
         raise Http404("Fayl muddati tugagan")
 
-    # 📉 Download limit
-    if file.download_limit is not None:
-        if file.downloaded_count >= file.download_limit:
-            raise Http404("Yuklab olish limiti tugagan")
-
-    # 📈 Download count
-    UploadedFile.objects.filter(id=file.id).update(
-        downloaded_count=F('downloaded_count') + 1
-    )
-
-    FileDownloadLog.objects.create(
-        file=file,
-        user=request.user if request.user.is_authenticated else None
-    )
+    return _deliver(request, file)
 
-    return FileResponse(
-        file.file.open('rb'),
-        as_attachment=True,
-        filename=file.file.name
-    )
 
 def public_file_download_view(request, public_id):
-    file = get_object_or_404(UploadedFile, public_id=public_id)
+    file = hotcache.get_or_404(UploadedFile, public_id)
 
     # private bo‘lsa → login shart
     if not file.is_public and not request.user.is_authenticated:
         return redirect(f'/login/?next=/file/public/{file.public_id}/')
 
-    if file.expire_date and timezone.now() > file.expire_date:
+    if not access.can_view(request.user, file):
+        return HttpResponseForbidden("Sizga bu faylni yuklab olishga ruxsat yo‘q.")
+
+    if not expiry.ensure_active(file):
         raise Http404("Fayl muddati tugagan")
 
-    if file.download_limit is not None:
-        if file.downloaded_count >= file.download_limit:
+    return _deliver(request, file)
+
+
+# -------------------------------
+# 📦 BIR NECHTA FAYL — ZIP (oqim bilan)
+# -------------------------------
+@login_required(login_url='/login/')
+@require_POST
+def file_bundle_view(request):
+    ids = [int(pk) for pk in request.POST.getlist('ids') if pk.isdigit()]
+    max_files = getattr(settings, 'BUNDLE_MAX_FILES', 500)
+    if not ids:
+        messages.error(request, "⚠ Hech qanday fayl tanlanmagan")
+        return redirect('file_list')
+    if len(ids) > max_files:
+        messages.error(request, f"⚠ Bir arxivga ko‘pi bilan {max_files} ta fayl")
+        return redirect('file_list')
+
+    # Bitta so‘rov; ruxsat egasi / AccessRequest bo‘yicha (ko‘pi bilan yana bitta)
+    files = access.filter_visible(request.user, UploadedFile.objects.filter(pk__in=ids).order_by('pk'))
+
+    bundle, skipped = [], []
+    for file in files:
+        if not file.file:
+            skipped.append(f"{file.title}: fayl mavjud emas")
+        elif not expiry.ensure_active(file):
+            skipped.append(f"{file.title}: muddati tugagan")
+        elif not limits.reserve_file_download(file):
+            skipped.append(f"{file.title}: yuklab olish limiti tugagan")
+        else:
+            bundle.append(file)
+
+    if not bundle:
+        messages.error(request, "❌ Tanlangan fayllarning birortasini yuklab bo‘lmaydi")
+        return redirect('file_list')
+
+    # 📝 Barcha download loglari — bitta bulk INSERT
+    ingest.log_downloads(bundle, request.user)
+
+    notes = {'yuklanmagan.txt': '\n'.join(skipped) + '\n'} if skipped else None
+    response = StreamingHttpResponse(bundles.stream_zip(bundle, notes), content_type='application/zip')
+    stamp = timezone.localtime().strftime('%Y%m%d-%H%M')
+    response['Content-Disposition'] = f'attachment; filename="fayllar-{stamp}.zip"'
+    # nginx javobni yig‘ib turmasin — baytlar darhol mijozga
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# -------------------------------
+# YETKAZISH (Range / ETag / sendfile)
+# -------------------------------
+def _deliver(request, file):
+    if not file.file:
+        raise Http404("Fayl mavjud emas")
+
+    delivery = FileDelivery(request, file)
+
+    # 304 / 412 — hisoblagich va limitga tegmaydi
+    early = delivery.precondition_response()
+    if early is not None:
+        return early
+
+    # Faqat yangi yuklab olish sanaladi (uzilganini davom ettirish emas)
+    if delivery.starts_download():
+        # 📉 Limit tekshiruvi va +1 bitta shartli UPDATE'da
+        if not limits.reserve_file_download(file):
             raise Http404("Yuklab olish limiti tugagan")
 
-    UploadedFile.objects.filter(id=file.id).update(
-        downloaded_count=F('downloaded_count') + 1
-    )
+        ingest.log_download(file, request.user)
+        response = delivery.response()
+        if file.download_limit is not None:
+            delivery.grant_resume(response)
+        return response
 
-    FileDownloadLog.objects.create(
-        file=file,
-        user=request.user if request.user.is_authenticated else None
-    )
+    # HEAD / Range: bytes=N- — limit yeyilmaydi, lekin chetlab ham o‘tilmaydi
+    if not delivery.unsatisfiable and not delivery.may_resume() and not limits.download_available(file):
+        raise Http404("Yuklab olish limiti tugagan")
 
-    return FileResponse(
-        file.file.open('rb'),
-        as_attachment=True,
-        filename=file.file.name
-    )
+    return delivery.response()
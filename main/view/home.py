@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from main.forms import CustomUserUpdateForm
+from main import quotas, userstats
 
 
 # Create your views here.
@@ -9,13 +10,17 @@ from main.forms import CustomUserUpdateForm
 def home(request):
     return render(request, 'index.html')
 
+@login_required(login_url='/login/')
 def account(request):
     user = request.user  # CustomUser instansiyasi
 
     context = {
         "user": user,  # bu oddiy user objektini uzatamiz
         "user_agent": request.META.get('HTTP_USER_AGENT', 'Noma’lum qurilma'),
+        # 📊 Jamlangan statistika — bitta qator (main/userstats.py)
+        "stats": userstats.for_user(user),
+        "quota": quotas.limit_for(user),
     }
 
 
-    return render(request, "acount.html")
+    return render(request, "acount.html", context)
@@ -0,0 +1,77 @@
+import os
+
+from django.conf import settings
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from main import access, images
+from main.delivery import sha256_of
+from main.models import UploadedImage
+
+
+def _pick_format(request):
+    """``?format=`` ustun, aks holda Accept bo'yicha (WebP qo'llansa — WebP)."""
+    formats = images.variant_formats()
+    requested = request.GET.get('format')
+    if requested:
+        if requested not in formats:
+            raise Http404("Format qo‘llab-quvvatlanmaydi")
+        return requested, False
+    if 'webp' in formats and 'image/webp' in request.headers.get('Accept', ''):
+        return 'webp', True
+    fallback = 'jpeg' if 'jpeg' in formats else formats[0]
+    return fallback, True
+
+
+# -------------------------------
+# RASM VARIANTI (thumb / w320 / w640 / ...)
+# -------------------------------
+def image_variant_view(request, public_id, variant):
+    image = get_object_or_404(UploadedImage, public_id=public_id)
+
+    if not access.can_view(request.user, image):
+        if not request.user.is_authenticated:
+            return redirect(f'/login/?next={request.path}')
+        raise Http404("Rasm topilmadi")
+
+    if variant not in images.variant_specs():
+        raise Http404("Bunday variant yo‘q")
+    if not image.image:
+        raise Http404("Rasm mavjud emas")
+
+    if not image.content_hash:
+        # Backfill qilinmagan eski yozuv
+        image.content_hash = sha256_of(image.image)
+        UploadedImage.objects.filter(pk=image.pk).update(content_hash=image.content_hash)
+
+    fmt, negotiated = _pick_format(request)
+    digest = image.content_hash
+    etag = f'"{digest[:32]}-{variant}.{fmt}"'
+    path = images.variant_path(digest, variant, fmt)
+
+    # Variant mazmuni xeshdan aniqlanadi — fayl hali yo'q bo'lsa ham 304 berish mumkin
+    early = get_conditional_response(request, etag=etag)
+    if early is None:
+        if not os.path.exists(path):
+            # Worker hali ulgurmagan: faqat shu variant shu yerda, qolganlari navbatga
+            images.render_variant(
+                image.image.path, digest, variant, fmt,
+                quality=getattr(settings, 'IMAGE_VARIANT_QUALITY', 80),
+            )
+            images.schedule(image)
+        response = FileResponse(open(path, 'rb'), content_type=images.FORMATS[fmt][2])
+        response['Last-Modified'] = http_date(os.path.getmtime(path))
+    else:
+        response = early
+
+    response['ETag'] = etag
+    # ?v=<xesh> bilan so'ralgan URL mazmuni hech qachon o'zgarmaydi
+    versioned = request.GET.get('v') == digest[:12]
+    max_age = 31536000 if versioned else 3600
+    scope = 'public' if image.is_public else 'private'
+    response['Cache-Control'] = f'{scope}, max-age={max_age}' + (', immutable' if versioned else '')
+    if negotiated:
+        patch_vary_headers(response, ('Accept',))
+    return response
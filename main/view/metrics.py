@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+
+from main import metrics
+
+
+# -------------------------------
+# 📊 PROMETHEUS METRICS
+# -------------------------------
+def metrics_view(request):
+    # Default faqat staff: lokal nginx ortida hamma so'rov REMOTE_ADDR=127.0.0.1
+    allowed = getattr(settings, 'METRICS_ALLOWED_IPS', ())
+    if not (request.user.is_staff or request.META.get('REMOTE_ADDR') in allowed):
+        raise Http404()
+
+    return HttpResponse(
+        metrics.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -1,36 +1,72 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
 from django.http import Http404
-from django.utils import timezone
-from django.db.models import F
-from django.http import HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 from main.models import Notice, AccessRequest
+from main import access, counters, expiry, hotcache, httpcache, limits, search
 import main.forms as forms
+from main.pagination import KeysetPage, paginate, page_size
 
-# 🔒 NOTICE LIST (faqat owner va public)
-@login_required(login_url='/login/')
-def notice_list_view(request):
+def _notice_list_page(request):
     query = request.GET.get('q')
-    object_list = Notice.objects.filter(
-        Q(owner=request.user) | Q(is_public=True)
-    )
 
     if query:
-        filters = Q(title__icontains=query) | Q(main_text__icontains=query)
-        if query.isdigit():
-            filters |= Q(id=int(query))
-        object_list = object_list.filter(filters)
+        # 🔎 FTS: reyting + snippet, cursor'siz bitta sahifa
+        page = KeysetPage(search.search_notices(request.user, query, page_size(request)), None, None)
+    else:
+        # O‘zimniki, public va menga ruxsat berilgan — alohida indeksli so‘rovlar, keyin merge
+        parts = [Notice.objects.filter(q) for q in access.listed_filters(Notice, request.user)]
+        page = paginate(parts, request.GET.get('cursor'), page_size(request))
+
+    for n in page:
+        counters.apply_pending(n, "views", "public_views")
+    return page, query
+
+
+# 🔒 NOTICE LIST (owner, public va ruxsat berilganlar)
+@login_required(login_url='/login/')
+def notice_list_view(request):
+    page, query = _notice_list_page(request)
 
     context = {
-        "object_list": object_list.order_by('-created_at'),
+        "object_list": page.object_list,
+        "page": page,
         "query": query,
         "searched": bool(query),
     }
     return render(request, "notice/list.html", context)
 
 
+# 🔒 NOTICE LIST — JSON (infinite scroll)
+@login_required(login_url='/login/')
+def notice_list_json_view(request):
+    page, _ = _notice_list_page(request)
+
+    return JsonResponse({
+        "results": [
+            {
+                "id": n.id,
+                "title": n.title,
+                "created_at": n.created_at.isoformat(),
+                "is_public": n.is_public,
+                "is_owner": n.owner_id == request.user.id,
+                "views": n.views,
+                "public_views": n.public_views,
+                "snippet": getattr(n, "search_snippet", ""),
+                "url": reverse("notice_detail", args=[n.id]),
+                "public_url": reverse("notice_public", args=[n.public_id]),
+            }
+            for n in page
+        ],
+        "next": page.next_cursor,
+        "prev": page.prev_cursor,
+    })
+
+
 # 🔒 CREATE NOTICE
 @login_required(login_url='/login/')
 def notice_create_view(request):
@@ -51,16 +87,12 @@ def notice_detail_view(request, notice_id):
     notice = get_object_or_404(Notice, pk=notice_id)
 
     # 🔒 Faqat egasi ko‘ra oladi
-    if notice.owner != request.user:
+    if notice.owner_id != request.user.pk:
         return HttpResponseForbidden("Sizga bu sahifani ko‘rishga ruxsat yo‘q.")
 
     # 👁 VIEW +1 (har kirishda, owner bo‘lsa ham)
-    Notice.objects.filter(id=notice.id).update(
-        views=F("views") + 1
-    )
-
-    # 🔄 Yangilangan qiymatni olish
-    notice.refresh_from_db()
+    counters.incr(notice, "views")
+    counters.apply_pending(notice, "views", "public_views")
 
     return render(request, "notice/detail.html", {"notice": notice})
 
@@ -88,31 +120,54 @@ def notice_edit_view(request, notice_id):
     })
 
 def notice_public_view(request, public_id):
-    notice = get_object_or_404(Notice, public_id=public_id)
+    notice = hotcache.get_or_404(Notice, public_id)
 
     # 🔒 Private → login shart
     if not notice.is_public and not request.user.is_authenticated:
         return redirect(f'/login/?next=/notice/public/{notice.public_id}/')
 
-    # ⏰ Expired
-    if notice.expire_date and timezone.now() > notice.expire_date:
-        return render(request, "notice/expired.html", {"notice": notice})
+    # 🔐 Private → egasi yoki tasdiqlangan AccessRequest
+    if not access.can_view(request.user, notice):
+        return render(request, "notice/forbidden.html", {"notice": notice}, status=403)
+
+    # ⏰ Expired / 🚫 Inactive — bitta is_active tekshiruvi
+    if not expiry.ensure_active(notice):
+        template = "notice/expired.html" if notice.is_expired() else "notice/inactive.html"
+        return render(request, template, {"notice": notice})
+
+    page = httpcache.PageCache(request, notice)
+
+    # 👁 View count (beacon rejimida sahifadagi POST sanaydi — CDN'dan berilsa ham)
+    if notice.is_public:
+        # 📉 download_limit: public link orqali nechta ko‘rish mumkin
+        if not page.beacon and not limits.reserve_notice_view(notice):
+            raise Http404("Ko‘rish limiti tugagan")
+    else:
+        counters.incr(notice, "views")
 
-    # 🚫 Inactive
-    if not notice.is_active:
-        return render(request, "notice/inactive.html", {"notice": notice})
+    # ♻️ 304 yoki keshdagi siqilgan tana — shablon render qilinmaydi
+    early = page.not_modified() or page.precompressed()
+    if early is not None:
+        return early
 
-    # 👁 View count
+    counters.apply_pending(notice, "views", "public_views")
     if notice.is_public:
-        Notice.objects.filter(id=notice.id).update(public_views=F("public_views") + 1)
-        notice.refresh_from_db()
         # PUBLIC TEMPLATE
-        return render(request, "notice/public_detail.html", {"notice": notice})
+        response = render(request, "notice/public_detail.html", {"notice": notice, "beacon": page.beacon})
     else:
-        Notice.objects.filter(id=notice.id).update(views=F("views") + 1)
-        notice.refresh_from_db()
         # PRIVATE TEMPLATE
-        return render(request, "notice/detail.html", {"notice": notice})
+        response = render(request, "notice/detail.html", {"notice": notice})
+    return page.finish(response)
+
+
+# 📡 Ko‘rish beacon'i (HTTP_CACHE_VIEW_BEACON): sahifa CDN keshidan berilganda ham sanaladi
+@csrf_exempt
+@require_POST
+def notice_public_seen_view(request, public_id):
+    notice = hotcache.get_or_404(Notice, public_id)
+    if httpcache.beacon_enabled(notice) and expiry.ensure_active(notice):
+        counters.incr(notice, "public_views")
+    return HttpResponse(status=204)
 
 
 # 🗑 DELETE (faqat owner)
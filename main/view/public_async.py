@@ -0,0 +1,157 @@
+"""
+Public link view'larining async (ASGI-native) variantlari.
+
+Sync variantlar (main/view/file.py, main/view/notes.py) bilan bir xil
+xatti-harakat, lekin ORM chaqiruvlari ``aget``/``aupdate``/``acreate``,
+fayl esa async iterator bilan yuboriladi — so'rov davomida thread
+handoff faqat zarur joyda (sessiya cookie'si bo'lsa user'ni yuklash, disk
+o'qish). Qaysi variant ishlashini ``ASYNC_PUBLIC_VIEWS`` tanlaydi
+(main/urls.py); WSGI ostida sync variantlar tezroq.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponseForbidden
+from django.shortcuts import redirect, render
+
+from main import access, counters, expiry, hotcache, httpcache, ingest, limits
+from main.delivery import AsyncFileDelivery
+from main.models import Notice, UploadedFile
+
+
+async def _auser(request):
+    # Sessiya cookie'si yo'q — anonim, bazaga borish shart emas (viral linklar)
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        user = AnonymousUser()
+    else:
+        def resolve():
+            user = request.user
+            user.is_authenticated  # lazy obyektni shu threadda yuklaymiz
+            return user
+
+        user = await sync_to_async(resolve)()
+    request.user = user
+    return user
+
+
+# -------------------------------
+# LINK ORQALI FILE VIEW (public/private)
+# -------------------------------
+async def file_public_view(request, public_id):
+    file = await hotcache.aget_or_404(UploadedFile, public_id)
+    user = await _auser(request)
+
+    # 🔒 Private → faqat login shart
+    if not file.is_public and not user.is_authenticated:
+        return redirect(f'/login/?next=/file/public/{file.public_id}/')
+
+    # 🔐 Private → egasi yoki tasdiqlangan AccessRequest
+    if not await access.acan_view(user, file):
+        return HttpResponseForbidden("Sizga bu faylni ko‘rishga ruxsat yo‘q.")
+
+    # ⏰ Expire
+    if not await expiry.aensure_active(file):
+        return render(request, "file/expired.html", {"file": file})
+
+    page = httpcache.PageCache(request, file, *([file.downloaded_count] if file.download_limit else []))
+
+    # 👁 View count (buferlangan; beacon rejimida sahifadagi POST sanaydi)
+    if not page.beacon:
+        await counters.aincr(file, 'views_count')
+        await ingest.alog_view(file, user)
+
+    # ♻️ 304 yoki keshdagi siqilgan tana — shablon render qilinmaydi
+    early = page.not_modified() or page.precompressed()
+    if early is not None:
+        return early
+
+    counters.apply_pending(file, 'views_count', 'downloaded_count')
+    return page.finish(render(request, "file/detail.html", {"file": file, "beacon": page.beacon}))
+
+
+# -------------------------------
+# FILE DOWNLOAD (PUBLIC LINK)
+# -------------------------------
+async def public_file_download_view(request, public_id):
+    file = await hotcache.aget_or_404(UploadedFile, public_id)
+    user = await _auser(request)
+
+    # private bo‘lsa → login shart
+    if not file.is_public and not user.is_authenticated:
+        return redirect(f'/login/?next=/file/public/{file.public_id}/')
+
+    if not await access.acan_view(user, file):
+        return HttpResponseForbidden("Sizga bu faylni yuklab olishga ruxsat yo‘q.")
+
+    if not await expiry.aensure_active(file):
+        raise Http404("Fayl muddati tugagan")
+
+    if not file.file:
+        raise Http404("Fayl mavjud emas")
+
+    delivery = await AsyncFileDelivery.create(request, file)
+
+    # 304 / 412 — hisoblagich va limitga tegmaydi
+    early = delivery.precondition_response()
+    if early is not None:
+        return early
+
+    if delivery.starts_download():
+        # 📉 Limit tekshiruvi va +1 bitta shartli UPDATE'da
+        if not await limits.areserve_file_download(file):
+            raise Http404("Yuklab olish limiti tugagan")
+
+        await ingest.alog_download(file, user)
+        response = delivery.response()
+        if file.download_limit is not None:
+            delivery.grant_resume(response)
+        return response
+
+    # HEAD / Range: bytes=N- — limit yeyilmaydi, lekin chetlab ham o‘tilmaydi
+    if not delivery.unsatisfiable and not delivery.may_resume() and not await limits.adownload_available(file):
+        raise Http404("Yuklab olish limiti tugagan")
+
+    return delivery.response()
+
+
+# -------------------------------
+# NOTICE PUBLIC LINK
+# -------------------------------
+async def notice_public_view(request, public_id):
+    notice = await hotcache.aget_or_404(Notice, public_id)
+    user = await _auser(request)
+
+    # 🔒 Private → login shart
+    if not notice.is_public and not user.is_authenticated:
+        return redirect(f'/login/?next=/notice/public/{notice.public_id}/')
+
+    # 🔐 Private → egasi yoki tasdiqlangan AccessRequest
+    if not await access.acan_view(user, notice):
+        return render(request, "notice/forbidden.html", {"notice": notice}, status=403)
+
+    # ⏰ Expired / 🚫 Inactive
+    if not await expiry.aensure_active(notice):
+        template = "notice/expired.html" if notice.is_expired() else "notice/inactive.html"
+        return render(request, template, {"notice": notice})
+
+    page = httpcache.PageCache(request, notice)
+
+    # 👁 View count
+    if notice.is_public:
+        # 📉 download_limit: public link orqali nechta ko‘rish mumkin
+        if not page.beacon and not await limits.areserve_notice_view(notice):
+            raise Http404("Ko‘rish limiti tugagan")
+    else:
+        await counters.aincr(notice, "views")
+
+    # ♻️ 304 yoki keshdagi siqilgan tana — shablon render qilinmaydi
+    early = page.not_modified() or page.precompressed()
+    if early is not None:
+        return early
+
+    counters.apply_pending(notice, "views", "public_views")
+    if notice.is_public:
+        response = render(request, "notice/public_detail.html", {"notice": notice, "beacon": page.beacon})
+    else:
+        response = render(request, "notice/detail.html", {"notice": notice})
+    return page.finish(response)
@@ -0,0 +1,127 @@
+import json
+
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
+
+from main import quotas, uploads
+from main.forms import UploadSessionForm
+from main.models import UploadSession
+
+
+def _session_payload(session):
+    return {
+        "id": str(session.pk),
+        "filename": session.filename,
+        "length": session.length,
+        "offset": session.offset,
+        "url": reverse("upload_session", args=[session.pk]),
+        "finalize_url": reverse("upload_session_finalize", args=[session.pk]),
+    }
+
+
+def _with_offset(response, session):
+    response["Upload-Offset"] = session.offset
+    response["Upload-Length"] = session.length
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def _error(exc):
+    return JsonResponse({"error": str(exc)}, status=exc.status)
+
+
+# -------------------------------
+# 1️⃣ SESSIYA OCHISH
+# -------------------------------
+@login_required(login_url='/login/')
+@require_http_methods(["POST"])
+def upload_session_create_view(request):
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return JsonResponse({"error": "JSON noto‘g‘ri"}, status=400)
+    else:
+        data = request.POST
+
+    data = data.copy()
+    if request.headers.get("Upload-Length"):
+        data["length"] = request.headers["Upload-Length"]
+    if not data.get("title"):
+        data["title"] = (data.get("filename") or "")[:200]
+    form = UploadSessionForm(data)
+    if not form.is_valid():
+        return JsonResponse({"error": "Sessiya maydonlari noto‘g‘ri", "fields": form.errors}, status=400)
+
+    # 💾 E'lon qilingan hajm kvotaga sig'maydi — bitta bayt ham qabul qilinmaydi
+    try:
+        quotas.check(request.user, form.cleaned_data["length"])
+    except quotas.QuotaExceeded as exc:
+        return _error(exc)
+
+    session = form.save(commit=False)
+    session.owner = request.user
+    session.save()
+
+    response = _with_offset(JsonResponse(_session_payload(session), status=201), session)
+    response["Location"] = reverse("upload_session", args=[session.pk])
+    return response
+
+
+# -------------------------------
+# 2️⃣ HOLAT / BO‘LAK / BEKOR QILISH
+# -------------------------------
+@login_required(login_url='/login/')
+@require_http_methods(["GET", "HEAD", "PATCH", "DELETE"])
+def upload_session_view(request, session_id):
+    session = get_object_or_404(UploadSession, pk=session_id, owner=request.user)
+
+    if request.method == "DELETE":
+        try:
+            uploads.discard(session)
+        except uploads.UploadError as exc:
+            return _with_offset(_error(exc), session)
+        return HttpResponse(status=204)
+
+    if request.method == "PATCH":
+        try:
+            offset = int(request.headers.get("Upload-Offset", ""))
+        except ValueError:
+            return JsonResponse({"error": "Upload-Offset header kerak"}, status=400)
+        try:
+            # request.body emas: bo‘lak xotiraga to‘liq yuklanmaydi
+            uploads.write_chunk(session, offset, request)
+        except uploads.UploadError as exc:
+            return _with_offset(_error(exc), session)
+        return _with_offset(HttpResponse(status=204), session)
+
+    # GET / HEAD — qayerdan davom ettirish kerak
+    uploads.reconcile(session)
+    return _with_offset(JsonResponse(_session_payload(session)), session)
+
+
+# -------------------------------
+# 3️⃣ YAKUNLASH
+# -------------------------------
+@login_required(login_url='/login/')
+@require_http_methods(["POST"])
+def upload_session_finalize_view(request, session_id):
+    session = get_object_or_404(UploadSession, pk=session_id, owner=request.user)
+
+    try:
+        obj = uploads.finalize(session)
+    except (uploads.UploadError, quotas.QuotaExceeded) as exc:
+        return _with_offset(_error(exc), session)
+
+    return JsonResponse({
+        "id": obj.id,
+        "title": obj.title,
+        "size": obj.size,
+        "content_hash": obj.content_hash,
+        "url": reverse("file_detail", args=[obj.id]),
+    }, status=201)